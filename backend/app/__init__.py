@@ -32,12 +32,27 @@ babel = Babel()
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+
+    from app.utils.json_provider import init_json
+    from app.utils.compression import init_compression
+
+    init_json(app)
+    # Registered first so it runs after every other after_request hook
+    init_compression(app)
+
+    if app.config.get("PROXY_FIX_X_FOR"):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"], x_proto=app.config["PROXY_FIX_X_FOR"]
+        )
     
     # Enable HTTPS security headers in production
     if not app.debug:
         Talisman(app, 
                 force_https=False,  # Set to True when using HTTPS
                 strict_transport_security=True,
+                session_cookie_secure=app.config.get("SESSION_COOKIE_SECURE", True),
                 content_security_policy={
                     'default-src': "'self'",
                     'script-src': ["'self'", "'unsafe-inline'", "'unsafe-eval'"],
@@ -74,25 +89,68 @@ def create_app(config_class=Config):
     mail.init_app(app)
     moment.init_app(app)
     migrate = Migrate(app, db)
-    socketio.init_app(app, async_mode="threading", cors_allowed_origins=allowed_origins)
+    socketio.init_app(
+        app,
+        async_mode=app.config.get("SOCKETIO_ASYNC_MODE", "threading"),
+        cors_allowed_origins=allowed_origins,
+        message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"),
+    )
     babel.init_app(app)
 
+    from app.utils.live import init_live_updates
+
+    init_live_updates(db.session)
+
+    from app.utils.data_version import init_data_version
+
+    init_data_version(db.session)
+
+    from app.utils.search import init_search
+
+    init_search()
+
+    from app.utils.identity_cache import init_identity_cache
+
+    init_identity_cache()
+
+    from app.utils.metrics import init_metrics
+
+    init_metrics(app)
+
+    from app.utils.query_counter import init_query_guard
+
+    init_query_guard(app)
+
+    from app.utils.profiler import init_profiler
+
+    init_profiler(app)
+
+    from app.utils.lifecycle import init_lifecycle
+
+    init_lifecycle(app)
+
     login_manager.login_view = "auth.login"
     login_manager.login_message = "Vui lòng đăng nhập để truy cập trang này."
     login_manager.login_message_category = "info"
     login_manager.session_protection = "strong"  # Protect against session hijacking
 
-    from app.commands import init_db_command, create_tables_command
+    from app.commands import (
+        init_db_command, create_tables_command, flush_outbox_command, rebuild_search_index_command,
+    )
 
     app.cli.add_command(init_db_command)
     app.cli.add_command(create_tables_command)
+    app.cli.add_command(flush_outbox_command)
+    app.cli.add_command(rebuild_search_index_command)
     
-    # Ensure all tables exist on startup
-    with app.app_context():
-        try:
-            db.create_all()
-        except Exception as e:
-            logger.warning(f"Could not create all tables on startup: {e}")
+    # Schema is managed by "flask create-tables" / "flask db upgrade"; creating
+    # tables on every boot is opt-in (handy for a throwaway dev database)
+    if app.config.get("AUTO_CREATE_TABLES"):
+        with app.app_context():
+            try:
+                db.create_all()
+            except Exception as e:
+                logger.warning(f"Could not create all tables on startup: {e}")
 
     @app.context_processor
     def utility_processor():
@@ -133,11 +191,8 @@ def create_app(config_class=Config):
     def log_request_info():
         """Log request information"""
         if not request.path.startswith('/static'):
-            # Prefer X-Forwarded-For when behind proxies; fallback to remote_addr
-            client_ip = request.headers.get('X-Forwarded-For', request.remote_addr) or ""
-            if ',' in client_ip:
-                client_ip = client_ip.split(',')[0].strip()
-            logger.info(f"{request.method} {request.path} - {client_ip}")
+            # remote_addr is the proxy-reported client when PROXY_FIX_X_FOR is set
+            logger.info(f"{request.method} {request.path} - {request.remote_addr}")
     
     @app.after_request
     def add_security_headers(response):
@@ -162,33 +217,53 @@ def create_app(config_class=Config):
         app.register_blueprint(settings_bp, url_prefix='/settings')
         app.register_blueprint(api_bp, url_prefix='/api')
 
-        from app.admin import configure_admin
+        from app.api.splits import bp as splits_bp
+
+        app.register_blueprint(splits_bp)
 
-        configure_admin(app)
+        if app.config.get("ADMIN_ENABLED", True):
+            # flask-admin (and WTForms) is one of the slowest imports
+            from app.admin import configure_admin
+
+            configure_admin(app)
 
         if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-            logger.info("Initializing Google AI...")
-            from app.ai_engine.core.model_manager import model_manager
+            if app.config.get("EMAIL_OUTBOX_WORKER"):
+                # Deliver anything left in the outbox from a previous run
+                from app.utils.email import start_outbox_worker
 
-            try:
-                model_manager.initialize()
-                from app.ai_engine.features.chat import AIChat
-                from app.ai_engine.features.analysis import ExpenseAnalyzer
-                from app.ai_engine.features.predictor import ExpensePredictor
-                from app.ai_engine.features.categorizer import ExpenseCategorizer
-
-                app.expense_analyzer = ExpenseAnalyzer()
-                app.expense_categorizer = ExpenseCategorizer()
-                app.expense_predictor = ExpensePredictor()
-                app.ai_chat = AIChat()
-                logger.info("Google AI initialized successfully.")
-            except Exception as e:
-                logger.error(f"Failed to initialize Google AI: {e}")
-                logger.warning("Application will run without AI features. Please set GOOGLE_API_KEY environment variable.")
-                # Set None to indicate AI features are not available
-                app.expense_analyzer = None
-                app.expense_categorizer = None
-                app.expense_predictor = None
-                app.ai_chat = None
+                start_outbox_worker(app)
+
+        # Dev server (run.py): only the reloader child, not the watcher
+        # process. wsgi.py calls init_ai_features itself
+        if os.environ.get("WERKZEUG_RUN_MAIN") == "true" or app.config.get("AI_BACKEND") == "fake":
+            init_ai_features(app)
 
     return app
+
+
+def init_ai_features(app):
+    """Set up the model backend and attach the AI feature objects to ``app``"""
+    logger.info("Initializing Google AI...")
+    from app.ai_engine.core.model_manager import model_manager
+
+    try:
+        model_manager.initialize(app.config)
+        from app.ai_engine.features.chat import AIChat
+        from app.ai_engine.features.analysis import ExpenseAnalyzer
+        from app.ai_engine.features.predictor import ExpensePredictor
+        from app.ai_engine.features.categorizer import ExpenseCategorizer
+
+        app.expense_analyzer = ExpenseAnalyzer()
+        app.expense_categorizer = ExpenseCategorizer()
+        app.expense_predictor = ExpensePredictor()
+        app.ai_chat = AIChat()
+        logger.info("Google AI initialized successfully.")
+    except Exception as e:
+        logger.error(f"Failed to initialize Google AI: {e}")
+        logger.warning("Application will run without AI features. Please set GOOGLE_API_KEY environment variable.")
+        # Set None to indicate AI features are not available
+        app.expense_analyzer = None
+        app.expense_categorizer = None
+        app.expense_predictor = None
+        app.ai_chat = None
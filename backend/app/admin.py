@@ -1,7 +1,7 @@
-from flask_admin import Admin, AdminIndexView
+from flask_admin import Admin, AdminIndexView, BaseView, expose
 from flask_admin.contrib.sqla import ModelView
 from flask_login import current_user, login_required
-from flask import redirect, url_for, request
+from flask import redirect, url_for, request, abort, send_file, current_app
 from app import db
 from app.models import (
     User,
@@ -81,6 +81,51 @@ class ReadOnlyModelView(ModelView):
         return redirect(url_for("main.index"))
 
 
+class ProfilesView(BaseView):
+    """Request profiles captured by the sampling profiler"""
+
+    @expose("/")
+    def index(self):
+        from app.utils.profiler import get_profile_store
+
+        return self.render(
+            "admin/profiles.html",
+            profiles=get_profile_store().list(),
+            enabled=current_app.config.get("PROFILER_ENABLED"),
+        )
+
+    @expose("/<profile_id>")
+    def detail(self, profile_id):
+        from app.utils.profiler import get_profile_store
+
+        store = get_profile_store()
+        profile = store.get(profile_id)
+        if not profile:
+            abort(404)
+        return self.render(
+            "admin/profile_detail.html",
+            profile=profile,
+            summary=store.summary(profile_id),
+        )
+
+    @expose("/<profile_id>/download")
+    def download(self, profile_id):
+        from app.utils.profiler import get_profile_store
+
+        path = get_profile_store().stats_path(profile_id)
+        if not path:
+            abort(404)
+        return send_file(path, as_attachment=True, download_name=f"{profile_id}.prof")
+
+    def is_accessible(self):
+        return current_user.is_authenticated and current_user.username == "admin"
+
+    def inaccessible_callback(self, name, **kwargs):
+        if not current_user.is_authenticated:
+            return redirect(url_for("auth.login", next=request.url))
+        return redirect(url_for("main.index"))
+
+
 def configure_admin(app):
     admin = Admin(
         app,
@@ -96,5 +141,6 @@ def configure_admin(app):
     admin.add_view(ReadOnlyModelView(ChatSession, db.session))
     admin.add_view(ReadOnlyModelView(ChatMessage, db.session))
     admin.add_view(ReadOnlyModelView(Wallet, db.session))
+    admin.add_view(ProfilesView(name="Profiles", endpoint="profiles"))
 
     return admin
@@ -0,0 +1,293 @@
+"""
+Model backends used by ModelManager.
+
+``GeminiBackend`` talks to Google Gemini. ``FakeBackend`` is a local stand-in
+for load tests and benchmarks: it answers with canned text/JSON after a
+configurable latency, streams in chunks at a fixed cadence and can inject
+rate-limit, server and timeout errors. Select one with ``AI_BACKEND``
+("gemini" or "fake").
+"""
+
+import abc
+import json
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+Prompt = Union[str, List]
+
+
+class ModelBackendError(Exception):
+    """Error raised by a backend call; ``status_code`` mirrors the HTTP status"""
+
+    status_code = 500
+
+
+class ModelRateLimitError(ModelBackendError):
+    status_code = 429
+
+
+class ModelServerError(ModelBackendError):
+    status_code = 503
+
+
+class ModelTimeoutError(ModelBackendError, TimeoutError):
+    status_code = 504
+
+
+class ModelBackend(abc.ABC):
+    """Interface: ``generate`` returns the full text, ``stream`` yields text deltas"""
+
+    name = None
+
+    @abc.abstractmethod
+    def generate(self, prompt: Prompt, generation: Dict, timeout: float) -> str:
+        """The whole response text"""
+
+    @abc.abstractmethod
+    def stream(self, prompt: Prompt, generation: Dict, timeout: float) -> Iterator[str]:
+        """Response text deltas, in order"""
+
+
+class GeminiBackend(ModelBackend):
+    name = "gemini"
+
+    SAFETY_SETTINGS = [
+        {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+        {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+        {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+        {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    ]
+
+    def __init__(self, api_key: str, model_name: str, generation: Dict):
+        import google.generativeai as genai
+        from google.generativeai.types import GenerationConfig
+
+        self._config_class = GenerationConfig
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(
+            model_name,
+            generation_config=GenerationConfig(**generation),
+            safety_settings=self.SAFETY_SETTINGS,
+        )
+
+    def generate(self, prompt, generation, timeout):
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self._config_class(**generation),
+            request_options={"timeout": timeout},
+        )
+        return response.text if response else ""
+
+    def stream(self, prompt, generation, timeout):
+        response = self.model.generate_content(
+            prompt,
+            generation_config=self._config_class(**generation),
+            stream=True,
+            request_options={"timeout": timeout},
+        )
+        for chunk in response:
+            # Some streamed chunks may not contain text (e.g., prompt_feedback or
+            # final status-only candidates). Accessing chunk.text can raise when
+            # there's no valid Part, so guard it defensively.
+            try:
+                text_delta = chunk.text  # quick accessor when available
+            except Exception:
+                text_delta = None
+
+            if text_delta:
+                yield text_delta
+                continue
+            # Fallback: try extracting any text parts if present
+            try:
+                for cand in getattr(chunk, "candidates", []) or []:
+                    content = getattr(cand, "content", None)
+                    parts = getattr(content, "parts", []) if content else []
+                    for p in parts or []:
+                        t = getattr(p, "text", None)
+                        if t:
+                            yield t
+            except Exception:
+                # Swallow silent non-text chunks
+                pass
+
+
+def parse_latency(spec) -> Callable[[random.Random], float]:
+    """Turn a latency spec into a sampler returning seconds.
+
+    Accepted forms: ``0.2`` / ``"fixed:0.2"``, ``"uniform:0.1,0.5"``,
+    ``"normal:0.3,0.05"``, ``"lognormal:-1.2,0.4"`` (mu, sigma of the
+    underlying normal) and ``"exp:0.3"`` (mean).
+    """
+    if isinstance(spec, (int, float)):
+        value = float(spec)
+        return lambda rng: value
+
+    kind, _, args = str(spec).partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    try:
+        params = [float(a) for a in args.split(",")]
+        if kind == "fixed":
+            (value,) = params
+            return lambda rng: value
+        if kind == "uniform":
+            low, high = params
+            return lambda rng: rng.uniform(low, high)
+        if kind == "normal":
+            mean, stddev = params
+            return lambda rng: max(0.0, rng.gauss(mean, stddev))
+        if kind == "lognormal":
+            mu, sigma = params
+            return lambda rng: rng.lognormvariate(mu, sigma)
+        if kind == "exp":
+            (mean,) = params
+            return lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+    except ValueError:
+        pass
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+# Canned answers shaped like what the feature parsers expect
+FAKE_RESPONSES = {
+    "invoice": json.dumps({
+        "amount": 185000,
+        "date": "2025-01-15",
+        "fee": 15000,
+        "note": "Bữa trưa",
+        "merchant": "Cơm Tấm Sài Gòn",
+        "invoice_number": "HD001234",
+        "items": [{"name": "Cơm tấm sườn", "amount": 85000}, {"name": "Trà đá", "amount": 5000}],
+    }, ensure_ascii=False),
+    "recommendations": "```json\n" + json.dumps({
+        "recommendations": [
+            "Giảm chi tiêu ăn uống bên ngoài, ưu tiên nấu ăn tại nhà.",
+            "Đặt ngân sách hàng tháng cho mua sắm và theo dõi hàng tuần.",
+            "Chuyển 10% thu nhập vào tài khoản tiết kiệm ngay khi nhận lương.",
+        ]
+    }, ensure_ascii=False) + "\n```",
+    "category": "ăn uống",
+    "prediction": "ăn uống: 3500000\ndi chuyển: 800000\nmua sắm: 1200000",
+    "chat": (
+        "Tháng này bạn đã chi khoảng 4.500.000₫, chủ yếu cho ăn uống và di chuyển. "
+        "Bạn vẫn còn trong ngân sách, hãy tiếp tục theo dõi nhé! 😊"
+    ),
+}
+
+
+def classify_prompt(prompt: Prompt) -> str:
+    """Guess which feature issued a prompt, to pick a canned answer"""
+    if not isinstance(prompt, str):
+        return "invoice"  # multimodal parts only come from the invoice extractor
+    if '"recommendations"' in prompt:
+        return "recommendations"
+    if prompt.rstrip().endswith("Danh mục:"):
+        return "category"
+    if "Dự đoán chi tiêu" in prompt:
+        return "prediction"
+    return "chat"
+
+
+class FakeBackend(ModelBackend):
+    """Deterministic (given ``seed``) offline model for load and retry testing"""
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency="fixed:0.05",
+        chunk_count: int = 10,
+        chunk_delay: float = 0.02,
+        rate_limit_rate: float = 0.0,
+        server_error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        responses: Optional[Dict[str, str]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = parse_latency(latency)
+        self.chunk_count = max(1, chunk_count)
+        self.chunk_delay = chunk_delay
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.timeout_rate = timeout_rate
+        self.responses = dict(FAKE_RESPONSES, **(responses or {}))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    @classmethod
+    def from_config(cls, config) -> "FakeBackend":
+        responses = config.get("AI_FAKE_RESPONSES")
+        if isinstance(responses, str):
+            with open(responses, encoding="utf-8") as f:
+                responses = json.load(f)
+        seed = config.get("AI_FAKE_SEED")
+        return cls(
+            latency=config.get("AI_FAKE_LATENCY", "fixed:0.05"),
+            chunk_count=int(config.get("AI_FAKE_CHUNKS", 10)),
+            chunk_delay=float(config.get("AI_FAKE_CHUNK_DELAY", 0.02)),
+            rate_limit_rate=float(config.get("AI_FAKE_RATE_LIMIT_RATE", 0.0)),
+            server_error_rate=float(config.get("AI_FAKE_SERVER_ERROR_RATE", 0.0)),
+            timeout_rate=float(config.get("AI_FAKE_TIMEOUT_RATE", 0.0)),
+            responses=responses,
+            seed=int(seed) if seed not in (None, "") else None,
+        )
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            return self._rng.random(), self.latency(self._rng)
+
+    def _call(self, timeout):
+        """Wait out the simulated latency, or raise an injected error"""
+        roll, latency = self._draw()
+        if roll < self.timeout_rate:
+            time.sleep(timeout)
+            raise ModelTimeoutError(f"Fake model timed out after {timeout}s")
+        roll -= self.timeout_rate
+        if roll < self.rate_limit_rate:
+            raise ModelRateLimitError("429 Resource has been exhausted (fake)")
+        roll -= self.rate_limit_rate
+        if roll < self.server_error_rate:
+            time.sleep(latency)
+            raise ModelServerError("503 The model is overloaded (fake)")
+        if latency >= timeout:
+            time.sleep(timeout)
+            raise ModelTimeoutError(f"Fake model timed out after {timeout}s")
+        time.sleep(latency)
+
+    def generate(self, prompt, generation, timeout):
+        self._call(timeout)
+        return self.responses[classify_prompt(prompt)]
+
+    def stream(self, prompt, generation, timeout):
+        self._call(timeout)  # time to first chunk
+        text = self.responses[classify_prompt(prompt)]
+        if not text:  # an AI_FAKE_RESPONSES override may be empty
+            return
+        size = -(-len(text) // self.chunk_count)
+        for i in range(0, len(text), size):
+            if i:
+                time.sleep(self.chunk_delay)
+            yield text[i:i + size]
+
+
+def create_backend(name: str, config, generation: Dict) -> ModelBackend:
+    """Build the backend selected by ``AI_BACKEND``"""
+    if name == "fake":
+        return FakeBackend.from_config(config)
+    if name != "gemini":
+        raise ValueError(f"Unknown AI_BACKEND: {name!r}")
+
+    api_key = config.get("GOOGLE_API_KEY")
+    if not api_key:
+        logger.error("GOOGLE_API_KEY not found in environment variables")
+        raise ValueError("GOOGLE_API_KEY is required for Google AI")
+    # Validate API key format
+    if len(api_key) < 20:
+        raise ValueError("GOOGLE_API_KEY appears to be invalid")
+    return GeminiBackend(api_key, config.get("AI_MODEL_NAME", "gemini-flash-latest"), generation)
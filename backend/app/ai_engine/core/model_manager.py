@@ -1,13 +1,21 @@
 import os
 import logging
 import time
-from typing import Optional, Generator
-import google.generativeai as genai
-from google.generativeai.types import GenerationConfig
+from typing import Dict, Generator, Tuple
 from functools import wraps
+from app.ai_engine.core.backends import ModelBackend, Prompt, create_backend
+from app.utils.metrics import model_call_timer
 
 logger = logging.getLogger(__name__)
 
+# Default generation settings for safety and quality
+DEFAULT_GENERATION_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.9,
+    "top_k": 40,
+    "max_output_tokens": 2048,
+}
+
 
 def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
     """Decorator to retry function on failure"""
@@ -37,172 +45,116 @@ def retry_on_failure(max_retries: int = 3, delay: float = 1.0):
 class ModelManager:
     _instance = None
     _initialized = False
+    backend = None
+    timeout = 30
+    max_retries = 3
+    generation_config = DEFAULT_GENERATION_CONFIG
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(ModelManager, cls).__new__(cls)
         return cls._instance
 
-    def initialize(self):
-        """Initialize Google Gemini API"""
+    def initialize(self, config=None):
+        """Set up the model backend selected by ``AI_BACKEND`` (default "gemini").
+
+        Settings come from ``config`` (e.g. ``app.config``) when given,
+        otherwise from the environment.
+        """
         if self._initialized:
             return
-        
-        api_key = os.environ.get("GOOGLE_API_KEY")
-        if not api_key:
-            logger.error("GOOGLE_API_KEY not found in environment variables")
-            raise ValueError("GOOGLE_API_KEY is required for Google AI")
-        
-        # Validate API key format
-        if len(api_key) < 20:
-            raise ValueError("GOOGLE_API_KEY appears to be invalid")
-        
+        config = config if config is not None else os.environ
+
         try:
-            genai.configure(api_key=api_key)
+            self.timeout = int(config.get("AI_REQUEST_TIMEOUT", 30))
+            self.max_retries = int(config.get("AI_MAX_RETRIES", 3))
+
+            self.generation_config = dict(DEFAULT_GENERATION_CONFIG)
+            backend_name = config.get("AI_BACKEND") or "gemini"
+            self.use_backend(create_backend(backend_name, config, self.generation_config))
             # Use the correct model name - gemini-flash-latest is the stable latest version
             # Other good options: gemini-2.5-flash, gemini-2.0-flash, gemini-pro-latest
-            self.model_name = os.environ.get("AI_MODEL_NAME", "gemini-flash-latest")
-            self.timeout = int(os.environ.get("AI_REQUEST_TIMEOUT", 30))
-            self.max_retries = int(os.environ.get("AI_MAX_RETRIES", 3))
-            
-            # Configure generation settings for safety and quality
-            self.generation_config = GenerationConfig(
-                temperature=0.7,
-                top_p=0.9,
-                top_k=40,
-                max_output_tokens=2048,
-            )
-            
-            # Configure safety settings
-            self.safety_settings = [
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            ]
-            
-            self.model = genai.GenerativeModel(
-                self.model_name,
-                generation_config=self.generation_config,
-                safety_settings=self.safety_settings
-            )
-            
-            logger.info(f"Google AI initialized with model: {self.model_name}")
-            self._initialized = True
-            
+            self.model_name = config.get("AI_MODEL_NAME", "gemini-flash-latest")
+            logger.info(f"AI initialized with {backend_name} backend (model: {self.model_name})")
+
         except Exception as e:
             logger.exception(f"Failed to initialize Google AI: {e}")
             raise
 
+    def use_backend(self, backend: ModelBackend):
+        """Swap in a backend directly (tests, benchmarks)"""
+        self.backend = backend
+        self._initialized = True
+
+    def reset(self):
+        """Drop the current backend so the next initialize() builds a new one"""
+        self.backend = None
+        self._initialized = False
+
     def preload_models(self):
         """Initialize Google AI - no preloading needed for API"""
         self.initialize()
         logger.info("Google AI ready")
 
-    def get_model(self) -> Optional[genai.GenerativeModel]:
-        """Get the Gemini model instance"""
+    @property
+    def model(self):
+        return getattr(self.backend, "model", None)
+
+    def get_model(self):
+        """Get the Gemini model instance (None for non-Gemini backends)"""
         self.initialize()
         return self.model
 
-    @retry_on_failure(max_retries=3, delay=1.0)
-    def generate_content(self, prompt: str, **kwargs) -> str:
-        """Generate content using Gemini API with retry logic"""
-        self.initialize()
-        
-        # Validate input
-        if not prompt or not isinstance(prompt, str):
+    def _prepare(self, prompt: Prompt, kwargs) -> Tuple[Prompt, Dict]:
+        # Validate input; multimodal prompts are lists of parts
+        if not prompt or not isinstance(prompt, (str, list)):
             raise ValueError("Prompt must be a non-empty string")
-        
-        if len(prompt) > 30000:
+
+        if isinstance(prompt, str) and len(prompt) > 30000:
             logger.warning(f"Prompt too long ({len(prompt)} chars), truncating...")
             prompt = prompt[:30000]
-        
+
+        # Merge custom config with defaults
+        generation = {
+            key: kwargs.get(key, default) for key, default in self.generation_config.items()
+        }
+        return prompt, generation
+
+    @retry_on_failure(max_retries=3, delay=1.0)
+    def generate_content(self, prompt: Prompt, **kwargs) -> str:
+        """Generate content with retry logic"""
+        return self.generate_content_once(prompt, **kwargs)
+
+    def generate_content_once(self, prompt: Prompt, **kwargs) -> str:
+        """Generate content with a single model call (no retries)"""
+        self.initialize()
+        prompt, generation = self._prepare(prompt, kwargs)
+
         try:
-            # Merge custom config with defaults
-            # Extract attributes from GenerationConfig object
-            config_dict = {
-                'temperature': kwargs.get('temperature', self.generation_config.temperature),
-                'top_p': kwargs.get('top_p', self.generation_config.top_p),
-                'top_k': kwargs.get('top_k', self.generation_config.top_k),
-                'max_output_tokens': kwargs.get('max_output_tokens', self.generation_config.max_output_tokens),
-            }
-            
-            # Create a new GenerationConfig with merged settings
-            merged_config = GenerationConfig(**config_dict)
-            
-            response = self.model.generate_content(
-                prompt,
-                generation_config=merged_config,
-                request_options={"timeout": self.timeout}
-            )
-            
-            if not response or not response.text:
+            with model_call_timer("generate_content"):
+                text = self.backend.generate(prompt, generation, self.timeout)
+
+            if not text:
                 raise ValueError("Empty response from AI model")
-            
-            return response.text.strip()
-            
+
+            return text.strip()
+
         except Exception as e:
             logger.exception(f"Error generating content: {e}")
             raise
 
     @retry_on_failure(max_retries=2, delay=0.5)
     def generate_content_stream(self, prompt: str, **kwargs) -> Generator[str, None, None]:
-        """Generate content with streaming using Gemini API"""
+        """Generate content with streaming"""
         self.initialize()
-        
-        # Validate input
-        if not prompt or not isinstance(prompt, str):
-            raise ValueError("Prompt must be a non-empty string")
-        
-        if len(prompt) > 30000:
-            logger.warning(f"Prompt too long ({len(prompt)} chars), truncating...")
-            prompt = prompt[:30000]
-        
-        try:
-            # Merge custom config with defaults
-            # Extract attributes from GenerationConfig object
-            config_dict = {
-                'temperature': kwargs.get('temperature', self.generation_config.temperature),
-                'top_p': kwargs.get('top_p', self.generation_config.top_p),
-                'top_k': kwargs.get('top_k', self.generation_config.top_k),
-                'max_output_tokens': kwargs.get('max_output_tokens', self.generation_config.max_output_tokens),
-            }
-            
-            # Create a new GenerationConfig with merged settings
-            merged_config = GenerationConfig(**config_dict)
-            
-            response = self.model.generate_content(
-                prompt,
-                generation_config=merged_config,
-                stream=True,
-                request_options={"timeout": self.timeout}
-            )
-            
-            for chunk in response:
-                # Some streamed chunks may not contain text (e.g., prompt_feedback or
-                # final status-only candidates). Accessing chunk.text can raise when
-                # there's no valid Part, so guard it defensively.
-                try:
-                    text_delta = chunk.text  # quick accessor when available
-                except Exception:
-                    text_delta = None
+        prompt, generation = self._prepare(prompt, kwargs)
 
-                if text_delta:
+        try:
+            # Timed until the stream is exhausted (or the consumer stops reading)
+            with model_call_timer("generate_content_stream"):
+                for text_delta in self.backend.stream(prompt, generation, self.timeout):
                     yield text_delta
-                else:
-                    # Fallback: try extracting any text parts if present
-                    try:
-                        for cand in getattr(chunk, "candidates", []) or []:
-                            content = getattr(cand, "content", None)
-                            parts = getattr(content, "parts", []) if content else []
-                            for p in parts or []:
-                                t = getattr(p, "text", None)
-                                if t:
-                                    yield t
-                    except Exception:
-                        # Swallow silent non-text chunks
-                        pass
-                    
+
         except Exception as e:
             logger.exception(f"Error generating content stream: {e}")
             raise
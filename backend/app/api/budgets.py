@@ -7,11 +7,13 @@ from flask_login import login_required, current_user
 from app.api import bp
 from app.models import Budget, Expense
 from app import db
+from app.database import read_replica
 from app.security import (
     validate_amount, validate_category, sanitize_string,
     validate_positive_integer
 )
 from app.middleware import validate_json, log_slow_requests
+from app.utils.data_version import conditional_get
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func
 from datetime import datetime, date
@@ -260,8 +262,25 @@ def delete_budget(budget_id):
         abort(500, description="An error occurred")
 
 
+def budget_status(budget, spent):
+    """A month's budget with what was spent against it"""
+    percentage = (float(spent) / float(budget.amount) * 100) if budget.amount > 0 else 0
+    return {
+        'id': budget.id,
+        'category': budget.category,
+        'amount': float(budget.amount),
+        'month': budget.month,
+        'year': budget.year,
+        'spent': float(spent),
+        'remaining': float(budget.amount) - float(spent),
+        'percentage': round(percentage, 2),
+        'status': 'exceeded' if spent > budget.amount else 'on_track'
+    }
+
+
 @bp.route('/budgets/current', methods=['GET'])
 @login_required
+@conditional_get
 def get_current_budgets():
     """Get all budgets for current month with spending information"""
     try:
@@ -298,20 +317,7 @@ def get_current_budgets():
                 Expense.date <= end_date
             ).scalar() or 0
             
-            percentage = (float(spent) / float(budget.amount) * 100) if budget.amount > 0 else 0
-            remaining = float(budget.amount) - float(spent)
-            
-            result.append({
-                'id': budget.id,
-                'category': budget.category,
-                'amount': float(budget.amount),
-                'month': budget.month,
-                'year': budget.year,
-                'spent': float(spent),
-                'remaining': remaining,
-                'percentage': round(percentage, 2),
-                'status': 'exceeded' if spent > budget.amount else 'on_track'
-            })
+            result.append(budget_status(budget, spent))
         
         return jsonify({
             'budgets': result,
@@ -394,6 +400,7 @@ def get_budget_alerts():
 
 @bp.route('/budgets/statistics', methods=['GET'])
 @login_required
+@read_replica
 def get_budget_statistics():
     """Get budget statistics and trends"""
     try:
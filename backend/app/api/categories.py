@@ -5,9 +5,11 @@ API endpoints for custom category management
 from flask import jsonify, request, abort
 from flask_login import login_required, current_user
 from app.api import bp
-from app.models import Category
+from app.models import Category, User
 from app import db
 from app.security import sanitize_string
+from app.utils import category_cache
+from app.utils.data_version import conditional_get
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 import logging
 import re
@@ -30,6 +32,9 @@ DEFAULT_CATEGORIES = [
 def init_default_categories(user_id):
     """Initialize default categories for a new user"""
     try:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            user.categories_initialized = True
         for cat_data in DEFAULT_CATEGORIES:
             category = Category(
                 user_id=user_id,
@@ -41,20 +46,31 @@ def init_default_categories(user_id):
             )
             db.session.add(category)
         db.session.commit()
+        category_cache.invalidate(user_id)
         logger.info(f"Initialized default categories for user {user_id}")
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error initializing default categories: {e}")
 
 
+def ensure_default_categories(user):
+    """Seed the default categories unless the user already has categories"""
+    if user.categories_initialized:
+        return
+    if user.categories.count() == 0:
+        init_default_categories(user.id)
+    else:
+        user.categories_initialized = True
+        db.session.commit()
+
+
 @bp.route('/categories', methods=['GET'])
 @login_required
+@conditional_get
 def get_categories():
     """Get all categories for current user"""
     try:
-        # Check if user has categories, if not, initialize defaults
-        if current_user.categories.count() == 0:
-            init_default_categories(current_user.id)
+        ensure_default_categories(current_user)
         
         categories = Category.query.filter_by(user_id=current_user.id).order_by(Category.created_at).all()
         
@@ -114,6 +130,7 @@ def create_category():
         
         db.session.add(category)
         db.session.commit()
+        category_cache.invalidate(current_user.id)
         
         logger.info(f"Created category {slug} for user {current_user.id}")
         
@@ -161,6 +178,7 @@ def update_category(category_id):
         # Don't allow updating slug or is_default after creation
         
         db.session.commit()
+        category_cache.invalidate(current_user.id)
         
         logger.info(f"Updated category {category.slug} for user {current_user.id}")
         
@@ -198,6 +216,7 @@ def delete_category(category_id):
         # For now, we'll just delete the category
         db.session.delete(category)
         db.session.commit()
+        category_cache.invalidate(current_user.id)
         
         logger.info(f"Deleted category {category.slug} for user {current_user.id}")
         
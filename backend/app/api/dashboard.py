@@ -0,0 +1,147 @@
+"""
+Everything the dashboard page shows, in one request
+"""
+
+from calendar import monthrange
+from datetime import date, timedelta
+
+from flask import jsonify, request, abort
+from flask_login import login_required, current_user
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.api import bp
+from app.api.budgets import budget_status
+from app.api.routes import expense_to_dict, wallet_to_dict
+from app.database import read_replica
+from app.models import Budget, Expense, Notification, Wallet
+from app.utils.data_version import conditional_get
+import logging
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ("summary", "recent", "wallets", "budgets", "trends", "categories", "notifications")
+
+
+def _parse_sections(value):
+    if not value:
+        return set(SECTIONS)
+    sections = {s.strip() for s in value.split(",") if s.strip()}
+    unknown = sections - set(SECTIONS)
+    if unknown:
+        abort(400, description=f"Unknown sections: {', '.join(sorted(unknown))}")
+    return sections
+
+
+def _daily_totals(user_id, start, end):
+    """(is_expense, category, day, total, count) for expenses dated in [start, end).
+
+    One grouped query serves the daily trend, the category breakdown and
+    budget spending.
+    """
+    day = func.date(Expense.date).label("day")
+    rows = db.session.query(
+        Expense.is_expense, Expense.category, day, func.sum(Expense.amount), func.count(Expense.id)
+    ).filter(
+        Expense.user_id == user_id, Expense.date >= start, Expense.date < end
+    ).group_by(Expense.is_expense, Expense.category, day).all()
+    # func.date gives a string on SQLite and a date on Postgres
+    return [
+        (is_expense, category, date.fromisoformat(d) if isinstance(d, str) else d, float(total or 0), count)
+        for is_expense, category, d, total, count in rows
+    ]
+
+
+@bp.route('/dashboard/full', methods=['GET'])
+@login_required
+@read_replica
+@conditional_get
+def get_full_dashboard():
+    """Dashboard sections in one response; ``sections=`` picks a subset"""
+    try:
+        sections = _parse_sections(request.args.get('sections'))
+        days = request.args.get('days', 7, type=int)
+        days = max(1, min(days, 90))
+        recent_limit = request.args.get('recent', 5, type=int)
+        recent_limit = max(1, min(recent_limit, 50))
+
+        user_id = current_user.id
+        today = date.today()
+        trend_start = today - timedelta(days=days - 1)
+        month_start = today.replace(day=1)
+        month_end = today.replace(day=monthrange(today.year, today.month)[1])
+        result = {}
+
+        if sections & {"budgets", "trends", "categories"}:
+            buckets = _daily_totals(user_id, min(trend_start, month_start), month_end + timedelta(days=1))
+        wallets = None
+        if sections & {"summary", "wallets"}:
+            wallets = Wallet.query.filter_by(user_id=user_id).all()
+
+        if "summary" in sections:
+            totals = dict(db.session.query(Expense.is_expense, func.sum(Expense.amount)).filter(
+                Expense.user_id == user_id
+            ).group_by(Expense.is_expense).all())
+            result["summary"] = {
+                'totalIncome': float(totals.get(False) or 0),
+                'totalExpenses': float(totals.get(True) or 0),
+                'balance': sum(float(w.balance or 0) for w in wallets),
+            }
+
+        if "wallets" in sections:
+            result["wallets"] = [wallet_to_dict(w) for w in wallets]
+
+        if "recent" in sections:
+            recent = Expense.query.filter_by(user_id=user_id).order_by(
+                Expense.date.desc()
+            ).limit(recent_limit).all()
+            result["recent"] = [expense_to_dict(e) for e in recent]
+
+        if "trends" in sections:
+            by_day = {trend_start + timedelta(days=i): [0.0, 0.0, 0] for i in range(days)}
+            for is_expense, _, day, total, count in buckets:
+                if day in by_day:
+                    by_day[day][0 if is_expense else 1] += total
+                    by_day[day][2] += count
+            result["trends"] = [{
+                'date': day.isoformat(),
+                'expenses': expenses,
+                'income': income,
+                'net': income - expenses,
+                'count': count
+            } for day, (expenses, income, count) in by_day.items()]
+
+        if "categories" in sections:
+            by_category = {}
+            for is_expense, category, day, total, count in buckets:
+                if is_expense and trend_start <= day <= today:
+                    entry = by_category.setdefault(category, [0.0, 0])
+                    entry[0] += total
+                    entry[1] += count
+            result["categories"] = [
+                {'category': category, 'total': total, 'count': count}
+                for category, (total, count) in sorted(by_category.items())
+            ]
+
+        if "budgets" in sections:
+            spent = {}
+            for is_expense, category, day, total, _ in buckets:
+                if is_expense and month_start <= day:
+                    spent[category] = spent.get(category, 0.0) + total
+            budgets = Budget.query.filter_by(user_id=user_id, month=today.month, year=today.year).all()
+            result["budgets"] = {
+                'budgets': [budget_status(b, spent.get(b.category, 0.0)) for b in budgets],
+                'period': {'month': today.month, 'year': today.year}
+            }
+
+        if "notifications" in sections:
+            result["notifications"] = {
+                'unread': Notification.query.filter_by(user_id=user_id, is_read=False).count()
+            }
+
+        return jsonify(result), 200
+
+    except SQLAlchemyError as e:
+        logger.exception(f"Database error in full dashboard: {e}")
+        abort(500, description="Failed to load dashboard data")
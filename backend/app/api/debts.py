@@ -7,6 +7,7 @@ from flask_login import login_required, current_user
 from app.api import bp
 from app.models import Debt, DebtPayment, Wallet
 from app import db
+from app.database import read_replica
 from app.security import (
     validate_amount, sanitize_string,
     validate_positive_integer, validate_date
@@ -522,6 +523,7 @@ def get_upcoming_debts():
 
 @bp.route('/debts/statistics', methods=['GET'])
 @login_required
+@read_replica
 def get_debt_statistics():
     """Get debt statistics for current user"""
     try:
@@ -3,16 +3,20 @@
 API endpoints for expense management
 """
 
-from flask import jsonify, request, abort, Response
+from flask import jsonify, request, abort, Response, current_app, stream_with_context
 from flask_login import login_required, current_user
 from app.api import bp
 from app.models import Expense, Wallet
 from app import db
+from app.database import read_replica
 from app.security import (
     validate_amount, validate_category, sanitize_string,
     validate_positive_integer, validate_date
 )
 from app.middleware import validate_json, log_slow_requests
+from app.utils import search as expense_search
+from app.utils.rate_limit import rate_limited
+from app.utils.data_version import conditional_get
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 from decimal import Decimal
@@ -20,7 +24,6 @@ import csv
 from io import StringIO
 from io import BytesIO
 import logging
-import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -116,6 +119,8 @@ def create_expense():
 @login_required
 def export_expenses_xlsx():
     """Export expenses based on filters as XLSX"""
+    import pandas as pd  # heavy; only needed for Excel files
+
     try:
         # Build query same as CSV export
         query = Expense.query.filter_by(user_id=current_user.id)
@@ -152,7 +157,7 @@ def export_expenses_xlsx():
 
         description = request.args.get('description')
         if description:
-            query = query.filter(Expense.description.ilike(f'%{description}%'))
+            query, _ = expense_search.filter_query(query, current_user.id, description)
 
         sort_by = request.args.get('sort_by', 'date')
         sort_order = request.args.get('sort_order', 'desc')
@@ -169,7 +174,8 @@ def export_expenses_xlsx():
         else:
             query = query.order_by(order_col.desc())
 
-        rows = query.all()
+        # Stream in batches (server-side cursor on Postgres) instead of loading everything
+        rows = query.yield_per(current_app.config['EXPORT_YIELD_PER'])
 
         # Build DataFrame
         data = [{
@@ -204,8 +210,11 @@ def export_expenses_xlsx():
 
 @bp.route('/expenses/import_xlsx', methods=['POST'])
 @login_required
+@rate_limited("import")
 def import_expenses_xlsx():
     """Import expenses from an XLSX file. Expected columns (case-insensitive): Amount, Type/IsExpense, Category, Description, Date, WalletID"""
+    import pandas as pd  # heavy; only needed for Excel files
+
     try:
         if 'file' not in request.files:
             abort(400, description="No file part")
@@ -545,10 +554,11 @@ def search_expenses():
         if max_amount is not None:
             query = query.filter(Expense.amount <= max_amount)
         
-        # Description search
+        # Description search (full-text, accent-insensitive, prefix match)
+        rank = None
         description = request.args.get('description')
         if description:
-            query = query.filter(Expense.description.ilike(f'%{description}%'))
+            query, rank = expense_search.filter_query(query, current_user.id, description)
         
         # Sort options
         sort_by = request.args.get('sort_by', 'date')
@@ -558,6 +568,8 @@ def search_expenses():
             order_col = Expense.amount
         elif sort_by == 'category':
             order_col = Expense.category
+        elif sort_by == 'relevance' and rank is not None:
+            order_col = -rank  # lower rank is a better match, so desc = best first
         else:
             order_col = Expense.date
         
@@ -602,6 +614,8 @@ def search_expenses():
 
 @bp.route('/expenses/statistics', methods=['GET'])
 @login_required
+@read_replica
+@conditional_get
 def get_expense_statistics():
     """Get comprehensive expense statistics"""
     try:
@@ -716,6 +730,8 @@ def get_expense_statistics():
 
 @bp.route('/expenses/trends', methods=['GET'])
 @login_required
+@read_replica
+@conditional_get
 def get_expense_trends():
     """Get expense trends over time"""
     try:
@@ -878,7 +894,7 @@ def export_expenses_csv():
 
         description = request.args.get('description')
         if description:
-            query = query.filter(Expense.description.ilike(f'%{description}%'))
+            query, _ = expense_search.filter_query(query, current_user.id, description)
 
         sort_by = request.args.get('sort_by', 'date')
         sort_order = request.args.get('sort_order', 'desc')
@@ -895,26 +911,49 @@ def export_expenses_csv():
         else:
             query = query.order_by(order_col.desc())
 
-        rows = query.all()
-
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['id', 'amount', 'is_expense', 'category', 'description', 'date', 'wallet_id'])
-        for e in rows:
-            writer.writerow([
-                e.id,
-                float(e.amount),
-                'true' if e.is_expense else 'false',
-                e.category,
-                sanitize_string(e.description, max_length=500) if e.description else '',
-                e.date.isoformat() if e.date else '',
-                e.wallet_id,
-            ])
-
-        csv_data = output.getvalue()
+        # Stream in batches (server-side cursor on Postgres) instead of loading everything
+        rows = query.yield_per(current_app.config['EXPORT_YIELD_PER'])
+
+        def generate():
+            # Flushed every batch so the response (and its gzip stream) starts
+            # before the last row is read
+            output = StringIO()
+            writer = csv.writer(output)
+            writer.writerow(['id', 'amount', 'is_expense', 'category', 'description', 'date', 'wallet_id'])
+            for i, e in enumerate(rows, 1):
+                writer.writerow([
+                    e.id,
+                    float(e.amount),
+                    'true' if e.is_expense else 'false',
+                    e.category,
+                    sanitize_string(e.description, max_length=500) if e.description else '',
+                    e.date.isoformat() if e.date else '',
+                    e.wallet_id,
+                ])
+                if i % batch_size == 0:
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            yield output.getvalue()
+
+        batch_size = current_app.config['EXPORT_YIELD_PER']
+        chunks = generate()
+        # Runs the query and the first batch here, so early failures still
+        # become a 500 below
+        first = next(chunks)
+
+        def stream():
+            yield first
+            try:
+                yield from chunks
+            except Exception as e:
+                # The 200 is already sent: log it and cut the download short
+                logger.exception(f"Error streaming expense export: {e}")
+                raise
+
         filename = f"expenses_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
         return Response(
-            csv_data,
+            stream_with_context(stream()),
             mimetype='text/csv',
             headers={
                 'Content-Disposition': f'attachment; filename={filename}'
@@ -930,6 +969,7 @@ def export_expenses_csv():
 
 @bp.route('/expenses/import', methods=['POST'])
 @login_required
+@rate_limited("import")
 def import_expenses_csv():
     """Import expenses from a CSV file. Headers: amount,is_expense,category,description,date,wallet_id"""
     try:
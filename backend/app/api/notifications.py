@@ -3,6 +3,7 @@ from flask_login import login_required, current_user
 from app.api import bp
 from app.models import Notification
 from app import db
+from app.utils.data_version import conditional_get
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
@@ -11,6 +12,7 @@ logger = logging.getLogger(__name__)
 
 @bp.route("/notifications", methods=["GET"])
 @login_required
+@conditional_get
 def get_notifications():
     """Return current user's notifications as JSON with pagination"""
     try:
@@ -61,6 +63,7 @@ def get_notifications():
 
 @bp.route("/notifications/unread_count", methods=["GET"])
 @login_required
+@conditional_get
 def get_unread_notifications_count():
     """Return unread notifications count for current user"""
     try:
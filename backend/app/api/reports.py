@@ -7,9 +7,10 @@ from flask_login import login_required, current_user
 from app.api import bp
 from app.models import Expense, Wallet, Budget
 from app import db
+from app.database import read_replica
 from app.security import sanitize_string
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, extract
+from sqlalchemy import func, extract, case
 from datetime import datetime, date, timedelta
 from calendar import monthrange
 import logging
@@ -19,6 +20,7 @@ logger = logging.getLogger(__name__)
 
 @bp.route('/reports/monthly', methods=['GET'])
 @login_required
+@read_replica
 def get_monthly_report():
     """Get comprehensive monthly report"""
     try:
@@ -102,8 +104,8 @@ def get_monthly_report():
         # Daily breakdown
         daily_breakdown = db.session.query(
             func.date(Expense.date).label('date'),
-            func.sum(func.case((Expense.is_expense == True, Expense.amount), else_=0)).label('expenses'),
-            func.sum(func.case((Expense.is_expense == False, Expense.amount), else_=0)).label('income')
+            func.sum(case((Expense.is_expense == True, Expense.amount), else_=0)).label('expenses'),
+            func.sum(case((Expense.is_expense == False, Expense.amount), else_=0)).label('income')
         ).filter(
             Expense.user_id == current_user.id,
             Expense.date >= start_date,
@@ -137,7 +139,7 @@ def get_monthly_report():
             } for e in top_expenses],
             'budget_comparison': budget_comparison,
             'daily_breakdown': [{
-                'date': d.isoformat() if d else None,
+                'date': str(d) if d else None,  # SQLite returns DATE() as text
                 'expenses': float(expenses),
                 'income': float(income),
                 'net': float(income) - float(expenses)
@@ -154,6 +156,7 @@ def get_monthly_report():
 
 @bp.route('/reports/comparison', methods=['GET'])
 @login_required
+@read_replica
 def get_comparison_report():
     """Compare spending across multiple months"""
     try:
@@ -257,6 +260,7 @@ def get_comparison_report():
 
 @bp.route('/reports/yearly', methods=['GET'])
 @login_required
+@read_replica
 def get_yearly_report():
     """Get comprehensive yearly report"""
     try:
@@ -287,8 +291,8 @@ def get_yearly_report():
         # Monthly breakdown
         monthly_breakdown = db.session.query(
             extract('month', Expense.date).label('month'),
-            func.sum(func.case((Expense.is_expense == True, Expense.amount), else_=0)).label('expenses'),
-            func.sum(func.case((Expense.is_expense == False, Expense.amount), else_=0)).label('income')
+            func.sum(case((Expense.is_expense == True, Expense.amount), else_=0)).label('expenses'),
+            func.sum(case((Expense.is_expense == False, Expense.amount), else_=0)).label('income')
         ).filter(
             Expense.user_id == current_user.id,
             Expense.date >= start_date,
@@ -358,6 +362,7 @@ def get_yearly_report():
 
 @bp.route('/reports/category/<category>', methods=['GET'])
 @login_required
+@read_replica
 def get_category_report(category):
     """Get detailed report for a specific category"""
     try:
@@ -1,4 +1,4 @@
-from flask import jsonify, request, abort
+from flask import current_app, jsonify, request, abort
 from flask_login import login_required, current_user
 from app.api import bp
 from app.models import Expense, Wallet, Budget, User
@@ -7,13 +7,40 @@ from app.security import (
     validate_amount, validate_category, sanitize_string,
     validate_positive_integer, validate_date
 )
-from app.utils.ai_invoice_extractor import ai_invoice_extractor
+from app.utils.ocr import get_receipt_ocr
+from app.utils.receipt_extractor import get_receipt_extractor
+from app.utils import receipt_cache
+from app.utils.rate_limit import rate_limited
+from app.utils.data_version import conditional_get
 from sqlalchemy.exc import SQLAlchemyError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def expense_to_dict(e):
+    return {
+        'id': e.id,
+        'amount': float(e.amount),
+        'category': e.category,
+        'description': sanitize_string(e.description, max_length=500),
+        'date': e.date.isoformat() if e.date else None,
+        'wallet_id': e.wallet_id,
+        'is_expense': getattr(e, 'is_expense', True)
+    }
+
+
+def wallet_to_dict(w):
+    return {
+        'id': w.id,
+        'name': sanitize_string(w.name, max_length=100),
+        'balance': float(w.balance),
+        'currency': getattr(w, 'currency', 'VND'),
+        'description': getattr(w, 'description', '') or '',
+        'is_default': getattr(w, 'is_default', False)
+    }
+
+
 @bp.route('/auth/me')
 @login_required
 def get_current_user():
@@ -34,6 +61,7 @@ def get_current_user():
 
 @bp.route('/dashboard')
 @login_required
+@conditional_get
 def get_dashboard():
     """Get dashboard statistics"""
     try:
@@ -97,6 +125,7 @@ def get_dashboard():
 
 @bp.route('/expenses')
 @login_required
+@conditional_get
 def get_expenses():
     """Get all expenses for current user with pagination"""
     try:
@@ -116,15 +145,7 @@ def get_expenses():
         )
         
         return jsonify({
-            'expenses': [{
-                'id': e.id,
-                'amount': float(e.amount),
-                'category': e.category,
-                'description': sanitize_string(e.description, max_length=500),
-                'date': e.date.isoformat() if e.date else None,
-                'wallet_id': e.wallet_id,
-                'is_expense': getattr(e, 'is_expense', True)
-            } for e in pagination.items],
+            'expenses': [expense_to_dict(e) for e in pagination.items],
             'pagination': {
                 'page': page,
                 'per_page': per_page,
@@ -143,20 +164,14 @@ def get_expenses():
 
 @bp.route('/wallets')
 @login_required
+@conditional_get
 def get_wallets():
     """Get all wallets for current user"""
     try:
         wallets = Wallet.query.filter_by(user_id=current_user.id).all()
         
         return jsonify({
-            'wallets': [{
-                'id': w.id,
-                'name': sanitize_string(w.name, max_length=100),
-                'balance': float(w.balance),
-                'currency': getattr(w, 'currency', 'VND'),
-                'description': getattr(w, 'description', '') or '',
-                'is_default': getattr(w, 'is_default', False)
-            } for w in wallets]
+            'wallets': [wallet_to_dict(w) for w in wallets]
         }), 200
         
     except SQLAlchemyError as e:
@@ -169,6 +184,7 @@ def get_wallets():
 
 @bp.route('/budgets')
 @login_required
+@conditional_get
 def get_budgets():
     """Get all budgets for current user"""
     try:
@@ -194,8 +210,9 @@ def get_budgets():
 
 @bp.route('/process_receipt', methods=['POST'])
 @login_required
+@rate_limited("ai")
 def process_receipt():
-    """Process receipt image using OCR"""
+    """Extract receipt fields: local OCR first, Gemini Vision when unsure"""
     try:
         if 'receipt' not in request.files:
             return jsonify({
@@ -231,12 +248,12 @@ def process_receipt():
                 'error': f'Error reading file: {str(e)}'
             }), 400
 
-        # Use Gemini AI extraction (only method)
         result = None
         
         try:
-            result = ai_invoice_extractor.extract_from_image(file_content)
-            logger.info("AI extraction successful")
+            extractor = get_receipt_extractor()
+            result = receipt_cache.cached_extraction(file_content, extractor.mode, extractor.extract)
+            logger.info(f"Receipt extracted by {result.get('method', 'ai')}")
             
             # Check if extraction returned an error
             if result.get('error'):
@@ -337,7 +354,9 @@ def process_receipt():
             'invoice_number': result.get('invoice_number'),
             'suggested_category': suggested_category,
             'text': result.get('text', ''),
-            'method': 'ai'  # Always using AI (Gemini)
+            'method': result.get('method', 'ai'),  # Tier that answered: 'ocr' or 'ai'
+            'tiers': result.get('tiers', []),
+            'cached': result.get('cached', False)
         }), 200
 
     except Exception as e:
@@ -346,3 +365,80 @@ def process_receipt():
             'success': False,
             'error': 'Không thể xử lý ảnh'
         }), 500
+
+
+@bp.route('/process_receipts', methods=['POST'])
+@login_required
+@rate_limited("ai")
+def process_receipts():
+    """OCR several receipt images concurrently"""
+    files = [f for f in request.files.getlist('receipts') if f.filename]
+    if not files:
+        return jsonify({
+            'success': False,
+            'error': 'Không tìm thấy ảnh'
+        }), 400
+
+    max_files = current_app.config['OCR_BATCH_MAX_FILES']
+    if len(files) > max_files:
+        return jsonify({
+            'success': False,
+            'error': f'Chỉ xử lý tối đa {max_files} ảnh mỗi lần'
+        }), 400
+
+    use_cache = current_app.config['RECEIPT_CACHE_ENABLED']
+    results = [None] * len(files)
+    images, positions, keys = [], [], []
+    try:
+        for position, file in enumerate(files):
+            if not file.filename.lower().endswith(('.jpg', '.jpeg', '.png')):
+                results[position] = {'error': 'Chỉ hỗ trợ file ảnh (.jpg, .png)'}
+                continue
+            image_data = file.read()
+            if use_cache:
+                cached, digest, phash = receipt_cache.lookup(image_data, 'ocr')
+                if cached is not None:
+                    results[position] = cached
+                    continue
+                keys.append((digest, phash))
+            images.append(image_data)
+            positions.append(position)
+
+        for index, result in enumerate(get_receipt_ocr().process_images(images)):
+            results[positions[index]] = result
+            if use_cache:
+                digest, phash = keys[index]
+                receipt_cache.store(images[index], 'ocr', result, digest=digest, phash=phash)
+    except Exception as e:
+        logger.exception(f"Error processing receipts: {e}")
+        return jsonify({
+            'success': False,
+            'error': 'Không thể xử lý ảnh'
+        }), 500
+
+    items = []
+    for file, result in zip(files, results):
+        if result.get('error'):
+            items.append({'filename': file.filename, 'success': False, 'error': result['error']})
+            continue
+        items.append({
+            'filename': file.filename,
+            'success': True,
+            'amount': result['amount'],
+            # Cached results carry the date as the ISO string it was stored as
+            'date': result['date'].isoformat() if hasattr(result['date'], 'isoformat') else result['date'],
+            'fee': result['fee'],
+            'note': result['note'],
+            'text': result['text'],
+            'method': 'ocr',
+            'cached': result.get('cached', False),
+        })
+
+    return jsonify({'success': True, 'results': items}), 200
+
+
+@bp.route('/receipt_cache/stats')
+@login_required
+def get_receipt_cache_stats():
+    """Receipt extraction cache usage for the current user"""
+    return jsonify(receipt_cache.cache_stats(current_user.id)), 200
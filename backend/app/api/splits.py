@@ -1,7 +1,10 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, current_app
 from flask_login import login_required, current_user
 from app import db
 from app.models import SplitGroup, SplitMember, ExpenseSplit, Expense, User
+from app.utils import settlement
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, selectinload
 from datetime import datetime, date
 
 bp = Blueprint('splits', __name__, url_prefix='/api/splits')
@@ -10,7 +13,11 @@ bp = Blueprint('splits', __name__, url_prefix='/api/splits')
 @login_required
 def get_groups():
     """Get all split groups created by the user"""
-    groups = SplitGroup.query.filter_by(created_by=current_user.id).all()
+    groups = (
+        SplitGroup.query.filter_by(created_by=current_user.id)
+        .options(selectinload(SplitGroup.members))
+        .all()
+    )
     
     result = []
     for group in groups:
@@ -119,75 +126,148 @@ def add_member(id):
         }
     }), 201
 
-@bp.route('/owed', methods=['GET'])
+@bp.route('/groups/<int:id>/settlement', methods=['GET'])
 @login_required
-def get_owed():
-    """Get total amount owed to the current user"""
-    # Find all expenses created by user that have splits
-    expenses = Expense.query.filter_by(user_id=current_user.id).all()
-    expense_ids = [e.id for e in expenses]
-    
-    if not expense_ids:
-        return jsonify({'total_owed': 0, 'details': []})
-        
-    # Find unpaid splits for these expenses
-    splits = ExpenseSplit.query.filter(
-        ExpenseSplit.expense_id.in_(expense_ids),
-        ExpenseSplit.is_paid == False
-    ).all()
-    
-    total_owed = sum(s.amount for s in splits)
-    
-    details = []
-    for s in splits:
-        details.append({
-            'id': s.id,
-            'amount': s.amount,
-            'expense_name': s.expense.description or s.expense.category,
-            'expense_date': s.expense.date.isoformat(),
-            'debtor_name': s.member.name,
-            'group_name': s.member.group.name
+def get_settlement(id):
+    """Net balances of a group and the transfers that settle them"""
+    group = SplitGroup.query.options(selectinload(SplitGroup.members)).get_or_404(id)
+
+    if group.created_by != current_user.id and not any(m.user_id == current_user.id for m in group.members):
+        return jsonify({'error': 'Không có quyền truy cập'}), 403
+
+    method = request.args.get('method', 'auto')
+    balances, participants = settlement.group_balances(group)
+    try:
+        method, transfers = settlement.settle(
+            balances, method, current_app.config['SETTLEMENT_EXACT_MAX_PARTICIPANTS']
+        )
+    except ValueError as e:
+        return jsonify({'error': 'Phương thức thanh toán không hợp lệ', 'detail': str(e)}), 400
+
+    return jsonify({
+        'group_id': group.id,
+        'method': method,
+        'balances': [
+            {**participants[key], 'balance': cents / 100}
+            for key, cents in balances.items()
+        ],
+        'transfers': [
+            {
+                'from_member_id': participants[from_key]['member_id'],
+                'from_name': participants[from_key]['name'],
+                'to_member_id': participants[to_key]['member_id'],
+                'to_user_id': participants[to_key]['user_id'],
+                'to_name': participants[to_key]['name'],
+                'amount': cents / 100,
+            }
+            for from_key, to_key, cents in transfers
+        ],
+        'total_outstanding': sum(c for c in balances.values() if c > 0) / 100,
+    })
+
+def _unpaid_splits():
+    return (
+        ExpenseSplit.query
+        .join(Expense, Expense.id == ExpenseSplit.expense_id)
+        .join(SplitMember, SplitMember.id == ExpenseSplit.member_id)
+        .filter(ExpenseSplit.is_paid == False)
+    )
+
+
+def _split_listing(query, total_key, detail, with_creditor=False):
+    """Totals with one aggregate query, then one page of details
+
+    ``?summary=true`` returns only the totals, broken down per group.
+    """
+    if request.args.get('summary', 'false').lower() == 'true':
+        groups = (
+            query.join(SplitGroup, SplitGroup.id == SplitMember.group_id)
+            .with_entities(SplitGroup.id, SplitGroup.name,
+                           func.sum(ExpenseSplit.amount), func.count(ExpenseSplit.id))
+            .group_by(SplitGroup.id, SplitGroup.name)
+            .order_by(SplitGroup.name)
+            .all()
+        )
+        return jsonify({
+            total_key: sum(total for _, _, total, _ in groups),
+            'count': sum(count for _, _, _, count in groups),
+            'groups': [
+                {'group_id': gid, 'group_name': name, 'total': total, 'count': count}
+                for gid, name, total, count in groups
+            ],
         })
-        
+
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 50, type=int), 100)  # Max 100 per page
+    if page < 1 or per_page < 1:
+        return jsonify({'error': 'Tham số phân trang không hợp lệ'}), 400
+
+    total, count = query.with_entities(
+        func.coalesce(func.sum(ExpenseSplit.amount), 0), func.count(ExpenseSplit.id)
+    ).one()
+
+    details = []
+    if count:
+        page_query = query.options(
+            contains_eager(ExpenseSplit.expense),
+            contains_eager(ExpenseSplit.member).selectinload(SplitMember.group),
+        )
+        if with_creditor:
+            # The person who paid is the expense owner
+            page_query = page_query.join(User, User.id == Expense.user_id).add_columns(User.username)
+        page_query = (
+            page_query.order_by(Expense.date.desc(), ExpenseSplit.id.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+        rows = page_query.all() if with_creditor else [(s, None) for s in page_query.all()]
+        details = [detail(s, creditor) for s, creditor in rows]
+
     return jsonify({
-        'total_owed': total_owed,
-        'details': details
+        total_key: total,
+        'details': details,
+        'pagination': {
+            'page': page,
+            'per_page': per_page,
+            'total': count,
+            'pages': -(-count // per_page),
+        },
     })
 
+
+def _detail(s):
+    return {
+        'id': s.id,
+        'amount': s.amount,
+        'expense_name': s.expense.description or s.expense.category,
+        'expense_date': s.expense.date.isoformat(),
+        'group_name': s.member.group.name,
+    }
+
+
+@bp.route('/owed', methods=['GET'])
+@login_required
+def get_owed():
+    """Get total amount owed to the current user"""
+    # Unpaid splits of expenses the user paid for
+    query = _unpaid_splits().filter(Expense.user_id == current_user.id)
+    return _split_listing(
+        query, 'total_owed',
+        lambda s, _: {**_detail(s), 'debtor_name': s.member.name},
+    )
+
+
 @bp.route('/owing', methods=['GET'])
 @login_required
 def get_owing():
     """Get total amount the current user owes others"""
-    # Find all split memberships for this user
-    memberships = SplitMember.query.filter_by(user_id=current_user.id).all()
-    member_ids = [m.id for m in memberships]
-    
-    if not member_ids:
-        return jsonify({'total_owing': 0, 'details': []})
-        
-    # Find unpaid splits where this user is the member
-    splits = ExpenseSplit.query.filter(
-        ExpenseSplit.member_id.in_(member_ids),
-        ExpenseSplit.is_paid == False
-    ).all()
-    
-    total_owing = sum(s.amount for s in splits)
-    
-    details = []
-    for s in splits:
-        details.append({
-            'id': s.id,
-            'amount': s.amount,
-            'expense_name': s.expense.description or s.expense.category,
-            'expense_date': s.expense.date.isoformat(),
-            'creditor_name': s.expense.wallet.user.username, # The person who paid
-            'group_name': s.member.group.name
-        })
-        
-    return jsonify({
-        'total_owing': total_owing,
-        'details': details
-    })
+    # Unpaid splits where the user is the member
+    query = _unpaid_splits().filter(SplitMember.user_id == current_user.id)
+    return _split_listing(
+        query, 'total_owing',
+        lambda s, creditor: {**_detail(s), 'creditor_name': creditor},
+        with_creditor=True,
+    )
 
 @bp.route('/<int:id>/settle', methods=['POST'])
 @login_required
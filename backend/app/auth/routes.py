@@ -1,10 +1,10 @@
 from flask import jsonify, render_template, redirect, url_for, flash, request
 from flask_login import login_required, login_user, logout_user, current_user
 from app import db
-from werkzeug.security import generate_password_hash
 from app.auth import bp
 from app.auth.forms import LoginForm, RegistrationForm
 from app.models import User
+from app.utils.rate_limit import rate_limited
 from sqlalchemy.exc import OperationalError
 import time
 import logging
@@ -13,6 +13,7 @@ logger = logging.getLogger(__name__)
 
 
 @bp.route("/login", methods=["GET", "POST"])
+@rate_limited("auth", methods=("POST",))
 def login():
     if current_user.is_authenticated:
         # Handle JSON requests from React
@@ -38,7 +39,8 @@ def login():
         user = User.query.filter_by(username=username).first()
         if user is None or not user.check_password(password):
             return jsonify({"message": "Tên đăng nhập hoặc mật khẩu không đúng"}), 401
-        
+        db.session.commit()  # saves a rehashed password, if check_password upgraded it
+
         login_user(user, remember=data.get('remember', False))
         return jsonify({
             "message": "Đăng nhập thành công",
@@ -59,6 +61,7 @@ def login():
                     "auth/_login_content.html", form=form
                 )  # Return form + error for AJAX
             return redirect(url_for("auth.login"))
+        db.session.commit()  # saves a rehashed password, if check_password upgraded it
 
         login_user(user, remember=form.remember_me.data)  # Use remember_me
         if request.headers.get("X-Requested-With") == "XMLHttpRequest":
@@ -72,6 +75,7 @@ def login():
 
 
 @bp.route("/register", methods=["GET", "POST"])
+@rate_limited("auth", methods=("POST",))
 def register():
     if current_user.is_authenticated:
         if request.is_json:
@@ -18,3 +18,34 @@ def create_tables_command():
     """Create new tables without dropping existing ones."""
     db.create_all()
     click.echo("Tables created.")
+
+
+@click.command("flush-outbox")
+@with_appcontext
+def flush_outbox_command():
+    """Deliver all due emails in the outbox now."""
+    from app.utils.email import process_outbox
+
+    total = {"messages": 0, "sent": 0, "failed": 0}
+    while True:
+        stats = process_outbox()
+        for key in total:
+            total[key] += stats[key]
+        if not stats["sent"] and not stats["failed"]:
+            break
+    click.echo(
+        f"Sent {total['sent']} emails in {total['messages']} messages, "
+        f"{total['failed']} failed."
+    )
+
+
+@click.command("rebuild-search-index")
+@click.option("--batch-size", default=5000, show_default=True, help="Expenses indexed per statement.")
+@with_appcontext
+def rebuild_search_index_command(batch_size):
+    """Rebuild the full-text expense search index from scratch."""
+    from app.utils.search import rebuild_index
+
+    with db.engine.begin() as connection:
+        total = rebuild_index(connection, batch_size=batch_size)
+    click.echo(f"Indexed {total} expenses.")
@@ -1,43 +1,142 @@
+import time
+from functools import wraps
+
+from flask import current_app, g, has_request_context, session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
 from flask_login import LoginManager
 from flask_mail import Mail
 from flask_moment import Moment
-from sqlalchemy import event
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+
+class RoutingSession(Session):
+    """Sends SELECTs to the read replica inside ``@read_replica`` views"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+            and has_request_context()
+            and g.get("use_read_replica")
+        ):
+            return current_app.extensions["read_replica"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 mail = Mail()
 moment = Moment()
 
 
+def engine_options(config):
+    """Engine options for the configured database URL.
+
+    SQLite gets thread-sharing connect args; Postgres gets the pool settings
+    and a per-statement timeout. ``SQLALCHEMY_ENGINE_OPTIONS`` from the config
+    is merged on top, so anything set there wins.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = {
+        "pool_pre_ping": True,
+        "pool_recycle": config.get("DB_POOL_RECYCLE", 300),
+    }
+
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {
+            "timeout": 30,
+            "check_same_thread": False,
+        }
+        if url.database and url.database != ":memory:":
+            options["pool_size"] = config.get("DB_POOL_SIZE", 10)
+            options["max_overflow"] = config.get("DB_MAX_OVERFLOW", 20)
+    else:
+        options["pool_size"] = config.get("DB_POOL_SIZE", 10)
+        options["max_overflow"] = config.get("DB_MAX_OVERFLOW", 20)
+        options["pool_timeout"] = config.get("DB_POOL_TIMEOUT", 30)
+        if url.get_backend_name() == "postgresql":
+            timeout = config.get("DB_STATEMENT_TIMEOUT", 30000)
+            if timeout:
+                options["connect_args"] = {"options": f"-c statement_timeout={int(timeout)}"}
+
+    overrides = dict(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if "connect_args" in overrides:
+        overrides["connect_args"] = {**options.get("connect_args", {}), **overrides["connect_args"]}
+    options.update(overrides)
+    return options
+
+
+def _sqlite_pragma_listener(pragmas):
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+
+    return set_sqlite_pragma
+
+
+def _recent_write():
+    """True when this client wrote within the replica staleness tolerance"""
+    last_write = session.get("_last_write")
+    return last_write is not None and time.time() - last_write < current_app.config["DATABASE_READ_MAX_LAG"]
+
+
+def read_replica(f):
+    """Run a read-only view's queries on ``DATABASE_READ_URL`` when configured.
+
+    Falls back to the primary when no replica is set up, or when the client
+    wrote less than ``DATABASE_READ_MAX_LAG`` seconds ago (read-your-writes).
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "read_replica" not in current_app.extensions or _recent_write():
+            return f(*args, **kwargs)
+        g.use_read_replica = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.pop("use_read_replica", None)
+    return decorated_function
+
+
+def _remember_write(db_session, flush_context, instances):
+    if has_request_context() and (db_session.new or db_session.dirty or db_session.deleted):
+        session["_last_write"] = time.time()
+
+
 def init_db(app):
     """Initialize database with optimized settings"""
 
     # Configure database options
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_size": 10,
-        "pool_recycle": 120,
-        "pool_pre_ping": True,
-        "connect_args": {
-            "timeout": 30,
-            "check_same_thread": False,  
-        },
-    }
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
 
     # Initialize database
     db.init_app(app)
 
-    # Setup SQLite optimizations within app context
     with app.app_context():
+        engines = [db.engine]
 
-        def set_sqlite_pragma(dbapi_connection, connection_record):
-            cursor = dbapi_connection.cursor()
-            cursor.execute("PRAGMA journal_mode=WAL")
-            cursor.execute(
-                "PRAGMA busy_timeout=10000"
-            ) 
-            cursor.close()
+    # Replica engine for @read_replica views; kept outside SQLALCHEMY_BINDS
+    # because no model is bound to it (create_all/drop_all must skip it)
+    read_url = app.config.get("DATABASE_READ_URL")
+    if read_url:
+        replica_config = dict(app.config, SQLALCHEMY_DATABASE_URI=read_url)
+        replica = create_engine(read_url, **engine_options(replica_config))
+        app.extensions["read_replica"] = replica
+        engines.append(replica)
+        if not event.contains(db.session, "before_flush", _remember_write):
+            event.listen(db.session, "before_flush", _remember_write)
 
-        # Register the event listener
-        event.listen(db.engine, "connect", set_sqlite_pragma)
+    # Setup SQLite optimizations
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    for engine in engines:
+        if engine.dialect.name == "sqlite":
+            # Register the event listener
+            event.listen(engine, "connect", _sqlite_pragma_listener(pragmas))
@@ -1,3 +1,4 @@
+import math
 import threading
 import logging
 from flask import (
@@ -30,10 +31,15 @@ from app.utils.static_analysis import (
 from app.utils import format_currency, get_date_range, calculate_statistics
 from app.utils.export import export_expenses_to_excel
 from app.utils.notifications import NotificationManager
-from app.utils.ai_invoice_extractor import ai_invoice_extractor
+from app.utils.live import LIVE_NAMESPACE
+from app.utils.lifecycle import is_draining, track_stream
+from app.utils import rate_limit
+from app.utils.data_version import conditional_get
+from app.utils.rate_limit import rate_limited
+from app.utils import receipt_cache
+from app.utils.receipt_extractor import get_receipt_extractor
 import json
 from datetime import datetime, timedelta
-import pandas as pd
 from io import BytesIO
 import uuid
 import base64
@@ -258,8 +264,9 @@ def expenses():
 
 @bp.route("/process_receipt", methods=["POST"])
 @login_required
+@rate_limited("ai")
 def process_receipt():
-    """Process receipt image using Gemini AI"""
+    """Process receipt image: local OCR first, Gemini AI when unsure"""
     if "receipt" not in request.files:
         return jsonify({"success": False, "error": "Không tìm thấy ảnh"}), 400
 
@@ -272,8 +279,9 @@ def process_receipt():
         if not file_content or len(file_content) == 0:
             return jsonify({"success": False, "error": "File is empty or could not be read"}), 400
 
-        # Use Gemini AI extraction
-        result = ai_invoice_extractor.extract_from_image(file_content)
+        # Local OCR first, Gemini Vision when unsure (re-uploads come from the cache)
+        extractor = get_receipt_extractor()
+        result = receipt_cache.cached_extraction(file_content, extractor.mode, extractor.extract)
         
         # Check for errors
         if result.get("error"):
@@ -301,7 +309,9 @@ def process_receipt():
             "invoice_number": result.get("invoice_number"),
             "suggested_category": result.get("suggested_category"),
             "text": result.get("text", ""),
-            "method": "ai"
+            "method": result.get("method", "ai"),
+            "tiers": result.get("tiers", []),
+            "cached": result.get("cached", False)
         }), 200
     except ValueError as ve:
         error_msg = str(ve)
@@ -503,6 +513,22 @@ def handle_disconnect():
         logger.info(f"Client disconnected: {request.sid}")
 
 
+@socketio.on("connect", namespace=LIVE_NAMESPACE)
+def handle_live_connect():
+    # Server-push channel for notifications, wallet balances and budget alerts
+    if not current_user.is_authenticated:
+        logger.warning(f"Unauthorized live connection attempt: {request.sid}")
+        return False
+    join_room(str(current_user.id))
+    emit("connected", {"status": "connected", "user_id": current_user.id})
+
+
+@socketio.on("disconnect", namespace=LIVE_NAMESPACE)
+def handle_live_disconnect():
+    if current_user.is_authenticated:
+        leave_room(str(current_user.id))
+
+
 @socketio.on("message", namespace="/chat")
 def handle_message(data):
     logger.debug(f"Received message: {data} from {request.sid}")
@@ -511,9 +537,22 @@ def handle_message(data):
         emit("error", {"data": "Unauthorized"}, room=request.sid)
         return
 
+    if is_draining():
+        emit("error", {"data": "Máy chủ đang khởi động lại. Vui lòng thử lại sau giây lát."}, room=request.sid)
+        return
+
     message = data.get("message", "")
     if not message.strip():
         return
+
+    allowed, _, _, retry_after = rate_limit.hit("chat", rate_limit.current_key())
+    if not allowed:
+        emit(
+            "error",
+            {"data": f"Bạn gửi tin nhắn quá nhanh. Vui lòng thử lại sau {math.ceil(retry_after)} giây."},
+            room=request.sid,
+        )
+        return
     # More comprehensive XSS prevention using HTML escape
     message = (
         message.replace("<", "&lt;")
@@ -524,6 +563,12 @@ def handle_message(data):
     )
 
     try:
+        if not current_user.consume_chat_message():
+            db.session.rollback()
+            emit("error", {"data": "Bạn đã dùng hết lượt trò chuyện hôm nay. Nâng cấp Premium để không giới hạn."},
+                 room=request.sid)
+            return
+
         session = (
             ChatSession.query.filter_by(user_id=current_user.id)
             .order_by(ChatSession.updated_at.desc())
@@ -555,12 +600,13 @@ def handle_message(data):
                 return
             
             logger.info(f"Generating AI response for user {current_user.id}")
-            response_chunks = current_app.ai_chat.get_response_stream(
-                message, session.personality, str(session.id)
-            )
             full_response = ""
-            for chunk in response_chunks:
-                full_response += chunk
+            with track_stream():
+                response_chunks = current_app.ai_chat.get_response_stream(
+                    message, session.personality, str(session.id)
+                )
+                for chunk in response_chunks:
+                    full_response += chunk
 
             logger.info(f"AI response generated ({len(full_response)} chars) for user {current_user.id}")
             socketio.emit(
@@ -585,6 +631,7 @@ def handle_message(data):
 
 @bp.route("/api/chat/sessions", methods=["POST"])
 @login_required
+@rate_limited("chat_sessions")
 def manage_chat_sessions():
     data = request.get_json()
     if not data:
@@ -675,6 +722,7 @@ def get_chat_messages(session_id):
 
 @bp.route("/api/chat/sessions", methods=["GET"])
 @login_required
+@conditional_get
 def list_chat_sessions():
     """List current user's chat sessions"""
     sessions = (
@@ -695,6 +743,7 @@ def list_chat_sessions():
 
 @bp.route("/ai/get_analysis_data", methods=["POST"])
 @login_required
+@rate_limited("ai")
 def get_analysis_data():
     start_date, end_date = get_date_range("month")
     expenses = Expense.query.filter_by(user_id=current_user.id).all()
@@ -720,6 +769,7 @@ def get_analysis_data():
 
 @bp.route("/ai/get_recommendations", methods=["POST"])
 @login_required
+@rate_limited("ai")
 def get_recommendations():
     start_date, end_date = get_date_range("month")
     expenses = Expense.query.filter_by(user_id=current_user.id).all()
@@ -745,6 +795,8 @@ def get_recommendations():
 @bp.route("/export_data")
 @login_required
 def export_data():
+    import pandas as pd  # heavy; only needed for Excel files
+
     expenses = Expense.query.filter_by(user_id=current_user.id).all()
 
     data = []
@@ -782,7 +834,10 @@ def export_data():
 
 @bp.route("/import_data", methods=["POST"])
 @login_required
+@rate_limited("import")
 def import_data():
+    import pandas as pd  # heavy; only needed for Excel files
+
     if "file" not in request.files:
         return jsonify({"error": "Không tìm thấy file"}), 400
 
@@ -811,6 +866,7 @@ def import_data():
 
 @bp.route("/ai/analyze_patterns", methods=["POST"])
 @login_required
+@rate_limited("ai")
 def analyze_patterns():
 
     if not request.is_json:
@@ -865,6 +921,7 @@ def analyze_patterns():
 
 @bp.route("/ai/suggest_category", methods=["POST"])
 @login_required
+@rate_limited("ai")
 def suggest_category():
     if not request.is_json:
         return jsonify({"error": "Request must be JSON"}), 400
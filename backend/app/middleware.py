@@ -3,7 +3,7 @@
 Custom middleware for security and request handling
 """
 
-from flask import request, jsonify, g
+from flask import request, jsonify, g, make_response
 from functools import wraps
 from flask_login import current_user
 import logging
@@ -102,13 +102,13 @@ def track_request_metrics(f):
         g.request_path = request.path
         
         try:
-            result = f(*args, **kwargs)
+            result = make_response(f(*args, **kwargs))
             
-            # Log successful request
+            # Log completed request with the status the view actually returned
             duration = time.time() - g.request_start_time
             logger.info(
                 f"{g.request_method} {g.request_path} - "
-                f"Status: 200 - Duration: {duration:.3f}s"
+                f"Status: {result.status_code} - Duration: {duration:.3f}s"
             )
             
             return result
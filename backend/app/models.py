@@ -1,22 +1,23 @@
 from app import db, login_manager
+from flask import current_app
 from flask_login import UserMixin
+from sqlalchemy import case, or_, update
 from datetime import datetime, date
 
-from werkzeug.security import (
-    generate_password_hash,
-    check_password_hash,
-)
+from app.utils.passwords import get_hashers
 
 
 @login_manager.user_loader
 def load_user(id):
-    return User.query.get(int(id))
+    from app.utils.identity_cache import load_user as load_cached_user
+
+    return load_cached_user(int(id))
 
 
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), index=True, unique=True)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(256))
     email = db.Column(db.String(120), unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_permanently_logged_in = db.Column(db.Boolean, default=False)
@@ -29,12 +30,31 @@ class User(UserMixin, db.Model):
     last_message_count_reset = db.Column(
         db.Date, default=date.today
     )  # Track reset date
+    # Default categories seeded (or the user already had some); saves the
+    # COUNT query on every category listing
+    categories_initialized = db.Column(
+        db.Boolean, nullable=False, default=False, server_default=db.false()
+    )
+    # Bumped with every write to the user's data (app/utils/data_version.py);
+    # drives ETag / Last-Modified on read endpoints
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    data_changed_at = db.Column(db.DateTime)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = get_hashers().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify ``password``; an outdated hash is replaced but not committed
+
+        The login route commits the upgrade; other callers (password change
+        forms) commit it along with their own changes, or drop it.
+        """
+        hashers = get_hashers()
+        valid, needs_rehash = hashers.verify(self.password_hash, password)
+        if valid and needs_rehash:
+            # Older scheme or cost: upgrade while we have the plaintext
+            self.password_hash = hashers.hash(password)
+        return valid
 
     def set_permanent_login(self, status):
         self.is_permanently_logged_in = status
@@ -52,24 +72,54 @@ class User(UserMixin, db.Model):
         return default_wallet
 
     def reset_chat_message_count(self):
-        """Resets the daily chat message count if needed."""
+        """Resets the daily chat message count if needed (committed by the caller)."""
         today = date.today()
         if self.last_message_count_reset != today:
             self.chat_message_count = 0
             self.last_message_count_reset = today
-            db.session.commit()
 
     def can_send_chat_message(self):
         """Checks if the user can send a chat message based on premium status and limits."""
-        self.reset_chat_message_count()  # Reset if it's a new day
         if self.premium:
             return True  # No limit for premium users
-        return self.chat_message_count < 200  # Limit for non premium user
+        if self.last_message_count_reset != date.today():
+            return True
+        return (self.chat_message_count or 0) < current_app.config.get("CHAT_DAILY_LIMIT", 200)
+
+    def consume_chat_message(self):
+        """Counts one message against today's quota; False once it is used up.
+
+        A single conditional UPDATE, so concurrent messages (other tabs, other
+        workers) can't both take the last slot. It is committed together with
+        the caller's transaction.
+        """
+        if self.premium:
+            return True
+        today = date.today()
+        user = User.__table__.c
+        result = db.session.execute(
+            update(User.__table__)
+            .where(
+                user.id == self.id,
+                or_(
+                    user.last_message_count_reset.is_(None),
+                    user.last_message_count_reset != today,
+                    user.chat_message_count < current_app.config.get("CHAT_DAILY_LIMIT", 200),
+                ),
+            )
+            .values(
+                chat_message_count=case(
+                    (user.last_message_count_reset == today, user.chat_message_count + 1), else_=1
+                ),
+                last_message_count_reset=today,
+            )
+        )
+        db.session.expire(self, ["chat_message_count", "last_message_count_reset"])
+        return result.rowcount == 1
 
     def increment_chat_message_count(self):
         """Increments the chat message count and commits to the database."""
-        if not self.premium:
-            self.chat_message_count += 1
+        self.consume_chat_message()
         db.session.commit()
 
 
@@ -107,6 +157,80 @@ class Notification(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class EmailOutbox(db.Model):
+    """Queued outgoing email, delivered in batches by the outbox worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), index=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    kind = db.Column(db.String(50))  # e.g., 'budget_alert', 'unusual_spending'
+    subject = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)  # Plain-text version, used for digests
+    html = db.Column(db.Text)
+    status = db.Column(
+        db.String(20), default="pending", nullable=False, index=True
+    )  # 'pending', 'sending' (claimed by a worker), 'sent' or 'dead'
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    claim_token = db.Column(db.String(32), index=True)
+    claimed_at = db.Column(db.DateTime)
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+
+class ReceiptCache(db.Model):
+    """Extraction result for a receipt image, keyed by a hash of its bytes"""
+    __table_args__ = (db.UniqueConstraint("user_id", "method", "digest"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
+    method = db.Column(db.String(10), nullable=False)  # extraction mode: 'tiered', 'ai' or 'ocr'
+    digest = db.Column(db.String(64), nullable=False)  # SHA-256 of the image bytes
+    phash = db.Column(db.String(16))  # Difference hash, matches re-encoded copies
+    result = db.Column(db.Text, nullable=False)  # JSON
+    hits = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class SplitGroup(db.Model):
+    """A group of people sharing expenses"""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.String(200))
+    created_by = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    members = db.relationship(
+        "SplitMember", backref="group", cascade="all, delete-orphan"
+    )
+
+
+class SplitMember(db.Model):
+    """A group member; either a registered user or just a name"""
+    id = db.Column(db.Integer, primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey("split_group.id"), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), index=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120))
+    is_user = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ExpenseSplit(db.Model):
+    """The share of an expense owed by one group member"""
+    id = db.Column(db.Integer, primary_key=True)
+    expense_id = db.Column(db.Integer, db.ForeignKey("expense.id"), nullable=False, index=True)
+    member_id = db.Column(db.Integer, db.ForeignKey("split_member.id"), nullable=False, index=True)
+    amount = db.Column(db.Float, nullable=False)
+    is_paid = db.Column(db.Boolean, default=False)
+    paid_date = db.Column(db.Date)
+    notes = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    expense = db.relationship("Expense", backref=db.backref("splits", lazy="dynamic"))
+    member = db.relationship("SplitMember", backref=db.backref("splits", lazy="dynamic"))
+
+
 class ChatSession(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
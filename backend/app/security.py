@@ -4,7 +4,6 @@ Security utilities for input validation and sanitization
 """
 
 import re
-import bleach
 from typing import Any, Optional
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
@@ -22,6 +21,8 @@ def sanitize_html(text: str) -> str:
     """Remove all HTML tags from text"""
     if not text:
         return ""
+    import bleach  # html5lib parser; slow to import, so loaded on first use
+
     return bleach.clean(text, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
 
 
@@ -80,7 +81,7 @@ def validate_category(category: str, user_id: Optional[int] = None) -> str:
     """
     # Import here to avoid circular imports
     from flask_login import current_user
-    from app.models import Category
+    from app.utils import category_cache
     
     category = sanitize_string(category, max_length=50).lower()
     
@@ -92,36 +93,18 @@ def validate_category(category: str, user_id: Optional[int] = None) -> str:
         logger.warning(f"No user context for category validation: {category}")
         return "other"
     
-    # Check if category table exists, create if not
-    try:
-        # Try to query - if table doesn't exist, this will raise an exception
-        cat = Category.query.filter_by(user_id=uid, slug=category).first()
-    except Exception as e:
-        # Table might not exist, try to create it
-        logger.warning(f"Category table query failed: {e}, attempting to create table")
-        try:
-            from app import db
-            Category.__table__.create(db.engine, checkfirst=True)
-            logger.info("Category table created successfully")
-            cat = None  # Will fall through to initialization
-        except Exception as create_error:
-            logger.error(f"Failed to create category table: {create_error}")
-            return "other"  # Fallback to default
-    
-    if not cat:
-        # Category doesn't exist, try to find 'other' category
-        other_cat = Category.query.filter_by(user_id=uid, slug='other').first()
-        if other_cat:
-            logger.warning(f"Invalid category: {category}, defaulting to 'other'")
-            return "other"
-        else:
-            # 'other' doesn't exist either, initialize default categories
-            from app.api.categories import init_default_categories
-            init_default_categories(uid)
-            logger.info(f"Initialized default categories for user {uid}")
-            return "other"
-    
-    return cat.slug
+    # Cached per user; the category endpoints invalidate it on change
+    if category_cache.has_slug(uid, category):
+        return category
+    
+    if not category_cache.has_slug(uid, 'other'):
+        # 'other' doesn't exist either, initialize default categories
+        from app.api.categories import init_default_categories
+        init_default_categories(uid)
+        logger.info(f"Initialized default categories for user {uid}")
+    else:
+        logger.warning(f"Invalid category: {category}, defaulting to 'other'")
+    return "other"
 
 
 def validate_email(email: str) -> str:
@@ -263,8 +246,6 @@ def rate_limit_key(user_id: Optional[int] = None) -> str:
     if user_id:
         return f"user:{user_id}"
     
-    # Derive client IP without Flask-Limiter
-    ip = request.headers.get("X-Forwarded-For", request.remote_addr) or ""
-    if "," in ip:
-        ip = ip.split(",")[0].strip()
-    return f"ip:{ip}"
+    # X-Forwarded-For is set by the client; behind a proxy, PROXY_FIX_X_FOR
+    # makes ProxyFix put the address the proxy saw into remote_addr
+    return f"ip:{request.remote_addr or ''}"
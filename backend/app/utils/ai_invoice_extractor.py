@@ -95,36 +95,24 @@ Lưu ý:
 
 Trả về chỉ JSON, không có markdown hoặc text khác."""
 
-            # Get the model
-            model = self.model_manager.get_model()
-            
-            # Prepare the content with image
-            import google.generativeai as genai
-            
             # Create the content parts
             image_part = {
                 "mime_type": mime_type,
                 "data": image_base64
             }
             
-            # Generate content with vision
-            response = model.generate_content(
+            # Generate content with vision (whichever backend AI_BACKEND selects).
+            # One call only: vision calls are costly, and a 429 or a rejected
+            # image won't succeed on a retry a second later
+            response_text = self.model_manager.generate_content_once(
                 [prompt, image_part],
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.1,  # Low temperature for more accurate extraction
-                    top_p=0.8,
-                    top_k=20,
-                    max_output_tokens=2048,
-                )
+                temperature=0.1,  # Low temperature for more accurate extraction
+                top_p=0.8,
+                top_k=20,
+                max_output_tokens=2048,
             )
             
-            if not response or not response.text:
-                logger.warning("Empty response from AI model")
-                return self._fallback_extraction()
-            
             # Parse JSON response
-            response_text = response.text.strip()
-            
             # Remove markdown code blocks if present
             if response_text.startswith("```json"):
                 response_text = response_text[7:]
@@ -0,0 +1,63 @@
+# app/utils/category_cache.py
+"""
+Per-user category slug sets for ``validate_category``.
+
+Slugs are cached in process memory for ``CATEGORY_CACHE_TTL`` seconds and
+dropped by the category endpoints whenever a user's categories change, so a
+CSV import validates all its rows against one lookup. Other workers only see
+a change once their entry expires. A slug that is missing from a cached set
+reloads it first (at most once a second), so a category created through
+another worker can be used right away.
+"""
+
+import threading
+import time
+
+from flask import current_app, has_app_context
+
+MISS_RELOAD_INTERVAL = 1.0  # seconds
+
+_slugs = {}  # user_id -> (frozenset of slugs, loaded_at)
+_lock = threading.Lock()
+
+
+def _ttl():
+    return current_app.config.get("CATEGORY_CACHE_TTL", 300) if has_app_context() else 0
+
+
+def _load(user_id):
+    from app import db
+    from app.models import Category
+
+    slugs = frozenset(slug for (slug,) in db.session.query(Category.slug).filter_by(user_id=user_id))
+    with _lock:
+        _slugs[user_id] = (slugs, time.monotonic())
+    return slugs
+
+
+def get_slugs(user_id):
+    """The user's category slugs (possibly cached)"""
+    entry = _slugs.get(user_id)
+    if entry is None or time.monotonic() - entry[1] >= _ttl():
+        return _load(user_id)
+    return entry[0]
+
+
+def has_slug(user_id, slug):
+    """True if the user has a category ``slug``"""
+    if slug in get_slugs(user_id):
+        return True
+    entry = _slugs.get(user_id)
+    if entry is not None and time.monotonic() - entry[1] < MISS_RELOAD_INTERVAL:
+        return False
+    return slug in _load(user_id)
+
+
+def invalidate(user_id):
+    with _lock:
+        _slugs.pop(user_id, None)
+
+
+def clear():
+    with _lock:
+        _slugs.clear()
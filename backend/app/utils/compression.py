@@ -0,0 +1,110 @@
+# app/utils/compression.py
+"""
+gzip / brotli compression of JSON and CSV responses.
+
+Bodies of ``COMPRESS_MIMETYPES`` at least ``COMPRESS_MIN_SIZE`` bytes are
+compressed with brotli when the client accepts it and the ``brotli`` package
+is installed, gzip otherwise. Streamed responses (exports) are compressed
+chunk by chunk as they are produced, so they are never buffered whole.
+Responses that already carry a Content-Encoding or ``Cache-Control:
+no-transform`` are left alone.
+
+The hook is registered before any other ``after_request`` function, so it
+runs last and sees the final body and headers.
+"""
+
+import logging
+import zlib
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31 = gzip container
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+def _choose_encoding(config):
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br", lambda: _Brotli(config.get("COMPRESS_BR_LEVEL", 4))
+    if accepted["gzip"]:
+        return "gzip", lambda: _Gzip(config.get("COMPRESS_LEVEL", 5))
+    return None, None
+
+
+def _stream(chunks, compressor):
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def compress_response(app, response):
+    config = app.config
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or request.method == "HEAD"
+        or "Content-Encoding" in response.headers
+        or "no-transform" in response.headers.get("Cache-Control", "")
+        or response.mimetype not in config.get("COMPRESS_MIMETYPES", ())
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding, make_compressor = _choose_encoding(config)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream(response.response, make_compressor())
+        response.direct_passthrough = False
+        response.headers.pop("Content-Length", None)
+    else:
+        body = response.get_data()
+        if len(body) < config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+        compressor = make_compressor()
+        response.set_data(compressor.compress(body) + compressor.flush())
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def init_compression(app):
+    """Compress large JSON/CSV responses (call first in create_app)"""
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+    app.after_request(lambda response: compress_response(app, response))
@@ -0,0 +1,153 @@
+# app/utils/data_version.py
+"""
+Per-user data version for conditional GETs.
+
+``user.data_version`` goes up by one in the same transaction as any write to
+a user's expenses, wallets, budgets, categories, notifications or chat
+sessions (session hooks, so every code path is covered), and
+``user.data_changed_at`` records when. Views wrapped in ``@conditional_get``
+tag their response with a weak ETag and Last-Modified built from it and
+answer a matching ``If-None-Match`` / ``If-Modified-Since`` with 304 after a
+single primary-key lookup, before the view runs any of its own queries.
+
+The tag also carries the date, so views that depend on "today" (current
+month budgets, trend windows) change tag at midnight.
+"""
+
+import logging
+from datetime import datetime, time, timezone, date
+from functools import wraps
+
+from flask import current_app, make_response, request
+from flask_login import current_user
+from sqlalchemy import event, select, update
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "data_version_users"
+
+
+def _tracked_models():
+    from app.models import Budget, Category, ChatSession, Expense, Notification, Wallet
+
+    return (Budget, Category, ChatSession, Expense, Notification, Wallet)
+
+
+def _owners(session):
+    tracked = _tracked_models()
+    owners = set()
+    for obj in session.new | session.deleted:
+        if isinstance(obj, tracked):
+            owners.add(obj.user_id)
+    for obj in session.dirty:
+        if isinstance(obj, tracked) and session.is_modified(obj, include_collections=False):
+            owners.add(obj.user_id)
+    owners.discard(None)
+    return owners
+
+
+def _bump(connection, user_ids):
+    from app.models import User
+
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id.in_(sorted(user_ids)))
+        .values(data_version=User.__table__.c.data_version + 1, data_changed_at=datetime.utcnow())
+    )
+
+
+def _before_flush(session, flush_context, instances):
+    # Collected before the flush: afterwards session.dirty/new are reset
+    owners = _owners(session)
+    if owners:
+        session.info.setdefault(_PENDING_KEY, set()).update(owners)
+
+
+def _after_flush(session, flush_context):
+    owners = session.info.pop(_PENDING_KEY, None)
+    if owners:
+        _bump(session.connection(), owners)
+
+
+def _after_bulk(orm_execute_state):
+    """Query.update()/delete() skip the unit of work; bump the requesting user"""
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, _tracked_models()):
+        return
+    try:
+        user_id = current_user.id if current_user and current_user.is_authenticated else None
+    except Exception:  # no request context (CLI, scheduler)
+        user_id = None
+    if user_id is not None:
+        _bump(orm_execute_state.session.connection(), {user_id})
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def init_data_version(session):
+    """Register the session hooks that bump data versions (idempotent)"""
+    for name, fn in (
+        ("before_flush", _before_flush),
+        ("after_flush", _after_flush),
+        ("do_orm_execute", _after_bulk),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(session, name, fn):
+            event.listen(session, name, fn)
+
+
+def get_version(user_id):
+    """(data_version, data_changed_at) of a user, straight from the database"""
+    from app import db
+    from app.models import User
+
+    row = db.session.execute(
+        select(User.data_version, User.data_changed_at).where(User.id == user_id)
+    ).first()
+    return (row[0] or 0, row[1]) if row else (0, None)
+
+
+def _validators(user_id):
+    version, changed_at = get_version(user_id)
+    today = date.today()
+    etag = f"{user_id}.{version}.{today.isoformat()}"
+    # Views that depend on the date change at midnight too
+    last_modified = max(changed_at or datetime.min, datetime.combine(today, time.min))
+    return etag, last_modified.replace(tzinfo=timezone.utc)
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    # Last-Modified is sent in whole seconds; only a change strictly after the
+    # client's copy counts, so a same-second write is never missed
+    return request.if_modified_since is not None and last_modified <= request.if_modified_since
+
+
+def conditional_get(f):
+    """Weak ETag / Last-Modified from the user's data version; 304 when unchanged"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if (
+            request.method != "GET"
+            or not current_app.config.get("CONDITIONAL_GET_ENABLED", True)
+            or not current_user.is_authenticated
+        ):
+            return f(*args, **kwargs)
+
+        etag, last_modified = _validators(current_user.id)
+        if _not_modified(etag, last_modified):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return decorated_function
@@ -3,10 +3,17 @@ from flask import current_app
 from flask_mail import Message
 from threading import Thread
 from flask import render_template
+from jinja2 import TemplateNotFound
+from datetime import datetime, timedelta
+from html import escape
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 
+# Background scheduler that drains the outbox (see start_outbox_worker)
+_outbox_scheduler = None
+
 
 def send_async_email(app, msg):
     with app.app_context():
@@ -35,3 +42,247 @@ def send_email(subject, recipient, template, **kwargs):
     except Exception as e:
         logger.exception(f"Error preparing email: {e}")  # Use logger, include traceback
         return False
+
+
+def queue_email(subject, recipient, template, body, user_id=None, kind=None, **kwargs):
+    """Store an email in the outbox instead of sending it inline.
+
+    The HTML is rendered now (while the request context and template kwargs are
+    available); delivery happens later in ``process_outbox``. ``body`` is the
+    plain-text version, also used when several emails for the same user are
+    coalesced into a digest.
+    """
+    from app import db
+    from app.models import EmailOutbox
+
+    try:
+        try:
+            html = render_template(f"email/{template}.html", **kwargs)
+        except TemplateNotFound:
+            html = None
+
+        db.session.add(
+            EmailOutbox(
+                user_id=user_id,
+                recipient=recipient,
+                kind=kind or template,
+                subject=subject,
+                body=body,
+                html=html,
+            )
+        )
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"Error queueing email: {e}")
+        return False
+
+
+def _build_message(items, sender):
+    """Build one message for all outbox rows addressed to the same recipient"""
+    if len(items) == 1:
+        item = items[0]
+        msg = Message(
+            subject=f"Money Keeper - {item.subject}",
+            recipients=[item.recipient],
+            sender=sender,
+            body=item.body,
+        )
+        msg.html = item.html
+        return msg
+
+    body = "\n".join(f"- {item.body}" for item in items)
+    html = "<ul>" + "".join(
+        f"<li><strong>{escape(item.subject)}</strong>: {escape(item.body)}</li>"
+        for item in items
+    ) + "</ul>"
+    msg = Message(
+        subject=f"Money Keeper - Tổng hợp {len(items)} thông báo",
+        recipients=[items[0].recipient],
+        sender=sender,
+        body=body,
+    )
+    msg.html = html
+    return msg
+
+
+def _mark_failed(items, error, config, now):
+    """Schedule a retry with exponential backoff, or dead-letter the rows"""
+    max_attempts = config["EMAIL_OUTBOX_MAX_ATTEMPTS"]
+    backoff = config["EMAIL_OUTBOX_BACKOFF"]
+    for item in items:
+        item.attempts += 1
+        item.last_error = str(error)[:500]
+        item.claim_token = None
+        if item.attempts >= max_attempts:
+            item.status = "dead"
+            logger.error(
+                f"Email {item.id} to {item.recipient} dead-lettered after "
+                f"{item.attempts} attempts: {error}"
+            )
+        else:
+            item.status = "pending"
+            item.next_attempt_at = now + timedelta(
+                seconds=backoff * (2 ** (item.attempts - 1))
+            )
+
+
+def _claim(batch_size, now, config):
+    """Atomically take up to ``batch_size`` due rows for this process
+
+    Rows move from 'pending' to 'sending' with a fresh claim token in one
+    conditional UPDATE, so two workers (or a worker and cron) never get the
+    same row. Claims older than EMAIL_OUTBOX_CLAIM_TIMEOUT belong to a
+    process that died mid-batch and are released first.
+    """
+    from app import db
+    from app.models import EmailOutbox
+
+    stale = now - timedelta(seconds=config["EMAIL_OUTBOX_CLAIM_TIMEOUT"])
+    EmailOutbox.query.filter(
+        EmailOutbox.status == "sending", EmailOutbox.claimed_at < stale
+    ).update({"status": "pending", "claim_token": None}, synchronize_session=False)
+
+    # SKIP LOCKED keeps concurrent workers from queueing on the same rows
+    # (Postgres); SQLite ignores it and relies on the UPDATE below
+    ids = [
+        row_id for (row_id,) in db.session.query(EmailOutbox.id)
+        .filter(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ]
+    token = uuid.uuid4().hex
+    if ids:
+        EmailOutbox.query.filter(
+            EmailOutbox.id.in_(ids), EmailOutbox.status == "pending"
+        ).update(
+            {"status": "sending", "claim_token": token, "claimed_at": now},
+            synchronize_session=False,
+        )
+    db.session.commit()
+    if not ids:
+        return []
+    return EmailOutbox.query.filter_by(claim_token=token).order_by(EmailOutbox.id).all()
+
+
+def process_outbox(batch_size=None):
+    """Deliver due outbox rows over a single SMTP connection.
+
+    Rows for the same recipient are coalesced into one digest message. Each
+    message's rows are committed as soon as it is sent, so a crash re-sends
+    at most the message in flight. Must be called inside an application
+    context. Returns a dict of counters.
+    """
+    from app import db
+
+    app = current_app._get_current_object()
+    batch_size = batch_size or app.config["EMAIL_OUTBOX_BATCH_SIZE"]
+    now = datetime.utcnow()
+    stats = {"messages": 0, "sent": 0, "failed": 0}
+
+    due = _claim(batch_size, now, app.config)
+    if not due:
+        return stats
+
+    groups = {}
+    for item in due:
+        groups.setdefault(item.recipient, []).append(item)
+
+    sender = app.config["MAIL_DEFAULT_SENDER"]
+    batches = list(groups.values())
+    handled = 0
+    try:
+        with app.extensions["mail"].connect() as connection:
+            for items in batches:
+                try:
+                    connection.send(_build_message(items, sender))
+                except Exception as e:
+                    logger.warning(f"Failed to send email to {items[0].recipient}: {e}")
+                    _mark_failed(items, e, app.config, now)
+                    db.session.commit()
+                    handled += 1
+                    stats["failed"] += len(items)
+                    continue
+                for item in items:
+                    item.status = "sent"
+                    item.sent_at = now
+                    item.attempts += 1
+                    item.claim_token = None
+                db.session.commit()
+                handled += 1
+                stats["messages"] += 1
+                stats["sent"] += len(items)
+    except Exception as e:
+        # The SMTP session or a commit failed; release every claimed row not
+        # yet committed (including the message in flight) for a retry
+        logger.warning(f"Error while draining outbox: {e}")
+        db.session.rollback()
+        for items in batches[handled:]:
+            _mark_failed(items, e, app.config, now)
+            stats["failed"] += len(items)
+        db.session.commit()
+
+    if stats["sent"] or stats["failed"]:
+        logger.info(
+            f"Outbox: sent {stats['sent']} emails in {stats['messages']} messages, "
+            f"{stats['failed']} failed"
+        )
+    return stats
+
+
+def _run_outbox_job(app):
+    from app import db
+
+    with app.app_context():
+        try:
+            process_outbox()
+        except Exception as e:
+            db.session.rollback()
+            logger.exception(f"Error processing email outbox: {e}")
+        finally:
+            db.session.remove()
+
+
+def start_outbox_worker(app):
+    """Start the background job that drains the outbox periodically"""
+    global _outbox_scheduler
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    if _outbox_scheduler is not None and _outbox_scheduler.running:
+        return _outbox_scheduler
+
+    try:
+        _outbox_scheduler = BackgroundScheduler(daemon=True)
+        _outbox_scheduler.add_job(
+            func=_run_outbox_job,
+            args=(app,),
+            trigger="interval",
+            seconds=app.config["EMAIL_OUTBOX_INTERVAL"],
+            id="process_email_outbox",
+            name="Process email outbox",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        _outbox_scheduler.start()
+        logger.info(
+            f"Email outbox worker started (every {app.config['EMAIL_OUTBOX_INTERVAL']}s)"
+        )
+    except Exception as e:
+        logger.exception(f"Error starting email outbox worker: {e}")
+    return _outbox_scheduler
+
+
+def stop_outbox_worker():
+    """Stop the outbox worker"""
+    global _outbox_scheduler
+    try:
+        if _outbox_scheduler is not None and _outbox_scheduler.running:
+            _outbox_scheduler.shutdown()
+            logger.info("Email outbox worker stopped")
+    except Exception as e:
+        logger.exception(f"Error stopping email outbox worker: {e}")
+    finally:
+        _outbox_scheduler = None
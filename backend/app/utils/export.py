@@ -1,9 +1,10 @@
-import pandas as pd
 from io import BytesIO
 from datetime import datetime
 
 
 def export_expenses_to_excel(expenses):
+    import pandas as pd  # heavy; only needed for Excel files
+
     output = BytesIO()
 
     # Convert expenses to DataFrame
@@ -0,0 +1,68 @@
+# app/utils/identity_cache.py
+"""
+Short-lived cache of the logged-in user's row for ``login_manager.user_loader``.
+
+Every authenticated request used to start with ``SELECT ... FROM user``. The
+stable columns are now cached per process for ``USER_CACHE_TTL`` seconds and
+the user is rebuilt and attached to the session without a query. Columns
+that change often or are sensitive (password hash, chat counters) are left
+unloaded and fetched on first access. Any ORM update or delete of a user
+drops its entry, so profile, premium and password changes take effect on
+the next request in this worker, and within the TTL in the others.
+"""
+
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+
+CACHED_COLUMNS = (
+    "id", "username", "email", "created_at", "is_permanently_logged_in", "premium", "categories_initialized",
+)
+
+_users = {}  # user_id -> (column values, loaded_at)
+_lock = threading.Lock()
+
+
+def load_user(user_id):
+    """The user with ``user_id`` attached to the current session, or None"""
+    from app import db
+    from app.models import User
+
+    ttl = current_app.config.get("USER_CACHE_TTL", 30)
+    entry = _users.get(user_id)
+    if entry is not None and time.monotonic() - entry[1] < ttl:
+        user = User(**entry[0])
+        make_transient_to_detached(user)  # columns not set above stay unloaded
+        return db.session.merge(user, load=False)
+
+    user = db.session.get(User, user_id)
+    if user is not None and ttl > 0:
+        with _lock:
+            _users[user_id] = ({c: getattr(user, c) for c in CACHED_COLUMNS}, time.monotonic())
+    return user
+
+
+def invalidate(user_id):
+    with _lock:
+        _users.pop(user_id, None)
+
+
+def clear():
+    with _lock:
+        _users.clear()
+
+
+def _user_changed(mapper, connection, target):
+    invalidate(target.id)
+
+
+def init_identity_cache():
+    """Drop cached users on every ORM update/delete (idempotent)"""
+    from app.models import User
+
+    for name in ("after_update", "after_delete"):
+        if not event.contains(User, name, _user_changed):
+            event.listen(User, name, _user_changed)
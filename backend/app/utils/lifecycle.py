@@ -0,0 +1,95 @@
+# app/utils/lifecycle.py
+"""
+Graceful shutdown for production workers.
+
+On SIGTERM the server calls ``shutdown(app)``: ``/healthz`` starts answering
+503 so the load balancer stops routing here, new chat messages are refused,
+chat streams already in progress get up to ``SHUTDOWN_DRAIN_TIMEOUT`` seconds
+to finish, and then the background scheduler, OCR workers and DB pool are
+closed.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+_streams = threading.Condition()
+_active_streams = 0
+_draining = False
+
+
+def is_draining():
+    return _draining
+
+
+def active_streams():
+    return _active_streams
+
+
+@contextmanager
+def track_stream():
+    """Count a long-running response (chat stream) as in flight"""
+    global _active_streams
+    with _streams:
+        _active_streams += 1
+    try:
+        yield
+    finally:
+        with _streams:
+            _active_streams -= 1
+            _streams.notify_all()
+
+
+def drain(timeout):
+    """Refuse new streams and wait up to ``timeout`` seconds for running ones"""
+    global _draining
+    deadline = time.monotonic() + timeout
+    with _streams:
+        _draining = True
+        while _active_streams:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _streams.wait(remaining)
+        return _active_streams == 0
+
+
+def reset():
+    """Leave draining mode (tests, or a cancelled shutdown)"""
+    global _draining
+    _draining = False
+
+
+def shutdown(app, timeout=None):
+    """Drain in-flight streams, then stop background work and close the DB pool"""
+    from app import db
+    from app.utils.email import stop_outbox_worker
+    from app.utils.ocr import shutdown_pool
+
+    timeout = app.config["SHUTDOWN_DRAIN_TIMEOUT"] if timeout is None else timeout
+    logger.info(f"Shutting down: draining {_active_streams} chat streams (up to {timeout}s)")
+    if not drain(timeout):
+        logger.warning(f"Shutdown timeout reached with {_active_streams} chat streams still running")
+
+    stop_outbox_worker()
+    shutdown_pool()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    logger.info("Shutdown complete")
+
+
+def healthz():
+    if _draining:
+        return jsonify({"status": "draining"}), 503
+    return jsonify({"status": "ok", "active_streams": _active_streams}), 200
+
+
+def init_lifecycle(app):
+    """Register the /healthz readiness endpoint"""
+    app.add_url_rule("/healthz", "healthz", healthz)
@@ -0,0 +1,216 @@
+# app/utils/live.py
+"""
+Push data changes to connected clients over the ``/live`` Socket.IO namespace.
+
+Writes are picked up from SQLAlchemy session events, so every code path that
+commits a Notification, Wallet or Expense change notifies the owner without
+having to call anything explicitly. Events are collected during flush and only
+emitted after the transaction commits; a rollback discards them.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, inspect, select
+
+logger = logging.getLogger(__name__)
+
+LIVE_NAMESPACE = "/live"
+
+_PENDING_KEY = "live_events"
+_BUDGET_KEY = "live_budget_deltas"
+
+
+def push_to_user(user_id, event_name, payload):
+    """Emit an event to every /live connection of a user"""
+    from app import socketio
+
+    try:
+        socketio.emit(event_name, payload, namespace=LIVE_NAMESPACE, to=str(user_id))
+    except Exception as e:
+        logger.warning(f"Failed to push {event_name} to user {user_id}: {e}")
+
+
+def _enabled():
+    return has_app_context() and current_app.config.get("LIVE_UPDATES_ENABLED", True)
+
+
+def _history(obj, attr):
+    """Return (old, new) for an attribute changed in this flush"""
+    hist = inspect(obj).attrs[attr].history
+    old = hist.deleted[0] if hist.deleted else None
+    new = hist.added[0] if hist.added else getattr(obj, attr)
+    return old, new
+
+
+def _expense_key(user_id, category, date):
+    date = date or datetime.utcnow()
+    return (user_id, category, date.month, date.year)
+
+
+def _collect_expense(deltas, obj, state):
+    """Track how much a flush added to each (user, category, month) bucket"""
+    if state == "new":
+        if obj.is_expense is not False and obj.amount:
+            deltas[_expense_key(obj.user_id, obj.category, obj.date)] += obj.amount
+        return
+    if state == "deleted":
+        return  # Deleting spending can never push a budget over a threshold
+
+    old_amount, new_amount = _history(obj, "amount")
+    old_category, new_category = _history(obj, "category")
+    old_date, new_date = _history(obj, "date")
+    old_is_expense, new_is_expense = _history(obj, "is_expense")
+    if old_amount is None and old_category is None and old_date is None and old_is_expense is None:
+        return
+
+    previous = old_amount if old_amount is not None else new_amount
+    if (old_is_expense if old_is_expense is not None else new_is_expense) is not False:
+        key = _expense_key(
+            obj.user_id,
+            old_category or new_category,
+            old_date or new_date,
+        )
+        deltas[key] -= previous or 0
+    if new_is_expense is not False:
+        deltas[_expense_key(obj.user_id, new_category, new_date)] += new_amount or 0
+
+
+def _notification_payload(notification):
+    return {
+        "id": notification.id,
+        "type": notification.type,
+        "message": notification.message,
+        "is_read": bool(notification.is_read),
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def _after_flush(session, flush_context):
+    from app.models import Expense, Notification, Wallet
+
+    if not _enabled():
+        return
+
+    events = session.info.setdefault(_PENDING_KEY, [])
+    deltas = session.info.setdefault(_BUDGET_KEY, defaultdict(float))
+
+    for state, objects in (
+        ("new", session.new),
+        ("dirty", session.dirty),
+        ("deleted", session.deleted),
+    ):
+        for obj in objects:
+            if isinstance(obj, Notification) and state == "new":
+                # Attributes expire on commit, so serialize while still loaded
+                events.append(
+                    (obj.user_id, "notification.created", _notification_payload(obj))
+                )
+            elif isinstance(obj, Wallet):
+                if state == "dirty":
+                    old, new = _history(obj, "balance")
+                    if old is None or old == new:
+                        continue
+                    events.append((obj.user_id, "wallet.balance_changed", {
+                        "wallet_id": obj.id,
+                        "balance": new,
+                        "previous_balance": old,
+                    }))
+                else:
+                    events.append((obj.user_id, "wallet.balance_changed", {
+                        "wallet_id": obj.id,
+                        "balance": obj.balance if state == "new" else None,
+                        "previous_balance": None if state == "new" else obj.balance,
+                        "deleted": state == "deleted",
+                    }))
+            elif isinstance(obj, Expense):
+                _collect_expense(deltas, obj, state)
+
+
+def _crossed_budgets(deltas):
+    """Find budgets whose spending crossed an alert threshold in this commit.
+
+    Runs on a separate connection because the session can no longer emit SQL
+    once ``after_commit`` fires.
+    """
+    from app import db
+    from app.models import Budget, Expense
+
+    thresholds = sorted(current_app.config.get("LIVE_BUDGET_THRESHOLDS", (90, 100)))
+    crossed = []
+    with db.engine.connect() as conn:
+        for (user_id, category, month, year), added in deltas.items():
+            if added <= 0:
+                continue
+            budget = conn.execute(
+                select(Budget.id, Budget.amount).where(
+                    Budget.user_id == user_id,
+                    Budget.category == category,
+                    Budget.month == month,
+                    Budget.year == year,
+                )
+            ).first()
+            if not budget or not budget.amount:
+                continue
+
+            start = datetime(year, month, 1)
+            end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+            spent = conn.execute(
+                select(func.coalesce(func.sum(Expense.amount), 0)).where(
+                    Expense.user_id == user_id,
+                    Expense.category == category,
+                    Expense.is_expense.is_(True),
+                    Expense.date >= start,
+                    Expense.date < end,
+                )
+            ).scalar()
+            before = (spent - added) / budget.amount * 100
+            after = spent / budget.amount * 100
+            for threshold in thresholds:
+                if before < threshold <= after:
+                    crossed.append((user_id, {
+                        "budget_id": budget.id,
+                        "category": category,
+                        "month": month,
+                        "year": year,
+                        "threshold": threshold,
+                        "percentage": round(after, 1),
+                        "spent": spent,
+                        "amount": budget.amount,
+                    }))
+    return crossed
+
+
+def _after_commit(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    deltas = session.info.pop(_BUDGET_KEY, None)
+    if not _enabled():
+        return
+
+    for user_id, event_name, payload in events or ():
+        push_to_user(user_id, event_name, payload)
+
+    if deltas:
+        try:
+            for user_id, payload in _crossed_budgets(deltas):
+                push_to_user(user_id, "budget.threshold_crossed", payload)
+        except Exception as e:
+            logger.warning(f"Failed to check budget thresholds for live update: {e}")
+
+
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_BUDGET_KEY, None)
+
+
+def init_live_updates(session):
+    """Register the session hooks that feed the /live namespace (idempotent)"""
+    for name, fn in (
+        ("after_flush", _after_flush),
+        ("after_commit", _after_commit),
+        ("after_rollback", _after_rollback),
+    ):
+        if not event.contains(session, name, fn):
+            event.listen(session, name, fn)
@@ -0,0 +1,299 @@
+# app/utils/metrics.py
+"""
+In-process request metrics exposed in Prometheus text format at ``/metrics``.
+
+Collected app-wide from before/after_request hooks and SQLAlchemy engine
+events: per-route latency histograms, status counts, in-flight requests,
+DB queries and DB time per request, and AI model call latency.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MODEL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Paths that are never measured
+SKIP_PREFIXES = ("/static", "/metrics")
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    def _render_sample(self, key, value):
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def _render_sample(self, key, value):
+        counts, total, count = value
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            labels = _format_labels(self.labels, key, ("le", _format_value(float(bound))))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, key, ("le", "+Inf"))
+        lines.append(f"{self.name}_bucket{labels} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route",
+    labels=("method", "endpoint"),
+))
+REQUEST_COUNT = registry.register(Counter(
+    "http_requests_total", "Requests by route and status code",
+    labels=("method", "endpoint", "status"),
+))
+IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "Requests currently being handled",
+))
+REQUEST_DB_QUERIES = registry.register(Histogram(
+    "http_request_db_queries", "Database queries per request",
+    labels=("endpoint",), buckets=QUERY_COUNT_BUCKETS,
+))
+REQUEST_DB_TIME = registry.register(Histogram(
+    "http_request_db_duration_seconds", "Time spent in database queries per request",
+    labels=("endpoint",),
+))
+DB_QUERIES = registry.register(Counter(
+    "db_queries_total", "Database queries, including those outside requests",
+))
+MODEL_LATENCY = registry.register(Histogram(
+    "ai_model_call_duration_seconds", "AI model call latency",
+    labels=("operation", "status"), buckets=MODEL_BUCKETS,
+))
+
+RECEIPT_TIER_LATENCY = registry.register(Histogram(
+    "receipt_extraction_tier_duration_seconds", "Receipt extraction latency per tier (ocr, ai)",
+    labels=("tier", "outcome"), buckets=MODEL_BUCKETS,
+))
+RECEIPT_CACHE_LOOKUPS = registry.register(Counter(
+    "receipt_cache_lookups_total", "Receipt extraction cache lookups",
+    labels=("method", "result"),
+))
+
+
+def _endpoint_label():
+    rule = request.url_rule
+    return rule.rule if rule is not None else "<unmatched>"
+
+
+def record_model_call(operation, duration, error=False):
+    """Record one AI model call; also kept on ``g`` for per-request reporting"""
+    MODEL_LATENCY.observe(duration, operation=operation, status="error" if error else "ok")
+    if has_request_context():
+        calls = g.setdefault("model_calls", [])
+        calls.append({"operation": operation, "seconds": round(duration, 4), "error": error})
+
+
+class model_call_timer:
+    """Context manager timing a model call: ``with model_call_timer("generate_content"):``"""
+
+    def __init__(self, operation):
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A consumer closing a stream early is not a failed call
+        failed = exc_type is not None and not issubclass(exc_type, GeneratorExit)
+        record_model_call(self.operation, time.perf_counter() - self.start, failed)
+        return False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is dropped with the statement even
+    # when it raises (after_cursor_execute then never runs)
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    duration = time.perf_counter() - start
+    DB_QUERIES.inc()
+    if has_request_context() and "db_queries" in g:
+        g.db_queries += 1
+        g.db_time += duration
+
+
+def _start_request():
+    if request.path.startswith(SKIP_PREFIXES):
+        return
+    g.metrics_start = time.perf_counter()
+    g.db_queries = 0
+    g.db_time = 0.0
+    IN_FLIGHT.inc()
+
+
+def _finish_request(response):
+    start = g.pop("metrics_start", None)
+    if start is None:
+        return response
+
+    duration = time.perf_counter() - start
+    endpoint = _endpoint_label()
+    REQUEST_LATENCY.observe(duration, method=request.method, endpoint=endpoint)
+    REQUEST_COUNT.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    REQUEST_DB_QUERIES.observe(g.db_queries, endpoint=endpoint)
+    REQUEST_DB_TIME.observe(g.db_time, endpoint=endpoint)
+    IN_FLIGHT.dec()
+
+    threshold = current_app.config.get("SLOW_REQUEST_THRESHOLD")
+    if threshold and duration > threshold:
+        logger.warning(
+            f"Slow request: {request.method} {request.path} - Status: {response.status_code} "
+            f"- {duration:.3f}s, {g.db_queries} queries ({g.db_time:.3f}s)"
+        )
+    return response
+
+
+def _teardown_request(exc):
+    # after_request is skipped when the response itself fails to build
+    if g.pop("metrics_start", None) is not None:
+        IN_FLIGHT.dec()
+
+
+def metrics_view():
+    token = current_app.config.get("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+def init_metrics(app):
+    """Install request hooks, DB query listeners and the /metrics endpoint"""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    if app.config.get("METRICS_TOKEN") or not app.config.get("METRICS_REQUIRE_TOKEN"):
+        app.add_url_rule("/metrics", "metrics", metrics_view)
+    else:
+        logger.warning("METRICS_TOKEN is not set: /metrics is not served")
@@ -1,7 +1,7 @@
 from app import db
 from app.models import Notification, Budget, Expense, User
 from datetime import datetime
-from app.utils.email import send_email
+from app.utils.email import queue_email
 from flask import current_app
 import logging
 
@@ -91,10 +91,12 @@ class NotificationManager:
             and "mail" in current_app.extensions
         ):
             try:
-                send_email(
+                queue_email(
                     subject="Cảnh báo ngân sách",
                     recipient=user.email,
                     template="budget_alert",
+                    body=message,
+                    user_id=user.id,
                     user=user,
                     category=category,
                     percentage=int(
@@ -104,7 +106,7 @@ class NotificationManager:
                     budget_amount=budget_amount,
                 )
             except Exception as e:
-                logger.exception(f"Failed to send budget alert email: {e}")
+                logger.exception(f"Failed to queue budget alert email: {e}")
 
     @staticmethod
     def notify_unusual_spending(user, category, amount, average):
@@ -114,14 +116,16 @@ class NotificationManager:
 
         if current_app.config["NOTIFY_VIA_EMAIL"]:
             try:
-                send_email(
+                queue_email(
                     subject="Chi tiêu bất thường",
                     recipient=user.email,
                     template="unusual_spending",
+                    body=message,
+                    user_id=user.id,
                     user=user,
                     category=category,
                     amount=amount,
                     average=average,
                 )
             except Exception as e:
-                logger.exception(f"Failed to send unusual spending email: {e}")
+                logger.exception(f"Failed to queue unusual spending email: {e}")
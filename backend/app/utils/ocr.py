@@ -1,218 +1,565 @@
 # app/utils/ocr.py
-import cv2
-import numpy as np
-import pytesseract
+# cv2, numpy and pytesseract are imported inside the functions that use them:
+# they are slow to load and only the OCR path needs them
+"""
+Receipt OCR pipeline.
+
+Each photo is decoded straight to grayscale at roughly the resolution
+Tesseract reads best (libjpeg downscales by 2/4/8 while decoding), deskewed,
+and then OCR'd in several binarization variants in a process pool. The
+variant whose text yields the most fields (amount first, then date) wins.
+``process_images`` runs all variants of a batch of receipts concurrently.
+"""
+import io
+import logging
+import multiprocessing
+import os
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-import logging
+from typing import NamedTuple
 
 logger = logging.getLogger(__name__)
 
+OCR_VARIANTS = ("adaptive", "otsu", "gray")
 
-class ReceiptOCR:
-    def __init__(self):
-        # Improved pattern to match various Vietnamese invoice formats
-        # Matches: "TỔNG CỘNG TIỀN THANH TOÁN", "Tổng tiền", "Thanh toán", etc.
-        self.amount_pattern = r"(?:tổng\s+cộng\s+tiền\s+thanh\s+toán|tổng\s+cộng|tổng\s+tiền|total|thanh\s+toán|phải\s+trả)[\s:]*([\d,\.\s]+)\s*(?:VND|₫|đ|vnđ)?"
-        
-        # Fee patterns (VAT, service fee, etc.)
-        self.fee_patterns = [
-            r"(?:tiền\s+thuế\s+gtgt|thuế\s+gtgt|vat|thuế\s+giá\s+trị\s+gia\s+tăng)[\s:]*([\d,\.\s]+)\s*(?:VND|₫|đ|vnđ)?",
-            r"(?:phí\s+dịch\s+vụ|service\s+fee|phí\s+service)[\s:]*([\d,\.\s]+)\s*(?:VND|₫|đ|vnđ)?",
-            r"(?:thuế\s+suất)[\s:]*(\d+(?:[.,]\d+)?)\s*%",
-        ]
-        
-        # Note/description patterns (merchant name, invoice number, etc.)
-        self.note_patterns = [
-            r"(?:đơn\s+vị\s+bán|người\s+bán|merchant|seller)[\s:]*([^\n]+)",
-            r"(?:mã\s+số\s+hóa\s+đơn|số\s+hóa\s+đơn|invoice\s+no|mã\s+hóa\s+đơn)[\s:]*([^\n]+)",
-            r"(?:ghi\s+chú|note|mô\s+tả|description)[\s:]*([^\n]+)",
-        ]
-        # More robust date patterns (including time, and variations)
-        self.date_patterns = [
-            r"(\d{1,2})[/-](\d{1,2})[/-](\d{2,4})\s*(\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # DD/MM/YYYY HH:MM:SS
-            r"(\d{2,4})[/-](\d{1,2})[/-](\d{1,2})\s*(\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # YYYY/MM/DD HH:MM:SS
-            r"(\d{1,2})\s+(?:thg|tháng)\s+(\d{1,2})(?:\s+năm)?\s+(\d{2,4})\s*(\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # DD thg MM năm YYYY or DD thg MM YYYY
-            r"(\d{1,2})\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{2,4})\s*(\d{1,2}:\d{1,2}(?::\d{1,2})?)?",  # English date
-        ]
-        
-        # Check if Tesseract is available
+_pool = None
+_pool_lock = threading.Lock()
+_languages = None
+
+
+def decode_image(image_data, target_width=1000):
+    """Decode to grayscale no wider than ``target_width`` pixels, or None"""
+    import cv2
+    import numpy as np
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as probe:
+            width = probe.size[0]  # header only, no pixel decode
+    except Exception:
+        width = 0
+
+    flag = cv2.IMREAD_GRAYSCALE
+    for factor, reduced in (
+        (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+        (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+        (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+    ):
+        if width >= target_width * factor:
+            flag = reduced
+            break
+
+    gray = cv2.imdecode(np.frombuffer(image_data, np.uint8), flag)
+    if gray is None:
+        return None
+    if gray.shape[1] > target_width:
+        scale = target_width / gray.shape[1]
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+
+def _rotate(image, angle, border=None):
+    """Rotate about the center; corners are filled with ``border`` or, by
+    default, by replicating the edge so no artificial lines appear"""
+    import cv2
+
+    height, width = image.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    if border is None:
+        return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_REPLICATE)
+    return cv2.warpAffine(image, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                          borderMode=cv2.BORDER_CONSTANT, borderValue=border)
+
+
+def estimate_skew(gray, max_angle=10.0):
+    """Angle (degrees) that makes text lines horizontal, by projection profile"""
+    import cv2
+    import numpy as np
+
+    scale = min(1.0, 400 / gray.shape[1])
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    # Local threshold: marks strokes, not the table around the receipt
+    ink = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 15)
+
+    def sharpness(angle):
+        # Aligned text gives alternating full and empty rows
+        return float(np.var(_rotate(ink, angle, border=0).sum(axis=1, dtype=np.float64)))
+
+    best = max(np.arange(-max_angle, max_angle + 0.5, 0.5), key=sharpness)
+    return round(float(max(np.arange(best - 0.4, best + 0.5, 0.1), key=sharpness)), 1)
+
+
+def deskew(gray, max_angle=10.0):
+    angle = estimate_skew(gray, max_angle)
+    return (_rotate(gray, angle) if abs(angle) >= 0.3 else gray), angle
+
+
+def binarize(gray, variant):
+    """One preprocessing variant of a deskewed grayscale receipt"""
+    import cv2
+
+    if variant == "adaptive":
+        return cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15
+        )
+    if variant == "otsu":
+        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        return cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+    if variant == "gray":
+        return gray  # let Tesseract binarize
+    raise ValueError(f"Unknown OCR variant: {variant!r}")
+
+
+def ocr_available():
+    """Whether the Tesseract binary can be found (checked per call; cheap)"""
+    import shutil
+
+    try:
+        import pytesseract
+    except ImportError:
+        return False
+    return shutil.which(pytesseract.pytesseract.tesseract_cmd) is not None
+
+
+def _tesseract_language():
+    """"vie" when its traineddata is installed, else "eng" (checked once)"""
+    global _languages
+    if _languages is None:
+        import pytesseract
+
+        _languages = pytesseract.get_languages(config="")
+    return "vie" if "vie" in _languages else "eng"
+
+
+def _init_worker():
+    # One Tesseract thread per process; the pool provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_variant(gray, variant, tesseract_config):
+    """Pool task: OCR one variant. Errors are returned, not raised, so they
+    cross the process boundary intact."""
+    import pytesseract
+
+    try:
+        text = pytesseract.image_to_string(
+            binarize(gray, variant), lang=_tesseract_language(), config=tesseract_config
+        )
+        return {"variant": variant, "text": text}
+    except pytesseract.TesseractNotFoundError:
+        return {"variant": variant, "error": "not_found"}
+    except Exception as e:
+        return {"variant": variant, "error": str(e)}
+
+
+def _get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded (or monkey-patched) server is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the OCR worker processes (called on server shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+# Field patterns, compiled once. Amount, fee and note patterns run on the
+# lowercased text; invoice-number and date patterns on the original text.
+_CURRENCY = r"\s*(?:VND|₫|đ|vnđ)?"
+# Matches: "TỔNG CỘNG TIỀN THANH TOÁN", "Tổng tiền", "Thanh toán", etc.
+_AMOUNT_KEYWORDS = r"tổng\s+cộng\s+tiền\s+thanh\s+toán|tổng\s+cộng|tổng\s+tiền|total|thanh\s+toán|phải\s+trả"
+# VAT, service fee, tax rate
+_FEE_KEYWORDS = (
+    r"tiền\s+thuế\s+gtgt|thuế\s+gtgt|vat|thuế\s+giá\s+trị\s+gia\s+tăng",
+    r"phí\s+dịch\s+vụ|service\s+fee|phí\s+service",
+    r"thuế\s+suất",
+)
+# Merchant name, invoice number line, free-text note
+_NOTE_KEYWORDS = (
+    r"đơn\s+vị\s+bán|người\s+bán|merchant|seller",
+    r"mã\s+số\s+hóa\s+đơn|số\s+hóa\s+đơn|invoice\s+no|mã\s+hóa\s+đơn",
+    r"ghi\s+chú|note|mô\s+tả|description",
+)
+_INVOICE_KEYWORDS = (r"số|no|mã", r"hóa\s+đơn|invoice")
+_TIME = r"\s*(\d{1,2}:\d{1,2}(?::\d{1,2})?)?"
+_MONTHS = "Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec"
+
+AMOUNT_PATTERN = re.compile(rf"(?:{_AMOUNT_KEYWORDS})[\s:]*([\d,\.\s]+){_CURRENCY}", re.IGNORECASE)
+FEE_PATTERNS = (
+    re.compile(rf"(?:{_FEE_KEYWORDS[0]})[\s:]*([\d,\.\s]+){_CURRENCY}", re.IGNORECASE),
+    re.compile(rf"(?:{_FEE_KEYWORDS[1]})[\s:]*([\d,\.\s]+){_CURRENCY}", re.IGNORECASE),
+    re.compile(rf"(?:{_FEE_KEYWORDS[2]})[\s:]*(\d+(?:[.,]\d+)?)\s*%", re.IGNORECASE),
+)
+NOTE_PATTERNS = tuple(re.compile(rf"(?:{k})[\s:]*([^\n]+)", re.IGNORECASE) for k in _NOTE_KEYWORDS)
+INVOICE_PATTERNS = (
+    re.compile(rf"(?:{_INVOICE_KEYWORDS[0]})[\s:]*(\d{{6,}})", re.IGNORECASE),  # usually 6+ digits
+    re.compile(rf"(?:{_INVOICE_KEYWORDS[1]})[\s#:]*(\d+)", re.IGNORECASE),  # Invoice #123
+)
+DATE_PATTERNS = (
+    re.compile(rf"(\d{{1,2}})[/-](\d{{1,2}})[/-](\d{{2,4}}){_TIME}", re.IGNORECASE),  # DD/MM/YYYY HH:MM:SS
+    re.compile(rf"(\d{{2,4}})[/-](\d{{1,2}})[/-](\d{{1,2}}){_TIME}", re.IGNORECASE),  # YYYY/MM/DD HH:MM:SS
+    re.compile(rf"(\d{{1,2}})\s+(?:thg|tháng)\s+(\d{{1,2}})(?:\s+năm)?\s+(\d{{2,4}}){_TIME}", re.IGNORECASE),  # DD thg MM năm YYYY
+    re.compile(rf"(\d{{1,2}})\s+({_MONTHS})\s+(\d{{2,4}}){_TIME}", re.IGNORECASE),  # English date
+)
+
+# (field, rule, pattern, runs on lowercased text?) for every field pattern
+_RULES = (
+    (("amount", 0, AMOUNT_PATTERN, True),)
+    + tuple(("fee", i, p, True) for i, p in enumerate(FEE_PATTERNS))
+    + tuple(("note", i, p, True) for i, p in enumerate(NOTE_PATTERNS))
+    + tuple(("invoice", i, p, False) for i, p in enumerate(INVOICE_PATTERNS))
+    + tuple(("date", i, p, False) for i, p in enumerate(DATE_PATTERNS))
+)
+_RULE_KEYWORDS = (
+    (_AMOUNT_KEYWORDS,) + _FEE_KEYWORDS + _NOTE_KEYWORDS + _INVOICE_KEYWORDS
+    + (r"\d",) * len(DATE_PATTERNS)
+)
+# Rules to try at a trigger, by its first (lowercased) character
+_RULES_BY_CHAR = {}
+for _rule, _keywords in zip(_RULES, _RULE_KEYWORDS):
+    _chars = "0123456789" if _keywords == r"\d" else {k[0] for k in _keywords.split("|")}
+    for _char in _chars:
+        _RULES_BY_CHAR.setdefault(_char, []).append(_rule)
+del _rule, _keywords, _chars, _char
+_DATE_RULES = _RULES_BY_CHAR["0"]  # also for non-ASCII digits, which \d matches
+
+# Zero-width match at every position where some field pattern could start:
+# a keyword, or the digits opening a date. Runs on the lowercased text, so
+# no IGNORECASE (it makes this scan about three times slower).
+_TRIGGER = re.compile(
+    "(?=" + "|".join(
+        (_AMOUNT_KEYWORDS,) + _FEE_KEYWORDS + _NOTE_KEYWORDS + _INVOICE_KEYWORDS
+        + (r"\d{1,4}[/-]", rf"\d{{1,2}}\s+(?:thg|tháng|{_MONTHS.lower()})")
+    ) + ")"
+)
+
+# Prior confidence of a candidate by (field, rule); see Candidate.confidence
+_RULE_CONFIDENCE = {
+    "amount": (0.8,),
+    "fee": (0.8, 0.8, 0.5),
+    "note": (0.7, 0.7, 0.5),
+    "invoice": (0.8, 0.6),
+    "date": (0.8, 0.6, 0.8, 0.6),
+}
+
+
+class Candidate(NamedTuple):
+    """One field match found by ``scan``"""
+    field: str  # "amount", "fee", "note", "invoice" or "date"
+    rule: int  # index of the pattern within its field, in priority order
+    start: int
+    end: int
+    match: re.Match
+
+    @property
+    def value(self):
+        return self.match.group(1)
+
+    @property
+    def confidence(self):
+        """Rule prior, raised when a currency marker or time backs the match up"""
+        confidence = _RULE_CONFIDENCE[self.field][self.rule]
+        if self.field in ("amount", "fee") and not self.match.group(0).rstrip().endswith(self.value.rstrip()):
+            confidence += 0.1  # followed by VND/₫/đ/%
+        if self.field == "date" and self.match.group(4):
+            confidence += 0.1
+        return round(min(confidence, 1.0), 2)
+
+
+def scan(text):
+    """Field candidates in ``text`` as ``{(field, rule): [Candidate, ...]}``.
+
+    One pass of ``_TRIGGER`` finds every position where a field can start;
+    only there are the field patterns tried. Candidates are in positional
+    order and may overlap; the ``_select_*`` helpers apply ``re.findall``'s
+    left-to-right, non-overlapping order where it matters.
+    """
+    lowered = text.lower()
+    candidates = {}
+    if len(lowered) != len(text):
+        # Lowercasing changed offsets (e.g. "İ"), so positions found in one
+        # text don't line up with the other: scan each pattern separately
+        for field, rule, pattern, on_lowered in _RULES:
+            for match in pattern.finditer(lowered if on_lowered else text):
+                candidates.setdefault((field, rule), []).append(
+                    Candidate(field, rule, match.start(), match.end(), match))
+        return candidates
+
+    for trigger in _TRIGGER.finditer(lowered):
+        pos = trigger.start()
+        for field, rule, pattern, on_lowered in _RULES_BY_CHAR.get(lowered[pos], _DATE_RULES):
+            match = pattern.match(lowered if on_lowered else text, pos)
+            if match:
+                candidates.setdefault((field, rule), []).append(
+                    Candidate(field, rule, pos, match.end(), match))
+    return candidates
+
+
+def _findall_order(candidates):
+    """Keep the candidates ``re.findall`` would return: leftmost first, no overlaps"""
+    kept, end = [], 0
+    for candidate in candidates:
+        if candidate.start >= end:
+            kept.append(candidate)
+            end = candidate.end
+    return kept
+
+
+def _parse_number(value):
+    # VND: dots and commas are thousand separators; amounts are whole numbers
+    return float(value.strip().replace(" ", "").replace(".", "").replace(",", ""))
+
+
+def _select_amount(candidates):
+    matches = _findall_order(candidates.get(("amount", 0), ()))
+    if not matches:
+        return None
+    # Use the LAST match (usually the final total)
+    try:
+        return _parse_number(matches[-1].value)
+    except ValueError:
+        return None
+
+
+def _select_date(candidates):
+    for rule in range(len(DATE_PATTERNS)):
+        matches = candidates.get(("date", rule))
+        if not matches:
+            continue
+        match = matches[0].match
         try:
-            pytesseract.get_tesseract_version()
-            logger.info("Tesseract OCR is available")
-        except Exception as e:
-            logger.warning(f"Tesseract OCR check failed: {e}")
+            day, month, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+            # Handle 2-digit years
+            if len(str(year)) == 2:
+                year = 2000 + year if year <= 99 else 1900 + year
 
-    def process_image(self, image_data):
+            time_str = match.group(4)
+            if time_str:
+                time_parts = [int(x) for x in time_str.split(":")]
+                hour, minute = time_parts[0], time_parts[1]
+                second = time_parts[2] if len(time_parts) == 3 else 0
+            else:
+                hour, minute, second = 0, 0, 0
+
+            return datetime(year, month, day, hour, minute, second)
+        except ValueError:
+            continue  # Try the next pattern if this one fails
+    return None
+
+
+def _select_fee(candidates):
+    for rule in range(len(FEE_PATTERNS)):
+        matches = _findall_order(candidates.get(("fee", rule), ()))
+        if not matches:
+            continue
+        # The last match is usually the final fee amount. A tax rate
+        # ("thuế suất 10%") comes back as the percentage itself.
         try:
-            if not image_data or len(image_data) == 0:
-                return {"error": "Image data is empty"}
-            
-            nparr = np.frombuffer(image_data, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            if img is None:
-                return {"error": "Failed to decode image. Please ensure the file is a valid image format (JPG, PNG)."}
-
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-            # Adaptive thresholding is better for varying lighting
-            thresh = cv2.adaptiveThreshold(
-                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-            )
+            return _parse_number(matches[-1].value)
+        except ValueError:
+            continue
+    return None
+
+
+def _select_note(candidates):
+    notes = []
+    # Merchant name, invoice number line, free-text note: first of each
+    for rule in range(len(NOTE_PATTERNS)):
+        matches = candidates.get(("note", rule))
+        if matches:
+            note = matches[0].value.strip()
+            if note and len(note) > 3:  # Filter out very short matches
+                notes.append(note)
+
+    for rule in range(len(INVOICE_PATTERNS)):
+        matches = candidates.get(("invoice", rule))
+        if matches:
+            invoice_no = matches[0].value.strip()
+            if invoice_no:
+                notes.append(f"Mã HĐ: {invoice_no}")
+
+    if notes:
+        return " | ".join(notes[:3])  # Limit to first 3 notes
+    return None
+
+
+def get_receipt_ocr():
+    """The app's ReceiptOCR, built from its config on first use"""
+    from flask import current_app
+
+    extensions = current_app.extensions
+    if "receipt_ocr" not in extensions:
+        extensions["receipt_ocr"] = ReceiptOCR.from_config(current_app.config)
+    return extensions["receipt_ocr"]
+
+
+def _tesseract_install_hint():
+    import platform
 
-            # Try OCR with Vietnamese language
+    system = platform.system()
+    if system == "Darwin":  # macOS
+        return "Install with: brew install tesseract tesseract-lang"
+    if system == "Linux":
+        return "Install with: sudo apt-get install tesseract-ocr tesseract-ocr-vie"
+    if system == "Windows":
+        return "Download from: https://github.com/UB-Mannheim/tesseract/wiki"
+    return "Please install Tesseract OCR from https://github.com/tesseract-ocr/tesseract"
+
+
+class ReceiptOCR:
+    def __init__(self, workers=None, target_width=1000, variants=OCR_VARIANTS,
+                 tesseract_config="--psm 4", timeout=60):
+        # workers=0 runs the variants inline (no process pool)
+        self.workers = min(4, os.cpu_count() or 1) if workers is None else workers
+        self.target_width = target_width
+        self.variants = tuple(variants)
+        if not self.variants:
+            raise ValueError("OCR_VARIANTS must name at least one preprocessing variant")
+        self.tesseract_config = tesseract_config
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config):
+        variants = config.get("OCR_VARIANTS", ",".join(OCR_VARIANTS))
+        return cls(
+            workers=config.get("OCR_WORKERS"),
+            target_width=config.get("OCR_TARGET_WIDTH", 1000),
+            variants=[v.strip() for v in variants.split(",") if v.strip()],
+            tesseract_config=config.get("OCR_TESSERACT_CONFIG", "--psm 4"),
+            timeout=config.get("OCR_TIMEOUT", 60),
+        )
+
+    def process_image(self, image_data):
+        return self.process_images([image_data])[0]
+
+    def process_images(self, images):
+        """OCR a batch of receipts; one result dict (or {"error": ...}) per image"""
+        results = [None] * len(images)
+        jobs = []
+        for index, image_data in enumerate(images):
+            # One bad upload only fails its own result, never the batch
             try:
-                text = pytesseract.image_to_string(thresh, lang="vie")
-            except pytesseract.TesseractNotFoundError:
-                logger.error("Tesseract OCR is not installed or not in PATH")
-                import platform
-                system = platform.system()
-                if system == "Darwin":  # macOS
-                    install_msg = "Install with: brew install tesseract tesseract-lang"
-                elif system == "Linux":
-                    install_msg = "Install with: sudo apt-get install tesseract-ocr tesseract-ocr-vie"
-                elif system == "Windows":
-                    install_msg = "Download from: https://github.com/UB-Mannheim/tesseract/wiki"
-                else:
-                    install_msg = "Please install Tesseract OCR from https://github.com/tesseract-ocr/tesseract"
-                return {"error": f"Tesseract OCR not found. {install_msg}"}
-            except pytesseract.TesseractError as e:
-                logger.error(f"Tesseract OCR error: {e}")
-                # Fallback to English if Vietnamese language pack is not available
+                results[index] = self._prepare(index, image_data, jobs)
+            except ImportError as e:
+                logger.exception(f"Missing required library: {e}")
+                results[index] = {"error": f"Missing required library: {str(e)}"}
+            except Exception as e:
+                logger.exception(f"Error preparing receipt image {index}: {e}")
+                results[index] = {"error": f"Failed to process image: {str(e)}"}
+
+        outputs = {}
+        for (index, _, _), output in zip(jobs, self._run(jobs)):
+            outputs.setdefault(index, []).append(output)
+
+        for index, variant_outputs in outputs.items():
+            results[index] = self._pick_best(variant_outputs)
+        return results
+
+    def _prepare(self, index, image_data, jobs):
+        """Decode and deskew one image and queue its variants; an error dict if unusable"""
+        if not image_data:
+            return {"error": "Image data is empty"}
+        gray = decode_image(image_data, self.target_width)
+        if gray is None:
+            return {"error": "Failed to decode image. Please ensure the file is a valid image format (JPG, PNG)."}
+        gray, _ = deskew(gray)
+        jobs.extend((index, gray, variant) for variant in self.variants)
+        return None
+
+    def _run(self, jobs):
+        """OCR every (index, gray, variant) job, in the pool unless workers=0"""
+        if self.workers == 0:
+            outputs = []
+            for _, gray, variant in jobs:
                 try:
-                    text = pytesseract.image_to_string(thresh, lang="eng")
-                    logger.warning("Vietnamese OCR failed, using English as fallback")
-                except Exception as fallback_error:
-                    logger.error(f"Fallback OCR also failed: {fallback_error}")
-                    return {"error": f"OCR processing failed: {str(e)}"}
-            except Exception as ocr_error:
-                logger.error(f"OCR error: {ocr_error}")
-                return {"error": f"OCR processing failed: {str(ocr_error)}"}
+                    outputs.append(_ocr_variant(gray, variant, self.tesseract_config))
+                except Exception as e:
+                    outputs.append({"variant": variant, "error": str(e)})
+            return outputs
 
-            if not text or not text.strip():
-                return {"error": "Could not extract text from image. Please ensure the image is clear and readable."}
+        pool = _get_pool(self.workers)
+        futures = [pool.submit(_ocr_variant, gray, variant, self.tesseract_config) for _, gray, variant in jobs]
+        done, _ = wait(futures, timeout=self.timeout)
+        if any(isinstance(f.exception(), BrokenProcessPool) for f in done):
+            shutdown_pool()  # a worker died; start a fresh pool next time
+        outputs = []
+        for (_, _, variant), future in zip(jobs, futures):
+            if future not in done:
+                future.cancel()
+                outputs.append({"variant": variant, "error": "timeout"})
+            elif future.exception() is not None:
+                outputs.append({"variant": variant, "error": str(future.exception())})
+            else:
+                outputs.append(future.result())
+        return outputs
 
-            amount = self._extract_amount(text)
-            date = self._extract_date(text)
-            fee = self._extract_fee(text)
-            note = self._extract_note(text)
+    def extract_fields(self, text):
+        candidates = scan(text)
+        return {
+            "amount": _select_amount(candidates),
+            "date": _select_date(candidates),
+            "fee": _select_fee(candidates),
+            "note": _select_note(candidates),
+        }
 
-            return {"amount": amount, "date": date, "fee": fee, "note": note, "text": text}
-        except ImportError as e:
-            logger.exception(f"Missing required library: {e}")
-            return {"error": f"Missing required library: {str(e)}"}
-        except Exception as e:
-            logger.exception(f"Error during OCR processing: {e}")
-            return {"error": f"OCR processing failed: {str(e)}"}
+    @staticmethod
+    def score(fields):
+        """Extraction confidence: the amount matters most, then the date"""
+        return (
+            2 * (fields["amount"] is not None)
+            + (fields["date"] is not None)
+            + 0.5 * (fields["fee"] is not None)
+            + 0.5 * (fields["note"] is not None)
+        )
+
+    def _pick_best(self, outputs):
+        best = None
+        for output in outputs:
+            text = output.get("text")
+            if not text or not text.strip():
+                continue
+            fields = self.extract_fields(text)
+            candidate = dict(fields, text=text, variant=output["variant"], score=self.score(fields))
+            # Ties keep the earlier variant in OCR_VARIANTS order
+            if best is None or candidate["score"] > best["score"]:
+                best = candidate
+        if best is not None:
+            return best
+
+        errors = [o["error"] for o in outputs if o.get("error")]
+        if "not_found" in errors:
+            logger.error("Tesseract OCR is not installed or not in PATH")
+            return {"error": f"Tesseract OCR not found. {_tesseract_install_hint()}"}
+        if errors:
+            logger.error(f"OCR error: {errors[0]}")
+            return {"error": f"OCR processing failed: {errors[0]}"}
+        return {"error": "Could not extract text from image. Please ensure the image is clear and readable."}
 
     def _extract_amount(self, text):
-        text = text.lower()
-        matches = re.findall(self.amount_pattern, text, re.IGNORECASE)
-        if matches:
-            # Use the LAST match (usually the final total)
-            amount_str = matches[-1].strip()
-            # Remove all whitespace
-            amount_str = amount_str.replace(" ", "")
-            # For VND format: dots are thousand separators, commas are decimal
-            # Remove dots (thousand separators) and keep commas (decimal if present)
-            # But most VND amounts are whole numbers, so we'll remove both
-            amount_str = amount_str.replace(".", "").replace(",", "")
-            try:
-                return float(amount_str)
-            except ValueError:
-                return None
-        return None
+        return _select_amount(scan(text))
 
     def _extract_date(self, text):
-        for pattern in self.date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    # Handle different date formats
-                    if len(match.groups()) >= 3:  # At least day, month, year
-                        day, month, year = (
-                            int(match.group(1)),
-                            int(match.group(2)),
-                            int(match.group(3)),
-                        )
-
-                        # Handle 2-digit years
-                        if len(str(year)) == 2:
-                            year = 2000 + year if year <= 99 else 1900 + year
-
-                        # Handle time (if present)
-                        time_str = match.group(4) if len(match.groups()) >= 4 else None
-                        if time_str:
-                            time_parts = [int(x) for x in time_str.split(":")]
-                            hour, minute = time_parts[0], time_parts[1]
-                            second = time_parts[2] if len(time_parts) == 3 else 0
-                        else:
-                            hour, minute, second = 0, 0, 0
-
-                        return datetime(year, month, day, hour, minute, second)
-                except ValueError:
-                    continue  # Try the next pattern if this one fails
-        return None
+        return _select_date(scan(text))
 
     def _extract_fee(self, text):
         """Extract fees (VAT, service fees, etc.) from text"""
-        text_lower = text.lower()
-        
-        # Try to find VAT amount
-        for pattern in self.fee_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            if matches:
-                # Get the last match (usually the final fee amount)
-                fee_str = matches[-1].strip()
-                # Remove whitespace and separators
-                fee_str = fee_str.replace(" ", "").replace(".", "").replace(",", "")
-                
-                # If it's a percentage, calculate from total amount
-                if "%" in str(matches[-1]):
-                    try:
-                        percentage = float(fee_str.replace("%", ""))
-                        # We'll need the total amount to calculate, but for now just return None
-                        # The frontend can calculate this if needed
-                        return None
-                    except ValueError:
-                        continue
-                
-                try:
-                    return float(fee_str)
-                except ValueError:
-                    continue
-        
-        return None
+        return _select_fee(scan(text))
 
     def _extract_note(self, text):
         """Extract notes/descriptions from invoice (merchant name, invoice number, etc.)"""
-        notes = []
-        text_lower = text.lower()
-        
-        # Extract merchant/seller name
-        for pattern in self.note_patterns:
-            matches = re.findall(pattern, text_lower, re.IGNORECASE)
-            if matches:
-                # Get the first meaningful match
-                note = matches[0].strip()
-                if note and len(note) > 3:  # Filter out very short matches
-                    notes.append(note)
-        
-        # Also try to extract invoice number from common patterns
-        invoice_patterns = [
-            r"(?:số|no|mã)[\s:]*(\d{6,})",  # Invoice number (usually 6+ digits)
-            r"(?:hóa\s+đơn|invoice)[\s#:]*(\d+)",  # Invoice #123
-        ]
-        
-        for pattern in invoice_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                invoice_no = match.group(1).strip()
-                if invoice_no:
-                    notes.append(f"Mã HĐ: {invoice_no}")
-        
-        # Combine notes
-        if notes:
-            return " | ".join(notes[:3])  # Limit to first 3 notes
-        
-        return None
+        return _select_note(scan(text))
@@ -0,0 +1,230 @@
+# app/utils/passwords.py
+"""
+Pluggable password hashing.
+
+``PASSWORD_HASHER`` picks the scheme new hashes use: ``scrypt`` or
+``pbkdf2`` (werkzeug), ``bcrypt``, or ``argon2`` (needs argon2-cffi). Every
+installed scheme can still verify its own hashes, and ``verify`` reports
+when a stored hash uses another scheme or other cost parameters, so that
+``User.check_password`` can rehash on a successful login.
+
+Hashing is CPU-bound by design. ``run_bounded`` runs it on at most
+``PASSWORD_HASH_WORKERS`` native threads: a burst of logins queues instead
+of oversubscribing the CPU, and under gevent/eventlet the hub keeps serving
+other greenlets (Socket.IO included) while a hash is computed.
+"""
+
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SCHEMES = ("scrypt", "pbkdf2", "bcrypt", "argon2")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class WerkzeugHasher:
+    """werkzeug's ``method$salt$hash`` format, e.g. ``scrypt:32768:8:1$...``"""
+
+    def __init__(self, method):
+        self.method = method
+        self.name = method.split(":")[0]
+
+    def hash(self, password):
+        from werkzeug.security import generate_password_hash
+
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, stored, password):
+        from werkzeug.security import check_password_hash
+
+        return check_password_hash(stored, password)
+
+    def identify(self, stored):
+        return stored.startswith(f"{self.name}:")
+
+    def needs_rehash(self, stored):
+        return stored.split("$", 1)[0] != self.method
+
+
+class BcryptHasher:
+    """``$2b$<rounds>$...``; bcrypt only reads the first 72 bytes of a password"""
+
+    name = "bcrypt"
+
+    def __init__(self, rounds=12):
+        import bcrypt
+
+        self._bcrypt = bcrypt
+        self.rounds = rounds
+
+    @staticmethod
+    def _secret(password):
+        return password.encode("utf-8")[:72]  # bcrypt 5 raises instead of truncating
+
+    def hash(self, password):
+        return self._bcrypt.hashpw(self._secret(password), self._bcrypt.gensalt(self.rounds)).decode("ascii")
+
+    def verify(self, stored, password):
+        try:
+            return self._bcrypt.checkpw(self._secret(password), stored.encode("ascii"))
+        except ValueError:
+            return False
+
+    def identify(self, stored):
+        return stored[:4] in ("$2a$", "$2b$", "$2y$")
+
+    def needs_rehash(self, stored):
+        return stored[:4] != "$2b$" or int(stored[4:6]) != self.rounds
+
+
+class Argon2Hasher:
+    """``$argon2id$v=19$m=...,t=...,p=...$...`` via argon2-cffi"""
+
+    name = "argon2"
+
+    def __init__(self, time_cost=3, memory_cost=65536, parallelism=4):
+        from argon2 import PasswordHasher
+        from argon2.exceptions import InvalidHashError, VerificationError
+
+        self._hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        self._errors = (InvalidHashError, VerificationError)
+
+    def hash(self, password):
+        return self._hasher.hash(password)
+
+    def verify(self, stored, password):
+        try:
+            return self._hasher.verify(stored, password)
+        except self._errors:
+            return False
+
+    def identify(self, stored):
+        return stored.startswith("$argon2")
+
+    def needs_rehash(self, stored):
+        return self._hasher.check_needs_rehash(stored)
+
+
+def create_hasher(scheme, config):
+    """Hasher for ``scheme`` with its cost parameters from ``config``"""
+    if scheme == "scrypt":
+        n = int(config.get("PASSWORD_SCRYPT_N", 32768))
+        r = int(config.get("PASSWORD_SCRYPT_R", 8))
+        p = int(config.get("PASSWORD_SCRYPT_P", 1))
+        return WerkzeugHasher(f"scrypt:{n}:{r}:{p}")
+    if scheme == "pbkdf2":
+        return WerkzeugHasher(f"pbkdf2:sha256:{int(config.get('PASSWORD_PBKDF2_ITERATIONS', 1_000_000))}")
+    if scheme == "bcrypt":
+        return BcryptHasher(rounds=int(config.get("PASSWORD_BCRYPT_ROUNDS", 12)))
+    if scheme == "argon2":
+        return Argon2Hasher(
+            time_cost=int(config.get("PASSWORD_ARGON2_TIME_COST", 3)),
+            memory_cost=int(config.get("PASSWORD_ARGON2_MEMORY_COST", 65536)),
+            parallelism=int(config.get("PASSWORD_ARGON2_PARALLELISM", 4)),
+        )
+    raise ValueError(f"Unknown PASSWORD_HASHER: {scheme!r}")
+
+
+class PasswordHashers:
+    """The configured scheme plus every installed one, for verifying old hashes"""
+
+    def __init__(self, scheme, config):
+        self.primary = create_hasher(scheme, config)
+        self.hashers = [self.primary]
+        for other in SCHEMES:
+            if other == scheme:
+                continue
+            try:
+                self.hashers.append(create_hasher(other, config))
+            except ImportError:
+                pass  # optional dependency not installed
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get("PASSWORD_HASHER", "scrypt"), config)
+
+    def hash(self, password):
+        return run_bounded(self.primary.hash, password)
+
+    def verify(self, stored, password):
+        """Return ``(valid, needs_rehash)``"""
+        if not stored or password is None:
+            return False, False
+        hasher = next((h for h in self.hashers if h.identify(stored)), None)
+        if hasher is None:
+            logger.warning("Password hash in an unknown format")
+            return False, False
+        valid = run_bounded(hasher.verify, stored, password)
+        if not valid:
+            return False, False
+        return True, hasher is not self.primary or self.primary.needs_rehash(stored)
+
+
+def get_hashers():
+    """The app's PasswordHashers, built from its config on first use"""
+    from flask import current_app
+
+    extensions = current_app.extensions
+    if "password_hashers" not in extensions:
+        extensions["password_hashers"] = PasswordHashers.from_config(current_app.config)
+    return extensions["password_hashers"]
+
+
+def _workers():
+    from flask import current_app, has_app_context
+
+    workers = current_app.config.get("PASSWORD_HASH_WORKERS") if has_app_context() else None
+    return int(workers or os.cpu_count() or 1)
+
+
+def _green_runner():
+    """A way to run a call on a native thread, if a green-thread library is active"""
+    gevent_monkey = sys.modules.get("gevent.monkey")
+    if gevent_monkey is not None and gevent_monkey.is_module_patched("threading"):
+        from gevent.threadpool import ThreadPool
+
+        return "gevent", ThreadPool(_workers())
+    eventlet_patcher = sys.modules.get("eventlet.patcher")
+    if eventlet_patcher is not None and eventlet_patcher.is_monkey_patched("thread"):
+        from eventlet import tpool
+        from eventlet.semaphore import Semaphore
+
+        return "eventlet", (tpool, Semaphore(_workers()))
+    return "threading", ThreadPoolExecutor(max_workers=_workers(), thread_name_prefix="password-hash")
+
+
+def run_bounded(fn, *args):
+    """Call ``fn(*args)`` on the bounded hashing pool and wait for the result"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _green_runner()
+    kind, pool = _pool
+    if kind == "gevent":
+        return pool.apply(fn, args)
+    if kind == "eventlet":
+        tpool, semaphore = pool
+        with semaphore:
+            return tpool.execute(fn, *args)
+    return pool.submit(fn, *args).result()
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+    kind, executor = pool
+    if kind == "threading":
+        executor.shutdown(wait=False)
+    elif kind == "gevent":
+        executor.kill()
+
@@ -0,0 +1,176 @@
+# app/utils/profiler.py
+"""
+Opt-in sampling profiler for requests.
+
+When ``PROFILER_ENABLED`` is set, a ``PROFILER_SAMPLE_RATE`` fraction of
+requests (plus any request from the admin carrying an ``X-Profile`` header) is
+run under cProfile. Each profile is written to ``PROFILER_DIR`` together with
+its route, status, duration, query count and AI model call timings. The
+directory is a ring buffer of at most ``PROFILER_MAX_PROFILES`` entries; the
+admin "Profiles" view lists and downloads them.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import uuid
+from datetime import datetime
+
+from flask import current_app, g, request
+from flask_login import current_user
+
+logger = logging.getLogger(__name__)
+
+_PROFILE_ID = re.compile(r"^\d+-[0-9a-f]{8}$")
+
+
+class ProfileStore:
+    """Bounded on-disk store of ``<id>.prof`` (pstats) + ``<id>.json`` pairs"""
+
+    def __init__(self, directory, max_profiles=100):
+        self.directory = directory
+        self.max_profiles = max_profiles
+
+    def _path(self, profile_id, ext):
+        if not _PROFILE_ID.match(profile_id or ""):
+            return None
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def save(self, profiler, meta):
+        os.makedirs(self.directory, exist_ok=True)
+        # Timestamp first so ids sort by age
+        profile_id = f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(self._path(profile_id, "prof"))
+        with open(self._path(profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(dict(meta, id=profile_id), f, ensure_ascii=False)
+        self._evict()
+        return profile_id
+
+    def _ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n[:-5] for n in names if n.endswith(".json") and _PROFILE_ID.match(n[:-5]))
+
+    def _evict(self):
+        ids = self._ids()
+        for profile_id in ids[: max(0, len(ids) - self.max_profiles)]:
+            for ext in ("json", "prof"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:
+                    pass
+
+    def list(self):
+        """Metadata of stored profiles, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            meta = self.get(profile_id)
+            if meta:
+                profiles.append(meta)
+        return profiles
+
+    def get(self, profile_id):
+        path = self._path(profile_id, "json")
+        if not path:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def stats_path(self, profile_id):
+        path = self._path(profile_id, "prof")
+        return path if path and os.path.exists(path) else None
+
+    def summary(self, profile_id, limit=50):
+        """Top functions by cumulative time, as text"""
+        path = self.stats_path(profile_id)
+        if not path:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+
+def get_profile_store(app=None):
+    app = app or current_app
+    return ProfileStore(app.config["PROFILER_DIR"], app.config["PROFILER_MAX_PROFILES"])
+
+
+def _should_profile():
+    if request.path.startswith(("/static", "/metrics", "/admin")):
+        return False
+    if request.headers.get("X-Profile"):
+        return current_user.is_authenticated and current_user.username == "admin"
+    rate = current_app.config["PROFILER_SAMPLE_RATE"]
+    return rate > 0 and random.random() < rate
+
+
+def _start_profile():
+    if not _should_profile():
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiler is already active on this thread
+        logger.debug(f"Skipping request profile: {e}")
+        return
+    g.profiler = profiler
+    g.profile_start = time.perf_counter()
+
+
+def _finish_profile(response):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    profiler.disable()
+
+    duration = time.perf_counter() - g.pop("profile_start")
+    rule = request.url_rule
+    meta = {
+        "created_at": datetime.utcnow().isoformat(),
+        "method": request.method,
+        "route": rule.rule if rule is not None else None,
+        "path": request.path,
+        "status": response.status_code,
+        "duration": round(duration, 4),
+        "db_queries": g.get("db_queries"),
+        "db_time": round(g.db_time, 4) if "db_time" in g else None,
+        "model_calls": g.get("model_calls", []),
+        "user_id": current_user.id if current_user.is_authenticated else None,
+    }
+    try:
+        response.headers["X-Profile-Id"] = get_profile_store().save(profiler, meta)
+    except OSError as e:
+        logger.warning(f"Failed to store request profile: {e}")
+    return response
+
+
+def _teardown_profile(exc):
+    # after_request is skipped when the response itself fails to build
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+
+
+def init_profiler(app):
+    """Install the profiling hooks when PROFILER_ENABLED is set"""
+    if not app.config.get("PROFILER_ENABLED"):
+        return
+    app.before_request(_start_profile)
+    app.after_request(_finish_profile)
+    app.teardown_request(_teardown_profile)
+    logger.info(
+        f"Request profiler enabled (sample rate {app.config['PROFILER_SAMPLE_RATE']}, "
+        f"storing up to {app.config['PROFILER_MAX_PROFILES']} in {app.config['PROFILER_DIR']})"
+    )
@@ -0,0 +1,121 @@
+# app/utils/query_counter.py
+"""
+SQL query counting for catching N+1 access patterns.
+
+``QueryCounter`` records every statement executed while it is active and is
+used by the test suite to put a query budget on endpoints. ``init_query_guard``
+installs a dev-mode request hook that logs a warning when a request runs more
+than ``QUERY_GUARD_MAX_QUERIES`` statements or repeats the same statement shape
+``QUERY_GUARD_MAX_REPEATS`` times (the signature of a lazy load inside a loop).
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\?|%\(\w+\)s|%s)(?:\s*,\s*(?:\?|%\(\w+\)s|%s))*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+
+
+def statement_shape(statement):
+    """Normalize a statement so queries differing only in parameters compare equal"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _NUMBER.sub("N", shape)
+
+
+class QueryCounter:
+    """Record statements executed on any engine while active.
+
+    Usable as a context manager::
+
+        with QueryCounter() as counter:
+            client.get("/api/wallets")
+        assert counter.count <= 3
+
+    Only statements issued from the thread that entered the counter are
+    recorded, so background workers don't pollute the numbers.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self._thread = None
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def shapes(self):
+        return Counter(statement_shape(s) for s in self.statements)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == self._thread:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        self._thread = threading.get_ident()
+        event.listen(Engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(Engine, "after_cursor_execute", self._record)
+        return False
+
+    def report(self):
+        lines = [f"{self.count} queries:"]
+        for shape, times in self.shapes().most_common():
+            lines.append(f"  {times}x {shape[:200]}")
+        return "\n".join(lines)
+
+
+def _record_shape(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "query_shapes" in g:
+        g.query_shapes[statement_shape(statement)] += 1
+
+
+def _start_request():
+    g.query_shapes = Counter()
+
+
+def _check_request(response):
+    shapes = g.pop("query_shapes", None)
+    if not shapes:
+        return response
+
+    total = sum(shapes.values())
+    max_queries = current_app.config["QUERY_GUARD_MAX_QUERIES"]
+    max_repeats = current_app.config["QUERY_GUARD_MAX_REPEATS"]
+    if total > max_queries:
+        logger.warning(
+            f"{request.method} {request.path} ran {total} queries (budget {max_queries})"
+        )
+    for shape, times in shapes.most_common():
+        if times < max_repeats:
+            break
+        logger.warning(
+            f"Possible N+1 in {request.method} {request.path}: "
+            f"{times}x {shape[:200]}"
+        )
+    return response
+
+
+def init_query_guard(app):
+    """Warn about query-heavy requests; on by default only in debug mode"""
+    enabled = app.config.get("QUERY_GUARD_ENABLED")
+    if enabled is None:
+        enabled = app.debug
+    if not enabled:
+        return
+
+    if not event.contains(Engine, "after_cursor_execute", _record_shape):
+        event.listen(Engine, "after_cursor_execute", _record_shape)
+    app.before_request(_start_request)
+    app.after_request(_check_request)
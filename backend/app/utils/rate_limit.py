@@ -0,0 +1,187 @@
+# app/utils/rate_limit.py
+"""
+Token-bucket rate limiting.
+
+Each budget (``auth``, ``chat``, ``ai``, ``import``) is a rate such as
+``"10 per minute"`` from ``RATELIMIT_<NAME>``: a bucket holds up to that many
+tokens and refills evenly over the period, so short bursts pass and a steady
+flood is held to the rate. Buckets are keyed per user when logged in and per
+IP otherwise (``security.rate_limit_key``).
+
+``RATELIMIT_STORAGE_URL`` picks the store: ``memory://`` keeps buckets in this
+process (one budget per worker), ``redis://...`` shares them between workers
+with an atomic Lua script (needs the ``redis`` package).
+"""
+
+import logging
+import math
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+BUDGETS = ("auth", "chat", "ai", "import")
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(value):
+    """``"10 per minute"`` or ``"10/minute"`` -> (capacity, period in seconds)"""
+    count, _, period = value.replace("/", " per ").partition(" per ")
+    period = period.strip().rstrip("s")
+    if period not in _PERIODS:
+        raise ValueError(f"Invalid rate: {value!r}")
+    return int(count), _PERIODS[period]
+
+
+class MemoryStore:
+    """Buckets in a dict behind one lock; idle buckets are pruned as they fill up"""
+
+    PRUNE_EVERY = 1000  # calls
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+        self._calls = 0
+
+    def consume(self, key, capacity, period, cost=1):
+        """Take ``cost`` tokens; returns (allowed, remaining, retry_after seconds)"""
+        rate = capacity / period
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                self._prune(now, period)
+        retry_after = 0 if allowed else (cost - tokens) / rate
+        return allowed, int(tokens), retry_after
+
+    def _prune(self, now, period):
+        # A bucket idle for a whole period is full again; forgetting it is the same
+        idle = [key for key, (_, updated_at) in self._buckets.items() if now - updated_at >= period]
+        for key in idle:
+            del self._buckets[key]
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisStore:
+    """Buckets in Redis hashes, updated atomically by a Lua script using server time"""
+
+    SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * capacity / period)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(period))
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url, prefix="ratelimit:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+        self._prefix = prefix
+
+    def consume(self, key, capacity, period, cost=1):
+        allowed, tokens = self._script(keys=[self._prefix + key], args=[capacity, period, cost])
+        tokens = float(tokens)
+        retry_after = 0 if allowed else (cost - tokens) * period / capacity
+        return bool(allowed), int(tokens), retry_after
+
+    def reset(self):
+        for key in self._client.scan_iter(match=f"{self._prefix}*"):
+            self._client.delete(key)
+
+
+def create_store(url):
+    if not url or url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported RATELIMIT_STORAGE_URL: {url!r}")
+
+
+def get_store():
+    """The app's rate limit store, created from its config on first use"""
+    extensions = current_app.extensions
+    if "rate_limit_store" not in extensions:
+        extensions["rate_limit_store"] = create_store(current_app.config.get("RATELIMIT_STORAGE_URL"))
+    return extensions["rate_limit_store"]
+
+
+def hit(budget, key):
+    """Count one request against ``budget`` for ``key``.
+
+    Returns (allowed, capacity, remaining, retry_after). Always allowed when
+    rate limiting is off. A store that cannot be reached lets the request
+    through rather than taking the app down with it.
+    """
+    config = current_app.config
+    capacity, period = parse_rate(config[f"RATELIMIT_{budget.upper()}"])
+    if not config.get("RATELIMIT_ENABLED"):
+        return True, capacity, capacity, 0
+    try:
+        allowed, remaining, retry_after = get_store().consume(f"{budget}:{key}", capacity, period)
+    except Exception as e:
+        logger.error(f"Rate limit store unavailable, allowing request: {e}")
+        return True, capacity, capacity, 0
+    if not allowed:
+        logger.warning(f"Rate limit '{budget}' exceeded for {key}")
+    return allowed, capacity, remaining, retry_after
+
+
+def current_key():
+    from flask_login import current_user
+
+    from app.security import rate_limit_key
+
+    return rate_limit_key(current_user.id if current_user.is_authenticated else None)
+
+
+def rate_limited(budget, methods=None):
+    """Reject requests over ``budget`` with 429 (only for ``methods``, if given)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if methods and request.method not in methods:
+                return f(*args, **kwargs)
+            allowed, capacity, remaining, retry_after = hit(budget, current_key())
+            if not allowed:
+                response = jsonify({
+                    "error": "Too Many Requests",
+                    "message": "Bạn thao tác quá nhanh. Vui lòng thử lại sau.",
+                    "retry_after": math.ceil(retry_after),
+                })
+                response.status_code = 429
+                response.headers["Retry-After"] = str(math.ceil(retry_after))
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+            if current_app.config.get("RATELIMIT_HEADERS_ENABLED"):
+                response.headers["X-RateLimit-Limit"] = str(capacity)
+                response.headers["X-RateLimit-Remaining"] = str(remaining)
+            return response
+        return decorated_function
+    return decorator
@@ -0,0 +1,152 @@
+# app/utils/receipt_cache.py
+"""
+Content-addressed cache for receipt extraction results.
+
+Results are stored per user in the ``receipt_cache`` table, keyed on the
+SHA-256 of the image bytes and the extraction mode ("tiered", "ai" or
+"ocr"). Only successful extractions are stored, so a failed scan is retried
+for real next time.
+
+``RECEIPT_CACHE_PHASH_DISTANCE >= 0`` also matches by a 64-bit difference
+hash. It is off by default: receipts are mostly white paper with dark text,
+and different receipts fall within a few bits of each other, so a dHash
+match would return another receipt's amount and date.
+"""
+
+import hashlib
+import io
+import json
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models import ReceiptCache
+from app.utils.metrics import RECEIPT_CACHE_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# How many of the user's recent entries a perceptual lookup compares against
+PHASH_CANDIDATES = 200
+
+
+def image_digest(image_data):
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def perceptual_hash(image_data):
+    """dHash of the image as 16 hex chars, or None if it can't be decoded"""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as img:
+            img.draft("L", (64, 64))  # JPEG: let libjpeg decode at 1/8 scale
+            pixels = list(img.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+
+def hamming(a, b):
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+
+def _is_cacheable(result):
+    return bool(result) and not result.get("error") and bool(result.get("amount"))
+
+
+def lookup(image_data, method, user_id=None):
+    """Cached result for this image, or None. Also returns the digest and
+    perceptual hash so a following ``store`` doesn't recompute them."""
+    user_id = current_user.id if user_id is None else user_id
+    digest = image_digest(image_data)
+    now = datetime.utcnow()
+    alive = ReceiptCache.query.filter(
+        ReceiptCache.user_id == user_id,
+        ReceiptCache.method == method,
+        ReceiptCache.expires_at > now,
+    )
+
+    entry = alive.filter(ReceiptCache.digest == digest).first()
+    phash = None
+    outcome = "hit"
+    if entry is None and current_app.config["RECEIPT_CACHE_PHASH_DISTANCE"] >= 0:
+        phash = perceptual_hash(image_data)
+        if phash is not None:
+            max_distance = current_app.config["RECEIPT_CACHE_PHASH_DISTANCE"]
+            candidates = (
+                alive.filter(ReceiptCache.phash.isnot(None))
+                .with_entities(ReceiptCache.id, ReceiptCache.phash)
+                .order_by(ReceiptCache.created_at.desc())
+                .limit(PHASH_CANDIDATES)
+            )
+            match = next((i for i, h in candidates if hamming(h, phash) <= max_distance), None)
+            if match is not None:
+                entry = db.session.get(ReceiptCache, match)
+                outcome = "similar"
+
+    if entry is None:
+        RECEIPT_CACHE_LOOKUPS.inc(method=method, result="miss")
+        return None, digest, phash
+
+    RECEIPT_CACHE_LOOKUPS.inc(method=method, result=outcome)
+    ReceiptCache.query.filter_by(id=entry.id).update({ReceiptCache.hits: ReceiptCache.hits + 1})
+    db.session.commit()
+    result = json.loads(entry.result)
+    result["cached"] = True
+    return result, digest, phash
+
+
+def store(image_data, method, result, digest=None, phash=None, user_id=None):
+    """Save a successful extraction; expired entries are purged on the way"""
+    if not _is_cacheable(result):
+        return
+    user_id = current_user.id if user_id is None else user_id
+    now = datetime.utcnow()
+    if phash is None and current_app.config["RECEIPT_CACHE_PHASH_DISTANCE"] >= 0:
+        phash = perceptual_hash(image_data)
+
+    ReceiptCache.query.filter(ReceiptCache.expires_at <= now).delete()
+    db.session.add(ReceiptCache(
+        user_id=user_id,
+        method=method,
+        digest=digest or image_digest(image_data),
+        phash=phash,
+        # OCR dates are datetimes; they come back as ISO strings like AI dates
+        result=json.dumps(result, ensure_ascii=False, default=lambda v: v.isoformat()),
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config["RECEIPT_CACHE_TTL"]),
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()  # a concurrent upload of the same image stored it first
+
+
+def cached_extraction(image_data, method, extract):
+    """``extract(image_data)`` through the cache"""
+    if not current_app.config["RECEIPT_CACHE_ENABLED"]:
+        return extract(image_data)
+    result, digest, phash = lookup(image_data, method)
+    if result is not None:
+        return result
+    result = extract(image_data)
+    store(image_data, method, result, digest=digest, phash=phash)
+    return result
+
+
+def cache_stats(user_id):
+    """Entries and hits for one user's live cache"""
+    entries, hits = (
+        db.session.query(db.func.count(ReceiptCache.id), db.func.coalesce(db.func.sum(ReceiptCache.hits), 0))
+        .filter(ReceiptCache.user_id == user_id, ReceiptCache.expires_at > datetime.utcnow())
+        .one()
+    )
+    return {"entries": entries, "hits": int(hits)}
@@ -0,0 +1,178 @@
+# app/utils/receipt_extractor.py
+"""
+Tiered receipt extraction: local OCR first, the vision model only when needed.
+
+Tier 1 runs ReceiptOCR and the regex field extractors. Its confidence is the
+OCR extraction score scaled to 0..1 (amount 2, date 1, fee and note 0.5 each);
+when it is below ``RECEIPT_OCR_MIN_CONFIDENCE`` or the amount or date is
+missing, tier 2 sends a cropped, downscaled JPEG to AIInvoiceExtractor.
+Every result says which tier answered (``method``) and how long each tier
+took (``tiers``).
+"""
+
+import io
+import logging
+import time
+
+from app.utils.metrics import RECEIPT_TIER_LATENCY
+from app.utils.ocr import ReceiptOCR, get_receipt_ocr, ocr_available
+
+logger = logging.getLogger(__name__)
+
+MAX_OCR_SCORE = 4.0
+
+
+def crop_to_content(gray, margin=0.03):
+    """(top, bottom, left, right) around the inked area, or None for the whole image"""
+    import cv2
+    import numpy as np
+
+    scale = min(1.0, 400 / gray.shape[1])
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    ink = cv2.adaptiveThreshold(small, 1, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 15)
+    rows = np.flatnonzero(ink.mean(axis=1) > 0.01)
+    cols = np.flatnonzero(ink.mean(axis=0) > 0.01)
+    if rows.size == 0 or cols.size == 0:
+        return None
+
+    height, width = gray.shape
+    pad_y, pad_x = int(height * margin), int(width * margin)
+    top = max(0, int(rows[0] / scale) - pad_y)
+    bottom = min(height, int((rows[-1] + 1) / scale) + pad_y)
+    left = max(0, int(cols[0] / scale) - pad_x)
+    right = min(width, int((cols[-1] + 1) / scale) + pad_x)
+    if (bottom - top) * (right - left) > 0.9 * height * width:
+        return None  # not worth a crop
+    return top, bottom, left, right
+
+
+def prepare_for_model(image_data, max_side=1600, quality=85):
+    """Cropped, downscaled JPEG of the receipt for the vision model.
+
+    Falls back to the original bytes when the image can't be decoded or the
+    result wouldn't be smaller.
+    """
+    from PIL import Image
+
+    try:
+        import numpy as np
+
+        with Image.open(io.BytesIO(image_data)) as img:
+            scale = min(1.0, max_side / max(img.size))
+            # JPEG: let libjpeg decode at the largest 1/2, 1/4, 1/8 scale that
+            # still covers the target size
+            img.draft("RGB", (int(img.width * scale), int(img.height * scale)))
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side), Image.LANCZOS, reducing_gap=2.0)
+        try:
+            box = crop_to_content(np.asarray(img.convert("L")))
+        except ImportError:
+            box = None
+        if box is not None:
+            top, bottom, left, right = box
+            img = img.crop((left, top, right, bottom))
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=quality)
+    except Exception as e:
+        logger.warning(f"Could not downscale receipt for the model: {e}")
+        return image_data
+    prepared = buffer.getvalue()
+    return prepared if len(prepared) < len(image_data) else image_data
+
+
+class TieredReceiptExtractor:
+    def __init__(self, ocr, ai_extractor, mode="tiered", min_confidence=0.75,
+                 ai_max_side=1600, ai_jpeg_quality=85):
+        # mode: "tiered", "ocr" (never call the model) or "ai" (skip OCR)
+        self.ocr = ocr
+        self.ai_extractor = ai_extractor
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self.ai_max_side = ai_max_side
+        self.ai_jpeg_quality = ai_jpeg_quality
+
+    @classmethod
+    def from_config(cls, config, ocr, ai_extractor):
+        return cls(
+            ocr, ai_extractor,
+            mode=config.get("RECEIPT_EXTRACTION_MODE", "tiered"),
+            min_confidence=config.get("RECEIPT_OCR_MIN_CONFIDENCE", 0.75),
+            ai_max_side=config.get("RECEIPT_AI_MAX_SIDE", 1600),
+            ai_jpeg_quality=config.get("RECEIPT_AI_JPEG_QUALITY", 85),
+        )
+
+    def _ocr_tier(self, image_data):
+        start = time.perf_counter()
+        result = self.ocr.process_image(image_data)
+        seconds = time.perf_counter() - start
+        confidence = 0.0 if result.get("error") else ReceiptOCR.score(result) / MAX_OCR_SCORE
+        RECEIPT_TIER_LATENCY.observe(seconds, tier="ocr", outcome="error" if result.get("error") else "ok")
+        tier = {"tier": "ocr", "seconds": round(seconds, 3), "confidence": round(confidence, 2)}
+        if result.get("error"):
+            tier["error"] = result["error"]
+        return result, confidence, tier
+
+    def _ai_tier(self, image_data):
+        start = time.perf_counter()
+        prepared = prepare_for_model(image_data, self.ai_max_side, self.ai_jpeg_quality)
+        result = self.ai_extractor.extract_from_image(prepared)
+        seconds = time.perf_counter() - start
+        failed = bool(result.get("error")) or not result.get("amount")
+        RECEIPT_TIER_LATENCY.observe(seconds, tier="ai", outcome="error" if failed else "ok")
+        return result, {"tier": "ai", "seconds": round(seconds, 3), "bytes": len(prepared)}
+
+    def extract(self, image_data):
+        tiers = []
+        ocr_result = None
+        if self.mode != "ai" and ocr_available():
+            ocr_result, confidence, tier = self._ocr_tier(image_data)
+            tiers.append(tier)
+            confident = (
+                confidence >= self.min_confidence
+                and ocr_result.get("amount") is not None
+                and ocr_result.get("date") is not None
+            )
+            if confident or self.mode == "ocr":
+                return self._from_ocr(ocr_result, tiers)
+            logger.info(f"OCR confidence {confidence:.2f} too low, escalating to the vision model")
+        elif self.mode == "ocr":
+            return {"error": "Tesseract OCR is not available", "tiers": tiers}
+
+        result, tier = self._ai_tier(image_data)
+        tiers.append(tier)
+        if not result.get("amount") and ocr_result and ocr_result.get("amount") is not None:
+            # The model failed; a partial OCR reading beats nothing
+            return self._from_ocr(ocr_result, tiers)
+        return dict(result, method="ai", tiers=tiers)
+
+    @staticmethod
+    def _from_ocr(result, tiers):
+        if result.get("error"):
+            return dict(result, tiers=tiers)
+        date = result.get("date")
+        return {
+            "amount": result.get("amount"),
+            "date": date.strftime("%Y-%m-%d") if date else None,  # same format as the AI tier
+            "fee": result.get("fee"),
+            "note": result.get("note"),
+            "merchant": None,
+            "invoice_number": None,
+            "suggested_category": None,
+            "text": result.get("text", ""),
+            "method": "ocr",
+            "tiers": tiers,
+        }
+
+
+def get_receipt_extractor():
+    """The app's TieredReceiptExtractor, built from its config on first use"""
+    from flask import current_app
+
+    from app.utils.ai_invoice_extractor import ai_invoice_extractor
+
+    extensions = current_app.extensions
+    if "receipt_extractor" not in extensions:
+        extensions["receipt_extractor"] = TieredReceiptExtractor.from_config(
+            current_app.config, get_receipt_ocr(), ai_invoice_extractor
+        )
+    return extensions["receipt_extractor"]
@@ -0,0 +1,239 @@
+# app/utils/search.py
+"""
+Full-text search over expense descriptions and categories.
+
+Every expense has a row in ``expense_search`` with its normalized tokens:
+lowercased and without Vietnamese diacritics, so "pho bo" finds "Phở bò".
+On SQLite that table is an FTS5 index ranked with bm25; on Postgres it is a
+regular table with a ``tsvector`` column under a GIN index, ranked with
+``ts_rank``. Other databases fall back to ILIKE on the description.
+
+Mapper hooks write the row when an expense is inserted or its description or
+category changes. Deletes are handled in the database (a trigger on SQLite,
+``ON DELETE CASCADE`` on Postgres), so bulk deletes stay in sync too. Bulk
+inserts bypass the hooks: run ``flask rebuild-search-index`` after them, and
+once on databases created before the index existed.
+"""
+
+import logging
+import re
+import unicodedata
+import weakref
+
+from sqlalchemy import Float, Integer, event, inspect, select, text
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = "expense_search"
+MAX_QUERY_TERMS = 8
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+_CREATE = {
+    "sqlite": (
+        # Standalone FTS5 table (no external content: the tokens are ours);
+        # rowid is the expense id. user_id is indexed too, so the owner filter
+        # is part of the MATCH instead of a lookup per matching row. Prefix
+        # indexes keep "ph*"/"pho*" cheap.
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+        "USING fts5(tokens, user_id, prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON expense BEGIN "
+        f"DELETE FROM {SEARCH_TABLE} WHERE rowid = old.id; END",
+    ),
+    "postgresql": (
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "expense_id INTEGER PRIMARY KEY REFERENCES expense (id) ON DELETE CASCADE, "
+        "user_id INTEGER NOT NULL, "
+        "tokens TEXT NOT NULL, "
+        "document TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', tokens)) STORED)",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_user_id ON {SEARCH_TABLE} (user_id)",
+    ),
+}
+
+_DROP = {
+    "sqlite": (f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete", f"DROP TABLE IF EXISTS {SEARCH_TABLE}"),
+    "postgresql": (f"DROP TABLE IF EXISTS {SEARCH_TABLE}",),
+}
+
+_UPSERT = {
+    "sqlite": (
+        f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :expense_id",
+        f"INSERT INTO {SEARCH_TABLE} (rowid, tokens, user_id) VALUES (:expense_id, :tokens, :user_id)",
+    ),
+    "postgresql": (
+        f"INSERT INTO {SEARCH_TABLE} (expense_id, user_id, tokens) VALUES (:expense_id, :user_id, :tokens) "
+        "ON CONFLICT (expense_id) DO UPDATE SET tokens = excluded.tokens, user_id = excluded.user_id",
+    ),
+}
+
+# (expense_id, rank) of a user's matches; lower rank = better match
+_MATCH = {
+    "sqlite": (
+        f"SELECT rowid AS expense_id, rank FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :search_query"
+    ),
+    "postgresql": (
+        f"SELECT expense_id, -ts_rank(document, query) AS rank "
+        f"FROM {SEARCH_TABLE}, to_tsquery('simple', :search_query) AS query "
+        "WHERE document @@ query AND user_id = :search_user_id"
+    ),
+}
+
+# Engines known to have the index. Only positive answers are cached, so an
+# index built later (by the rebuild command) is picked up without a restart.
+_ready = weakref.WeakSet()
+
+
+def normalize(value):
+    """Lowercase, strip diacritics (đ -> d) and keep only word characters"""
+    if not value:
+        return ""
+    value = unicodedata.normalize("NFD", value.replace("đ", "d").replace("Đ", "D"))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(_TOKEN.findall(value.casefold()))
+
+
+def document_tokens(description, category):
+    return normalize(f"{description or ''} {category or ''}")
+
+
+def build_query(search, user_id, dialect):
+    """Prefix query over the normalized terms of ``search``, or None if it has none"""
+    terms = normalize(search).split()[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    if dialect == "postgresql":
+        return " & ".join(f"{term}:*" for term in terms)
+    prefixes = " ".join(f'"{term}"*' for term in terms)
+    return f'user_id:"{int(user_id)}" AND tokens:({prefixes})'
+
+
+def index_available(connection):
+    engine = connection.engine
+    if engine in _ready:
+        return True
+    dialect = connection.dialect.name
+    if dialect not in _CREATE:
+        return False
+    if not inspect(connection).has_table(SEARCH_TABLE):
+        return False
+    _ready.add(engine)
+    return True
+
+
+def create_index(connection):
+    """Create the search table (and delete trigger) if the database supports it"""
+    dialect = connection.dialect.name
+    if dialect not in _CREATE:
+        return False
+    fts5 = "SELECT sqlite_compileoption_used('ENABLE_FTS5')"
+    if dialect == "sqlite" and not connection.execute(text(fts5)).scalar():
+        logger.warning("SQLite was built without FTS5; expense search falls back to ILIKE")
+        return False
+    for statement in _CREATE[dialect]:
+        connection.execute(text(statement))
+    return True
+
+
+def drop_index(connection):
+    for statement in _DROP.get(connection.dialect.name, ()):
+        connection.execute(text(statement))
+    _ready.discard(connection.engine)
+
+
+def _write(connection, rows):
+    for statement in _UPSERT[connection.dialect.name]:
+        connection.execute(text(statement), rows)
+
+
+def rebuild_index(connection, batch_size=5000):
+    """Recreate the index from the expense table; returns the number of rows indexed"""
+    from app.models import Expense
+
+    drop_index(connection)
+    if not create_index(connection):
+        return 0
+    if connection.dialect.name == "sqlite":
+        # Nothing to replace in a fresh table; skip the per-row DELETE
+        insert = text(_UPSERT["sqlite"][1])
+    else:
+        insert = text(_UPSERT["postgresql"][0])
+
+    total = 0
+    rows = connection.execution_options(yield_per=batch_size).execute(
+        select(Expense.id, Expense.user_id, Expense.description, Expense.category)
+    )
+    for batch in rows.partitions():
+        connection.execute(insert, [
+            {"expense_id": expense_id, "user_id": user_id, "tokens": document_tokens(description, category)}
+            for expense_id, user_id, description, category in batch
+        ])
+        total += len(batch)
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')"))
+    return total
+
+
+def filter_query(query, user_id, search):
+    """Restrict an Expense query to matches of ``search``.
+
+    Returns ``(query, rank)``; ``rank`` is a column to order by (best first
+    when ascending), or None when the ILIKE fallback was used: without the
+    index, or for a search with no words to match (e.g. "!!!").
+    """
+    from app import db
+    from app.models import Expense
+
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    search_query = build_query(search, user_id, dialect) if index_available(connection) else None
+    if search_query is None:
+        return query.filter(Expense.description.ilike(f"%{search}%")), None
+    params = {"search_query": search_query}
+    if dialect == "postgresql":
+        params["search_user_id"] = user_id  # on SQLite the owner is part of the MATCH
+    matches = (
+        text(_MATCH[dialect])
+        .bindparams(**params)
+        .columns(expense_id=Integer, rank=Float)
+        .subquery("search_matches")
+    )
+    return query.join(matches, matches.c.expense_id == Expense.id), matches.c.rank
+
+
+def _after_insert(mapper, connection, target):
+    if index_available(connection):
+        _write(connection, {
+            "expense_id": target.id,
+            "user_id": target.user_id,
+            "tokens": document_tokens(target.description, target.category),
+        })
+
+
+def _after_update(mapper, connection, target):
+    state = inspect(target)
+    if not (state.attrs.description.history.has_changes() or state.attrs.category.history.has_changes()):
+        return
+    _after_insert(mapper, connection, target)
+
+
+def _after_create(table, connection, **kw):
+    create_index(connection)
+
+
+def _before_drop(table, connection, **kw):
+    drop_index(connection)
+
+
+def init_search():
+    """Register the index DDL and write hooks on Expense (idempotent)"""
+    from app.models import Expense
+
+    for target, name, fn in (
+        (Expense, "after_insert", _after_insert),
+        (Expense, "after_update", _after_update),
+        (Expense.__table__, "after_create", _after_create),
+        (Expense.__table__, "before_drop", _before_drop),
+    ):
+        if not event.contains(target, name, fn):
+            event.listen(target, name, fn)
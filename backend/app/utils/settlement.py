@@ -0,0 +1,164 @@
+# app/utils/settlement.py
+"""
+Who should pay whom to settle a split group.
+
+Every unpaid ``ExpenseSplit`` says its member owes ``amount`` to the owner of
+the expense. ``group_balances`` nets all of them per participant with one
+grouped query (no split rows are loaded), and the two solvers turn the
+balances into transfers:
+
+* ``greedy_transfers`` repeatedly pays the largest creditor from the largest
+  debtor (two max-heaps), O(n log n) and at most n - 1 transfers;
+* ``exact_transfers`` finds the minimum number of transfers, which is
+  n minus the largest number of disjoint zero-sum subgroups, with a DP over
+  subsets. It is exponential, so only used up to
+  ``SETTLEMENT_EXACT_MAX_PARTICIPANTS`` people with a non-zero balance.
+
+Balances are handled in integer hundredths so rounding never leaves a
+transfer of 0.01 behind.
+"""
+
+import heapq
+import logging
+
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("auto", "greedy", "exact")
+
+
+def _to_cents(amount):
+    return int(round(float(amount) * 100))
+
+
+def group_balances(group):
+    """Net balance per participant in ``group`` (positive = is owed money)
+
+    Returns ``(balances, participants)``: ``balances`` maps a participant key
+    to hundredths, ``participants`` maps the key to ``{member_id, user_id,
+    name}``. Keys are member ids; an expense owner who is not a member of the
+    group gets the key ``"user:<id>"``.
+    """
+    from app import db
+    from app.models import Expense, ExpenseSplit, SplitMember, User
+
+    rows = db.session.execute(
+        select(ExpenseSplit.member_id, Expense.user_id, func.sum(ExpenseSplit.amount))
+        .join(SplitMember, SplitMember.id == ExpenseSplit.member_id)
+        .join(Expense, Expense.id == ExpenseSplit.expense_id)
+        .where(SplitMember.group_id == group.id, ExpenseSplit.is_paid == False)
+        .group_by(ExpenseSplit.member_id, Expense.user_id)
+    ).all()
+
+    participants = {}
+    member_by_user = {}
+    for m in group.members:
+        participants[m.id] = {"member_id": m.id, "user_id": m.user_id, "name": m.name}
+        if m.user_id is not None:
+            member_by_user.setdefault(m.user_id, m.id)
+
+    outsiders = {user_id for _, user_id, _ in rows if user_id not in member_by_user}
+    if outsiders:
+        for user_id, username in db.session.execute(
+            select(User.id, User.username).where(User.id.in_(outsiders))
+        ):
+            key = f"user:{user_id}"
+            member_by_user[user_id] = key
+            participants[key] = {"member_id": None, "user_id": user_id, "name": username}
+
+    balances = dict.fromkeys(participants, 0)
+    for member_id, user_id, total in rows:
+        cents = _to_cents(total)
+        creditor = member_by_user[user_id]
+        balances[member_id] -= cents
+        balances[creditor] += cents
+    return balances, participants
+
+
+def _settle(balances):
+    """Pay the largest creditor from the largest debtor until all are even"""
+    # heapq is a min-heap: store negated amounts. The index breaks ties, as
+    # keys mix ints and strings
+    creditors = [(-cents, i, key) for i, (key, cents) in enumerate(balances) if cents > 0]
+    debtors = [(cents, i, key) for i, (key, cents) in enumerate(balances) if cents < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+    transfers = []
+    while creditors and debtors:
+        credit, i, to_key = heapq.heappop(creditors)
+        debt, j, from_key = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((from_key, to_key, amount))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, i, to_key))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, j, from_key))
+    return transfers
+
+
+def greedy_transfers(balances):
+    """Transfers ``(from_key, to_key, cents)`` settling ``balances``, largest first"""
+    return _settle(list(balances.items()))
+
+
+def exact_transfers(balances):
+    """The fewest transfers settling ``balances`` (exponential in participants)"""
+    keys = [key for key, cents in balances.items() if cents]
+    amounts = [balances[key] for key in keys]
+    n = len(keys)
+    full = (1 << n) - 1
+
+    # best[mask]: most zero-sum groups the people in ``mask`` split into,
+    # taking them in some order and cutting wherever the running sum is zero
+    sums = [0] * (full + 1)
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + amounts[low.bit_length() - 1]
+        rest = mask
+        top = 0
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if best[mask ^ bit] > top:
+                top = best[mask ^ bit]
+        best[mask] = top + (sums[mask] == 0)
+
+    # Walk back to the order, then settle each zero-sum group on its own:
+    # a group of k people needs k - 1 transfers
+    order = []
+    mask = full
+    while mask:
+        rest = mask
+        pick = rest & -rest
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if best[mask ^ bit] > best[mask ^ pick]:
+                pick = bit
+        order.append(pick.bit_length() - 1)
+        mask ^= pick
+    order.reverse()
+
+    transfers = []
+    group, running = [], 0
+    for i in order:
+        group.append(i)
+        running += amounts[i]
+        if running == 0:
+            transfers += _settle([(keys[j], amounts[j]) for j in group])
+            group = []
+    return transfers
+
+
+def settle(balances, method="auto", exact_limit=12):
+    """``(method_used, transfers)``; ``auto`` is exact up to ``exact_limit`` people"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown settlement method: {method}")
+    active = sum(1 for cents in balances.values() if cents)
+    if method == "exact" and active > exact_limit:
+        raise ValueError(f"Exact settlement supports at most {exact_limit} participants, got {active}")
+    if method == "exact" or (method == "auto" and active <= exact_limit):
+        return "exact", exact_transfers(balances)
+    return "greedy", greedy_transfers(balances)
@@ -0,0 +1,104 @@
+"""
+Dashboard page load: separate calls vs /api/dashboard/full
+
+Seeds one user with ``--expenses`` rows, logs in and times what the
+dashboard page costs the backend: the five calls it used to make (summary,
+recent expenses, 7-day trend, 7-day statistics, wallets) run back to back,
+against one /api/dashboard/full, and a revalidation of it with If-None-Match.
+Each column is the median of ``--runs`` page loads, in milliseconds of
+backend time, with the SQL statements one load runs.
+
+    cd backend
+    python benchmarks/bench_dashboard.py --expenses 20000 --runs 30
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.datagen import BENCH_PASSWORD, generate, make_bench_config  # noqa: E402
+
+
+def _separate_calls():
+    end = date.today()
+    window = {"start_date": (end - timedelta(days=6)).isoformat(), "end_date": end.isoformat()}
+    return [
+        ("/api/dashboard", None),
+        ("/api/expenses", {"page": 1, "per_page": 5}),
+        ("/api/expenses/trends", {"group_by": "daily", **window}),
+        ("/api/expenses/statistics", window),
+        ("/api/wallets", None),
+    ]
+
+
+def _load(client, calls, headers=None):
+    from app.utils.query_counter import QueryCounter
+
+    with QueryCounter() as counter:
+        started = time.perf_counter()
+        statuses = [client.get(url, query_string=params, headers=headers).status_code for url, params in calls]
+        elapsed = (time.perf_counter() - started) * 1000
+    return elapsed, counter.count, statuses
+
+
+def _measure(client, calls, runs, headers=None):
+    _load(client, calls, headers)  # warm per-process caches
+    samples, queries, statuses = [], 0, []
+    for _ in range(runs):
+        elapsed, queries, statuses = _load(client, calls, headers)
+        samples.append(elapsed)
+    return {
+        "requests": len(calls),
+        "p50_ms": round(statistics.median(samples), 2),
+        "min_ms": round(min(samples), 2),
+        "queries": queries,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=20000, help="Expenses for the user")
+    parser.add_argument("--runs", type=int, default=30, help="Page loads timed per variant")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    from app import create_app, db
+
+    path = os.path.join(tempfile.mkdtemp(prefix="moneykeeper-dashboard-"), "dashboard.db")
+    app = create_app(make_bench_config(f"sqlite:///{path}"))
+    with app.app_context():
+        db.create_all()
+        generate(users=1, wallets=3, expenses=args.expenses)
+
+    client = app.test_client()
+    response = client.post("/auth/login", data={"username": "bench0000", "password": BENCH_PASSWORD})
+    assert response.status_code in (200, 302), response.status_code
+
+    full = [("/api/dashboard/full", None)]
+    etag = client.get("/api/dashboard/full").headers["ETag"]
+    results = {
+        "separate": _measure(client, _separate_calls(), args.runs),
+        "full": _measure(client, full, args.runs),
+        "full_304": _measure(client, full, args.runs, headers={"If-None-Match": etag}),
+    }
+
+    print(f"{'variant':<12}{'requests':>9}{'p50 ms':>9}{'min ms':>9}{'queries':>9}")
+    for name, r in results.items():
+        print(f"{name:<12}{r['requests']:>9}{r['p50_ms']:>9}{r['min_ms']:>9}{r['queries']:>9}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"expenses": args.expenses, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Email delivery throughput benchmark
+
+Sends the same set of notification emails to a local aiosmtpd server twice:
+once the old way (one SMTP connection per email) and once through the outbox
+(one connection per batch, one digest per recipient).
+
+    cd backend
+    pip install aiosmtpd
+    python benchmarks/bench_email_outbox.py --emails 500 --users 50
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from flask_mail import Message  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from app import create_app, db, mail  # noqa: E402
+from app.models import EmailOutbox  # noqa: E402
+from app.utils.email import queue_email, process_outbox  # noqa: E402
+
+
+class CountingHandler:
+    def __init__(self):
+        self.messages = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    port = free_port()
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+        MAIL_SERVER = "127.0.0.1"
+        MAIL_PORT = port
+        MAIL_USE_TLS = False
+        MAIL_SUPPRESS_SEND = False
+        EMAIL_OUTBOX_BATCH_SIZE = args.emails
+
+    app = create_app(BenchConfig)
+    results = {"emails": args.emails, "users": args.users}
+    try:
+        with app.test_request_context():
+            db.create_all()
+            recipients = [f"user{i % args.users}@example.com" for i in range(args.emails)]
+
+            # Baseline: a fresh SMTP session for every email
+            start = time.perf_counter()
+            for i, recipient in enumerate(recipients):
+                mail.send(Message(
+                    subject="Cảnh báo ngân sách",
+                    recipients=[recipient],
+                    sender=app.config["MAIL_DEFAULT_SENDER"],
+                    body=f"Thông báo số {i}",
+                ))
+            elapsed = time.perf_counter() - start
+            results["per_email_connection"] = {
+                "seconds": round(elapsed, 4),
+                "emails_per_sec": round(args.emails / elapsed, 1),
+                "smtp_messages": handler.messages,
+            }
+
+            # Outbox: enqueue, then drain in one pass
+            handler.messages = 0
+            for i, recipient in enumerate(recipients):
+                queue_email(
+                    subject="Cảnh báo ngân sách",
+                    recipient=recipient,
+                    template="budget_alert",
+                    body=f"Thông báo số {i}",
+                )
+            start = time.perf_counter()
+            stats = process_outbox()
+            elapsed = time.perf_counter() - start
+            results["outbox"] = {
+                "seconds": round(elapsed, 4),
+                "emails_per_sec": round(stats["sent"] / elapsed, 1),
+                "smtp_messages": handler.messages,
+            }
+            EmailOutbox.query.delete()
+            db.session.commit()
+    finally:
+        controller.stop()
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+JSON serialization and response compression for a large expense list
+
+Builds ``--expenses`` dicts shaped like ``expense_to_dict`` output (the
+/api/expenses payload, Vietnamese descriptions included) and times turning
+them into a ``jsonify`` response body with Flask's stdlib provider and with
+the orjson one, then compresses the body with gzip and, when installed,
+brotli at a few levels. Times are the median of ``--runs``, in milliseconds.
+
+    cd backend
+    python benchmarks/bench_json.py --expenses 10000 --runs 20
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+
+from app.utils import json_provider  # noqa: E402
+from app.utils.compression import brotli  # noqa: E402
+
+CATEGORIES = ["food", "transport", "shopping", "entertainment", "bills", "health", "salary"]
+DESCRIPTIONS = ["Phở bò", "Grab về nhà", "Cà phê sữa đá", "Tiền điện tháng này", "Mua sách", "Lương", "Khám răng"]
+
+
+def _payload(count):
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1, 8, 30)
+    expenses = [{
+        "id": i + 1,
+        "amount": float(rng.randrange(5, 5000) * 1000),
+        "category": rng.choice(CATEGORIES),
+        "description": rng.choice(DESCRIPTIONS),
+        "date": (start + timedelta(minutes=37 * i)).isoformat(),
+        "wallet_id": rng.randrange(1, 4),
+        "is_expense": rng.random() > 0.1,
+    } for i in range(count)]
+    return {"expenses": expenses, "pagination": {"page": 1, "per_page": count, "total": count, "pages": 1}}
+
+
+def _time(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=10000, help="Expenses in the payload")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per variant")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    payload = _payload(args.expenses)
+    app = Flask(__name__)
+    providers = {"stdlib": DefaultJSONProvider(app)}
+    if json_provider.orjson is not None:
+        providers["orjson"] = json_provider.OrjsonProvider(app)
+
+    results = {"serialize": {}, "compress": {}}
+    body = None
+    with app.app_context():
+        for name, provider in providers.items():
+            ms, response = _time(lambda: provider.response(payload), args.runs)
+            body = response.get_data()
+            results["serialize"][name] = {
+                "p50_ms": ms,
+                "bytes": len(body),
+                "mb_per_s": round(len(body) / 1e6 / (ms / 1000), 1),
+            }
+
+    compressors = {f"gzip-{level}": (lambda level=level: gzip.compress(body, level)) for level in (1, 5, 9)}
+    if brotli is not None:
+        for quality in (4, 6, 11):
+            compressors[f"br-{quality}"] = lambda quality=quality: brotli.compress(body, quality=quality)
+    for name, fn in compressors.items():
+        ms, compressed = _time(fn, max(1, args.runs // 4) if name == "br-11" else args.runs)
+        results["compress"][name] = {
+            "p50_ms": ms,
+            "bytes": len(compressed),
+            "ratio": round(len(body) / len(compressed), 1),
+        }
+
+    print(f"{args.expenses} expenses")
+    print(f"{'provider':<10}{'p50 ms':>9}{'bytes':>11}{'MB/s':>8}")
+    for name, r in results["serialize"].items():
+        print(f"{name:<10}{r['p50_ms']:>9}{r['bytes']:>11}{r['mb_per_s']:>8}")
+    print(f"{'encoding':<10}{'p50 ms':>9}{'bytes':>11}{'ratio':>8}")
+    for name, r in results["compress"].items():
+        print(f"{name:<10}{r['p50_ms']:>9}{r['bytes']:>11}{r['ratio']:>8}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"expenses": args.expenses, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Receipt OCR benchmark: legacy single pass vs the preprocessing pipeline
+
+Renders a deterministic fixture set of receipt "photos" (12 MP JPEGs with
+skew, uneven lighting and sensor noise, known amount and date), then times
+and scores:
+
+- legacy: full-resolution decode, one adaptive threshold, one Tesseract call
+- pipeline: ReceiptOCR per image (downscale, deskew, variant voting in the pool)
+- batch: ReceiptOCR.process_images over the whole set
+- model upload: the cropped, downscaled JPEG the tiered extractor sends to
+  the vision model when OCR is not confident
+
+Without a ``tesseract`` binary only the preprocessing stages are timed.
+
+    cd backend
+    python benchmarks/bench_ocr.py --images 12 --workers 4 --save-fixtures /tmp/receipts
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.ocr import ReceiptOCR, decode_image, deskew, shutdown_pool  # noqa: E402
+
+ITEMS = ["Com tam suon", "Pho bo tai", "Tra da", "Banh mi pate", "Ca phe sua da",
+         "Nuoc suoi", "Bun cha", "Goi cuon", "Tra sua", "Banh flan"]
+
+
+def render_receipt(rng, photo_size=(3000, 4000)):
+    """One receipt photo as JPEG bytes plus its ground truth"""
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    import numpy as np
+
+    font = ImageFont.load_default(size=22)
+    date = f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025"
+    lines = ["CUA HANG TIEN LOI MINH ANH", "12 Nguyen Trai, Quan 1, TP.HCM",
+             f"Ngay: {date} {rng.randint(7, 21):02d}:{rng.randint(0, 59):02d}",
+             f"Invoice no: {rng.randint(100000, 999999)}", "-" * 34]
+    subtotal = 0
+    for name in rng.sample(ITEMS, rng.randint(3, 7)):
+        price = rng.randint(5, 120) * 1000
+        subtotal += price
+        lines.append(f"{name:<22}{price:>10,}".replace(",", "."))
+    vat = subtotal // 10
+    lines += ["-" * 34, f"{'Subtotal':<22}{subtotal:>10,}".replace(",", "."),
+              f"{'VAT 10%':<22}{vat:>10,}".replace(",", "."),
+              f"TOTAL: {subtotal + vat:,} VND".replace(",", "."), "", "Cam on quy khach!"]
+
+    paper = Image.new("L", (480, 40 + 30 * len(lines)), 250)
+    draw = ImageDraw.Draw(paper)
+    for i, line in enumerate(lines):
+        draw.text((20, 20 + 30 * i), line, fill=20, font=font)
+
+    # Photograph it: enlarge onto a table, tilt, blur, light unevenly, add noise
+    scale = photo_size[0] * 0.7 / paper.width
+    paper = paper.resize((int(paper.width * scale), int(paper.height * scale)), Image.BICUBIC)
+    photo = Image.new("L", photo_size, 110)
+    photo.paste(paper, ((photo_size[0] - paper.width) // 2, max(0, (photo_size[1] - paper.height) // 2)))
+    photo = photo.rotate(rng.uniform(-5, 5), resample=Image.BICUBIC, fillcolor=110)
+    photo = photo.filter(ImageFilter.GaussianBlur(1.5))
+    pixels = np.asarray(photo, dtype=np.float32)
+    pixels *= np.linspace(0.75, 1.05, photo_size[0], dtype=np.float32)[None, :]
+    pixels += np.random.default_rng(rng.randrange(2 ** 32)).normal(0, 6, pixels.shape).astype(np.float32)
+    photo = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).convert("RGB")
+
+    buffer = io.BytesIO()
+    photo.save(buffer, "JPEG", quality=90)
+    day, month, year = (int(part) for part in date.split("/"))
+    return buffer.getvalue(), {"amount": float(subtotal + vat), "date": (year, month, day)}
+
+
+def legacy_ocr(ocr, image_data):
+    """What ReceiptOCR.process_image did before the pipeline"""
+    import cv2
+    import numpy as np
+    import pytesseract
+
+    img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+    try:
+        text = pytesseract.image_to_string(thresh, lang="vie")
+    except pytesseract.TesseractError:
+        text = pytesseract.image_to_string(thresh, lang="eng")
+    return ocr.extract_fields(text)
+
+
+def legacy_preprocess(image_data):
+    import cv2
+    import numpy as np
+
+    img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+
+def pipeline_preprocess(image_data, target_width):
+    from app.utils.ocr import binarize
+
+    gray, _ = deskew(decode_image(image_data, target_width))
+    return binarize(gray, "adaptive")
+
+
+def correct(fields, truth):
+    date = fields.get("date")
+    return {
+        "amount": fields.get("amount") == truth["amount"],
+        "date": bool(date) and (date.year, date.month, date.day) == truth["date"],
+    }
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def summarize(label, seconds, checks=None):
+    stats = {
+        "images": len(seconds),
+        "mean_ms": round(statistics.mean(seconds) * 1000, 1),
+        "max_ms": round(max(seconds) * 1000, 1),
+    }
+    if checks:
+        stats["amount_accuracy"] = round(sum(c["amount"] for c in checks) / len(checks), 3)
+        stats["date_accuracy"] = round(sum(c["date"] for c in checks) / len(checks), 3)
+    print(f"{label:<22} mean {stats['mean_ms']:>8} ms  max {stats['max_ms']:>8} ms"
+          + (f"  amount {stats['amount_accuracy']:.0%}  date {stats['date_accuracy']:.0%}" if checks else ""),
+          file=sys.stderr)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=None, help="OCR pool size (0 = inline)")
+    parser.add_argument("--target-width", type=int, default=1000)
+    parser.add_argument("--save-fixtures", help="Also write the JPEGs and truth.json here")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    fixtures = [render_receipt(rng) for _ in range(args.images)]
+    if args.save_fixtures:
+        os.makedirs(args.save_fixtures, exist_ok=True)
+        for i, (data, _) in enumerate(fixtures):
+            with open(os.path.join(args.save_fixtures, f"receipt_{i:03d}.jpg"), "wb") as f:
+                f.write(data)
+        with open(os.path.join(args.save_fixtures, "truth.json"), "w") as f:
+            json.dump([truth for _, truth in fixtures], f, indent=2)
+
+    results = {
+        "preprocess_legacy": summarize("preprocess legacy", [timed(legacy_preprocess, d)[0] for d, _ in fixtures]),
+        "preprocess_pipeline": summarize("preprocess pipeline", [
+            timed(pipeline_preprocess, d, args.target_width)[0] for d, _ in fixtures
+        ]),
+    }
+
+    # What the tiered extractor uploads when it escalates to the vision model
+    from app.utils.receipt_extractor import prepare_for_model
+
+    runs = [timed(prepare_for_model, d) for d, _ in fixtures]
+    results["model_upload"] = summarize("model upload prep", [s for s, _ in runs])
+    results["model_upload"]["original_kb"] = round(statistics.mean(len(d) for d, _ in fixtures) / 1024, 1)
+    results["model_upload"]["prepared_kb"] = round(statistics.mean(len(p) for _, p in runs) / 1024, 1)
+    print(f"{'model upload size':<22} {results['model_upload']['original_kb']} KB -> "
+          f"{results['model_upload']['prepared_kb']} KB", file=sys.stderr)
+
+    if shutil.which("tesseract") is None:
+        print("tesseract not found: OCR timings skipped", file=sys.stderr)
+    else:
+        ocr = ReceiptOCR(workers=args.workers, target_width=args.target_width)
+        ocr.process_image(fixtures[0][0])  # start the pool outside the timings
+
+        runs = [timed(legacy_ocr, ocr, d) for d, _ in fixtures]
+        results["legacy"] = summarize("legacy", [s for s, _ in runs],
+                                      [correct(f, t) for (_, f), (_, t) in zip(runs, fixtures)])
+        runs = [timed(ocr.process_image, d) for d, _ in fixtures]
+        results["pipeline"] = summarize("pipeline", [s for s, _ in runs],
+                                        [correct(f, t) for (_, f), (_, t) in zip(runs, fixtures)])
+        elapsed, batch = timed(ocr.process_images, [d for d, _ in fixtures])
+        results["batch"] = summarize("batch (per image)", [elapsed / len(fixtures)] * len(fixtures),
+                                     [correct(f, t) for f, (_, t) in zip(batch, fixtures)])
+        shutdown_pool()
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Password verification throughput per scheme and cost
+
+For each hasher setting, times single verifications (the latency one login
+adds) and then ``--threads`` concurrent verifications for ``--seconds``,
+reporting logins/sec overall and per core. Use it to pick the highest cost
+that still fits the login rate you expect at peak.
+
+    cd backend
+    python benchmarks/bench_passwords.py --runs 5 --seconds 5
+    python benchmarks/bench_passwords.py --only scrypt:16384 scrypt:32768 bcrypt:12
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.passwords import create_hasher  # noqa: E402
+
+PASSWORD = "BenchPass123"
+
+# name -> (scheme, config overrides)
+SETTINGS = {
+    "scrypt:16384": ("scrypt", {"PASSWORD_SCRYPT_N": 16384}),
+    "scrypt:32768": ("scrypt", {"PASSWORD_SCRYPT_N": 32768}),
+    "scrypt:65536": ("scrypt", {"PASSWORD_SCRYPT_N": 65536}),
+    "pbkdf2:600000": ("pbkdf2", {"PASSWORD_PBKDF2_ITERATIONS": 600000}),
+    "pbkdf2:1000000": ("pbkdf2", {"PASSWORD_PBKDF2_ITERATIONS": 1000000}),
+    "bcrypt:10": ("bcrypt", {"PASSWORD_BCRYPT_ROUNDS": 10}),
+    "bcrypt:12": ("bcrypt", {"PASSWORD_BCRYPT_ROUNDS": 12}),
+    "argon2:3x64MiB": ("argon2", {"PASSWORD_ARGON2_TIME_COST": 3, "PASSWORD_ARGON2_MEMORY_COST": 65536}),
+}
+
+
+def _throughput(hasher, stored, threads, seconds):
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        done = 0
+        while time.perf_counter() < deadline:
+            hasher.verify(stored, PASSWORD)
+            done += 1
+        return done
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        total = sum(pool.map(lambda _: worker(), range(threads)))
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", nargs="*", choices=list(SETTINGS), help="Settings to run (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Single verifications timed per setting")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=5, help="Duration of the concurrent run")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    results = {}
+    for name in args.only or SETTINGS:
+        scheme, config = SETTINGS[name]
+        try:
+            hasher = create_hasher(scheme, config)
+        except ImportError as e:
+            print(f"{name}: skipped ({e})", file=sys.stderr)
+            continue
+        stored = hasher.hash(PASSWORD)
+        samples = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            assert hasher.verify(stored, PASSWORD)
+            samples.append((time.perf_counter() - started) * 1000)
+        per_sec = _throughput(hasher, stored, args.threads, args.seconds)
+        results[name] = {
+            "verify_ms": round(statistics.median(samples), 1),
+            "logins_per_sec": round(per_sec, 1),
+            "logins_per_sec_per_core": round(per_sec / min(args.threads, cores), 1),
+        }
+
+    print(f"{'setting':<18}{'verify ms':>10}{'logins/s':>10}{'per core':>10}   ({args.threads} threads, {cores} cores)")
+    for name, r in results.items():
+        print(f"{name:<18}{r['verify_ms']:>10}{r['logins_per_sec']:>10}{r['logins_per_sec_per_core']:>10}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"threads": args.threads, "cores": cores, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
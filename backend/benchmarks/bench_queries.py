@@ -0,0 +1,75 @@
+"""
+SQL statements per request across the read API
+
+Seeds a small synthetic dataset, logs in as one user and calls each GET
+endpoint a few times, counting the statements every call runs with
+QueryCounter. The first call warms per-process caches (user identity,
+category slugs), so the steady-state column is what a logged-in user
+normally costs.
+
+    cd backend
+    python benchmarks/bench_queries.py --repeat 3
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.datagen import BENCH_PASSWORD, generate, make_bench_config  # noqa: E402
+
+ENDPOINTS = [
+    "/api/auth/me", "/api/dashboard", "/api/expenses", "/api/wallets", "/api/budgets",
+    "/api/budgets/current", "/api/budgets/alerts", "/api/categories", "/api/notifications",
+    "/api/notifications/unread_count", "/api/expenses/search?description=pho",
+    "/api/expenses/statistics", "/api/reports/monthly", "/api/splits/groups", "/api/splits/owed",
+    "/api/splits/owing",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=500, help="Expenses per user")
+    parser.add_argument("--repeat", type=int, default=3, help="Calls per endpoint")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.utils.query_counter import QueryCounter
+
+    path = os.path.join(tempfile.mkdtemp(prefix="moneykeeper-queries-"), "queries.db")
+    app = create_app(make_bench_config(f"sqlite:///{path}"))
+    with app.app_context():
+        db.create_all()
+        generate(users=1, wallets=2, expenses=args.expenses)
+
+    client = app.test_client()
+    response = client.post("/auth/login", data={"username": "bench0000", "password": BENCH_PASSWORD})
+    assert response.status_code in (200, 302), response.status_code
+
+    results = {}
+    for url in ENDPOINTS:
+        counts = []
+        for _ in range(args.repeat):
+            with QueryCounter() as counter:
+                status = client.get(url).status_code
+            counts.append(counter.count)
+        results[url] = {"status": status, "first": counts[0], "steady": counts[-1]}
+
+    print(f"{'endpoint':<42}{'status':>7}{'first':>7}{'steady':>8}")
+    for url, r in results.items():
+        print(f"{url:<42}{r['status']:>7}{r['first']:>7}{r['steady']:>8}")
+    total = sum(r["steady"] for r in results.values())
+    print(f"\n{total} statements over {len(results)} endpoints ({total / len(results):.2f} per request)")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Serving benchmark: gunicorn worker models under mixed API and chat load
+
+Seeds a temporary SQLite database, then for each worker class starts
+``gunicorn -c gunicorn.conf.py wsgi:app`` with the fake model backend and
+runs dashboard requests and Socket.IO chat messages concurrently. Reports
+req/s and p50/p99 per mode, plus how long a SIGTERM takes to drain.
+
+    cd backend
+    python benchmarks/bench_serving.py --modes threading,gevent --api-clients 16 --chat-clients 16
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.datagen import BENCH_PASSWORD, generate, make_bench_config  # noqa: E402
+from benchmarks.load import _percentile  # noqa: E402
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def seed_database(path, users, expenses):
+    from app import create_app, db
+
+    app = create_app(make_bench_config(f"sqlite:///{path}"))
+    with app.app_context():
+        db.create_all()
+        generate(users=users, wallets=2, expenses=expenses, seed=42)
+        db.session.remove()
+        db.engine.dispose()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, database_path, port, args):
+    env = dict(
+        os.environ,
+        WORKER_CLASS=mode,
+        BIND=f"127.0.0.1:{port}",
+        DATABASE_URL=f"sqlite:///{database_path}",
+        APP_CONFIG="production",
+        SECRET_KEY="bench-secret-key",
+        SESSION_COOKIE_SECURE="false",
+        AI_BACKEND="fake",
+        AI_FAKE_LATENCY=args.model_latency,
+        AI_FAKE_CHUNKS="10",
+        AI_FAKE_CHUNK_DELAY=str(args.chunk_delay),
+        EMAIL_OUTBOX_WORKER="false",
+        LIVE_UPDATES_ENABLED="false",
+        SHUTDOWN_DRAIN_TIMEOUT="10",
+    )
+    env.pop("WERKZEUG_RUN_MAIN", None)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{mode}: server exited\n{process.stderr.read()[-2000:]}")
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/healthz", timeout=5).ok:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"{mode}: server did not become healthy")
+
+
+def login(base_url, username):
+    session = requests.Session()
+    response = session.post(f"{base_url}/auth/login", json={"username": username, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return session
+
+
+def api_worker(base_url, username, count, barrier, latencies, errors):
+    session = login(base_url, username)
+    barrier.wait()
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            status = session.get(f"{base_url}/api/dashboard", timeout=30).status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+
+
+def chat_worker(base_url, username, count, barrier, latencies, errors):
+    import socketio
+
+    session = login(base_url, username)
+    client = socketio.Client(http_session=session)
+    done = threading.Event()
+    client.on("response", lambda data: done.set(), namespace="/chat")
+    client.on("error", lambda data: (errors.append(data.get("data")), done.set()), namespace="/chat")
+    client.connect(base_url, namespaces=["/chat"], wait_timeout=10)
+    barrier.wait()
+    for i in range(count):
+        done.clear()
+        start = time.perf_counter()
+        client.emit("message", {"message": f"Tháng này tôi tiêu bao nhiêu? ({i})"}, namespace="/chat")
+        if not done.wait(30):
+            errors.append("timeout")
+        latencies.append(time.perf_counter() - start)
+    client.disconnect()
+
+
+def summarize(latencies, errors, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def run_mode(mode, database_path, usernames, args):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = start_server(mode, database_path, port, args)
+    try:
+        api = ([], [])
+        chat = ([], [])
+        workers = [(api_worker, api, args.requests) for _ in range(args.api_clients)]
+        workers += [(chat_worker, chat, args.messages) for _ in range(args.chat_clients)]
+        barrier = threading.Barrier(len(workers))
+        threads = [
+            threading.Thread(target=target, args=(base_url, usernames[i % len(usernames)], count, barrier, *sink))
+            for i, (target, sink, count) in enumerate(workers)
+        ]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        # Time a graceful stop (drain + pool close)
+        stop_started = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+        shutdown_seconds = time.perf_counter() - stop_started
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+    return {
+        "dashboard": summarize(*api, elapsed),
+        "chat": summarize(*chat, elapsed),
+        "shutdown_s": round(shutdown_seconds, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", default="threading,gevent,eventlet",
+                        help="Comma-separated WORKER_CLASS values; missing libraries are skipped")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--expenses", type=int, default=500, help="Expenses per user")
+    parser.add_argument("--api-clients", type=int, default=16)
+    parser.add_argument("--chat-clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="Dashboard requests per API client")
+    parser.add_argument("--messages", type=int, default=5, help="Chat messages per chat client")
+    parser.add_argument("--model-latency", default="lognormal:-1.5,0.4", help="AI_FAKE_LATENCY spec")
+    parser.add_argument("--chunk-delay", type=float, default=0.05)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    database_path = os.path.join(tempfile.mkdtemp(prefix="moneykeeper-serve-"), "bench.db")
+    seed_database(database_path, args.users, args.expenses)
+    usernames = [f"bench{i:04d}" for i in range(args.users)]
+
+    results = {}
+    for mode in args.modes.split(","):
+        if mode != "threading" and importlib.util.find_spec(mode) is None:
+            print(f"{mode}: not installed, skipped", file=sys.stderr)
+            continue
+        results[mode] = run_mode(mode, database_path, usernames, args)
+        for name in ("dashboard", "chat"):
+            stats = results[mode][name]
+            print(f"{mode:<10} {name:<10} {stats['rps']:>8} req/s  p50 {stats['p50_ms']} ms  "
+                  f"p99 {stats['p99_ms']} ms  errors {stats['errors']}", file=sys.stderr)
+        print(f"{mode:<10} shutdown   {results[mode]['shutdown_s']} s", file=sys.stderr)
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Settling a large split group
+
+Seeds one group of ``--members`` people (ten of them registered users who pay
+for things) with ``--splits`` unpaid splits, then times the two halves of
+/api/splits/groups/<id>/settlement: netting balances by loading every split
+row (what a client has to do with /owed and /owing) against the grouped
+query, and the greedy solver against the exact one on the biggest subgroup
+it accepts. Finally the endpoint itself, end to end. Times are medians of
+``--runs``, in milliseconds.
+
+    cd backend
+    python benchmarks/bench_settlement.py --members 100 --splits 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.datagen import BENCH_PASSWORD, generate, make_bench_config  # noqa: E402
+
+PAYERS = 10
+
+
+def _time(fn, runs):
+    fn()
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(samples), 2), result
+
+
+def _seed(members, splits, seed=42):
+    from sqlalchemy import insert
+
+    from app import db
+    from app.models import Expense, ExpenseSplit, SplitGroup, SplitMember, User
+
+    rng = random.Random(seed)
+    payers = [uid for (uid,) in db.session.query(User.id).filter(User.username.like("bench%")).order_by(User.id)]
+    group = SplitGroup(name="Cả lớp đi Sapa", created_by=payers[0])
+    group.members = [SplitMember(user_id=uid, name=f"bench{uid}", is_user=True) for uid in payers] + [
+        SplitMember(name=f"Bạn {i}") for i in range(members - len(payers))
+    ]
+    db.session.add(group)
+    db.session.flush()
+    member_ids = [m.id for m in group.members]
+    expense_ids = [eid for (eid,) in db.session.query(Expense.id).filter(Expense.user_id.in_(payers))]
+    db.session.execute(insert(ExpenseSplit), [
+        {"expense_id": rng.choice(expense_ids), "member_id": rng.choice(member_ids),
+         "amount": rng.randrange(10, 500) * 1000, "is_paid": False}
+        for _ in range(splits)
+    ])
+    db.session.commit()
+    return group.id
+
+
+def _balances_from_rows(group):
+    """Net balances the row-by-row way: load every split with its expense"""
+    from sqlalchemy.orm import joinedload
+
+    from app.models import ExpenseSplit, SplitMember
+
+    member_by_user = {m.user_id: m.id for m in group.members if m.user_id}
+    balances = dict.fromkeys((m.id for m in group.members), 0)
+    splits = (
+        ExpenseSplit.query.join(SplitMember)
+        .filter(SplitMember.group_id == group.id, ExpenseSplit.is_paid == False)  # noqa: E712
+        .options(joinedload(ExpenseSplit.expense))
+        .all()
+    )
+    for s in splits:
+        cents = int(round(s.amount * 100))
+        balances[s.member_id] -= cents
+        balances[member_by_user[s.expense.user_id]] += cents
+    return balances
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=100, help="Members in the group")
+    parser.add_argument("--splits", type=int, default=10000, help="Unpaid splits in the group")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs per variant")
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    from app import create_app, db
+    from app.models import SplitGroup
+    from app.utils import settlement
+    from app.utils.query_counter import QueryCounter
+
+    path = os.path.join(tempfile.mkdtemp(prefix="moneykeeper-settlement-"), "settlement.db")
+    app = create_app(make_bench_config(f"sqlite:///{path}"))
+    results = {}
+    with app.app_context():
+        db.create_all()
+        generate(users=PAYERS, wallets=1, expenses=2000)
+        group_id = _seed(args.members, args.splits)
+        group = db.session.get(SplitGroup, group_id)
+        exact_limit = app.config["SETTLEMENT_EXACT_MAX_PARTICIPANTS"]
+
+        ms, by_rows = _time(lambda: _balances_from_rows(group), args.runs)
+        results["balances_rows"] = {"p50_ms": ms}
+        ms, (by_query, _) = _time(lambda: settlement.group_balances(group), args.runs)
+        results["balances_query"] = {"p50_ms": ms}
+        assert by_rows == by_query
+
+        ms, transfers = _time(lambda: settlement.greedy_transfers(by_query), args.runs)
+        results["greedy"] = {"p50_ms": ms, "participants": len(by_query), "transfers": len(transfers)}
+
+        subgroup = dict(list(by_query.items())[:exact_limit - 1])
+        subgroup["rest"] = -sum(subgroup.values())
+        for name, solver in (("greedy_small", settlement.greedy_transfers),
+                             ("exact_small", settlement.exact_transfers)):
+            ms, transfers = _time(lambda: solver(subgroup), args.runs)
+            results[name] = {"p50_ms": ms, "participants": len(subgroup), "transfers": len(transfers)}
+
+    client = app.test_client()
+    response = client.post("/auth/login", data={"username": "bench0000", "password": BENCH_PASSWORD})
+    assert response.status_code in (200, 302), response.status_code
+    url = f"/api/splits/groups/{group_id}/settlement"
+    with QueryCounter() as counter:
+        client.get(url)
+    ms, response = _time(lambda: client.get(url), args.runs)
+    assert response.status_code == 200, response.status_code
+    results["endpoint"] = {"p50_ms": ms, "queries": counter.count, "method": response.get_json()["method"]}
+
+    print(f"{args.members} members, {args.splits} splits")
+    print(f"{'variant':<16}{'p50 ms':>9}  details")
+    for name, r in results.items():
+        details = ", ".join(f"{k}={v}" for k, v in r.items() if k != "p50_ms")
+        print(f"{name:<16}{r['p50_ms']:>9}  {details}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({"members": args.members, "splits": args.splits, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark: import time and create_app() wall time
+
+Boots the app in fresh interpreters under ``python -X importtime`` and reports
+the wall time (min/median) plus the slowest modules by cumulative import time.
+tests/test_startup.py checks that heavy dependencies stay lazy; this script
+measures the time, and with ``--budget`` exits non-zero when the fastest run
+is over it.
+
+    cd backend
+    python benchmarks/bench_startup.py --runs 5 --top 20 --budget 2.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+BOOT = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from config import {config}\n"
+    "from app import create_app\n"
+    "create_app({config})\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us)} from ``-X importtime`` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def boot(config):
+    env = {k: v for k, v in os.environ.items() if k != "WERKZEUG_RUN_MAIN"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT.format(config=config)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+    return float(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--config", default="TestingConfig", help="Config class from config.py")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--budget", type=float, help="Fail when the fastest boot takes longer (seconds)")
+    args = parser.parse_args()
+
+    walls, runs = [], []
+    for _ in range(args.runs):
+        wall, modules = boot(args.config)
+        walls.append(wall)
+        runs.append(modules)
+
+    # Per-module median over runs
+    names = set.intersection(*(set(r) for r in runs))
+    cumulative = {n: statistics.median(r[n][1] for r in runs) for n in names}
+    total_self = statistics.median(sum(s for s, _ in r.values()) for r in runs)
+
+    print(f"create_app wall time: min {min(walls):.3f}s  median {statistics.median(walls):.3f}s")
+    print(f"total import time:    {total_self / 1e6:.3f}s over {len(names)} modules\n")
+    print(f"{'cumulative ms':>14}  module")
+    top = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, us in top:
+        print(f"{us / 1000:>14.1f}  {name}")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump({
+                "wall_min": min(walls),
+                "wall_median": statistics.median(walls),
+                "import_total": total_self / 1e6,
+                "top": [{"module": n, "cumulative_ms": us / 1000} for n, us in top],
+            }, f, indent=2)
+
+    if args.budget is not None and min(walls) > args.budget:
+        raise SystemExit(f"startup took {min(walls):.2f}s (budget {args.budget}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Fixtures for the benchmark suite
+
+    cd backend
+    pip install pytest-benchmark
+    pytest benchmarks -p no:cacheprovider --no-cov --benchmark-json=bench-results.json
+
+Dataset size comes from BENCH_USERS / BENCH_WALLETS / BENCH_EXPENSES.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.datagen import BENCH_PASSWORD, generate, make_bench_config  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def bench_app():
+    """App on a temporary SQLite database seeded with the synthetic dataset"""
+    from app import create_app, db
+
+    path = os.path.join(tempfile.mkdtemp(prefix="moneykeeper-bench-"), "bench.db")
+    app = create_app(make_bench_config(f"sqlite:///{path}"))
+    with app.app_context():
+        db.create_all()
+        app.bench_dataset = generate(
+            users=int(os.environ.get("BENCH_USERS", 5)),
+            wallets=int(os.environ.get("BENCH_WALLETS", 3)),
+            expenses=int(os.environ.get("BENCH_EXPENSES", 2000)),
+        )
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def bench_client(bench_app):
+    """Test client logged in as the first synthetic user"""
+    client = bench_app.test_client()
+    with client:
+        client.post("/auth/login", data={"username": "bench0000", "password": BENCH_PASSWORD})
+        yield client
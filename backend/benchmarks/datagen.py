@@ -0,0 +1,290 @@
+"""
+Deterministic synthetic data for benchmarks and load tests
+
+Creates N users x M wallets x K expenses per user, with Vietnamese
+descriptions, default categories, monthly budgets, notifications and a split
+group per user. The same seed and anchor date always produce the same rows.
+
+    cd backend
+    python benchmarks/datagen.py --users 20 --wallets 3 --expenses 5000 \
+        --database sqlite:////tmp/moneykeeper-bench.db
+
+Every user logs in with the password ``BENCH_PASSWORD``. Recurring
+transactions, debts and savings goals are not generated: their API modules
+exist but their models are not part of ``app.models`` yet.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import bindparam, insert, update  # noqa: E402
+
+BENCH_PASSWORD = "BenchPass123"
+
+# (description, merchant) pools per category slug, with a typical amount range in VND
+EXPENSE_TEMPLATES = {
+    "food": (
+        ["Phở bò tái", "Cơm tấm sườn bì chả", "Bún chả Hà Nội", "Bánh mì pate",
+         "Cà phê sữa đá", "Trà sữa trân châu", "Lẩu thái cuối tuần", "Cơm văn phòng",
+         "Bún bò Huế", "Gỏi cuốn tôm thịt", "Đi chợ mua rau củ", "Mua thịt cá"],
+        ["Highlands Coffee", "Phúc Long", "Bách Hóa Xanh", "Co.op Mart", "The Coffee House", "Quán cơm Ba Ghiền"],
+        (25_000, 450_000),
+    ),
+    "transport": (
+        ["Đổ xăng xe máy", "Grab đi làm", "Vé xe buýt", "Gửi xe tháng", "Taxi về nhà",
+         "Vé tàu Hà Nội - Sài Gòn", "Vé máy bay Vietjet", "Thay nhớt xe"],
+        ["Petrolimex", "Grab", "Be", "Mai Linh", "Vinasun", "Vietjet Air"],
+        (10_000, 2_500_000),
+    ),
+    "shopping": (
+        ["Mua áo sơ mi", "Giày thể thao", "Đồ gia dụng", "Tai nghe bluetooth",
+         "Sách kỹ năng", "Mỹ phẩm", "Quà sinh nhật bạn"],
+        ["Shopee", "Tiki", "Lazada", "Uniqlo", "Điện Máy Xanh", "Thế Giới Di Động"],
+        (80_000, 5_000_000),
+    ),
+    "entertainment": (
+        ["Xem phim CGV", "Karaoke với bạn", "Vé ca nhạc", "Netflix hàng tháng",
+         "Spotify Premium", "Du lịch Đà Lạt"],
+        ["CGV", "Lotte Cinema", "Netflix", "Spotify", "Ticketbox"],
+        (50_000, 3_000_000),
+    ),
+    "health": (
+        ["Khám răng", "Mua thuốc cảm", "Vitamin tổng hợp", "Phòng gym tháng", "Khám sức khỏe định kỳ"],
+        ["Pharmacity", "Long Châu", "Bệnh viện Đại học Y", "California Fitness"],
+        (30_000, 1_500_000),
+    ),
+    "education": (
+        ["Học phí tiếng Anh", "Khóa học online", "Mua giáo trình", "Lệ phí thi IELTS"],
+        ["IDP", "Udemy", "Fahasa", "ILA"],
+        (100_000, 6_000_000),
+    ),
+    "utilities": (
+        ["Tiền điện tháng", "Tiền nước", "Internet FPT", "Cước điện thoại Viettel", "Phí quản lý chung cư"],
+        ["EVN", "Sawaco", "FPT Telecom", "Viettel", "Ban quản lý tòa nhà"],
+        (100_000, 1_800_000),
+    ),
+    "other": (
+        ["Chuyển tiền cho mẹ", "Đám cưới đồng nghiệp", "Từ thiện", "Phí ngân hàng"],
+        ["Vietcombank", "Techcombank", "MoMo", "ZaloPay"],
+        (20_000, 2_000_000),
+    ),
+}
+CATEGORY_WEIGHTS = {
+    "food": 40, "transport": 18, "shopping": 12, "entertainment": 8,
+    "health": 5, "education": 3, "utilities": 8, "other": 6,
+}
+INCOME_DESCRIPTIONS = ["Lương tháng", "Thưởng dự án", "Freelance thiết kế", "Lãi tiết kiệm", "Bán đồ cũ"]
+WALLET_NAMES = ["Ví chính", "Tiền mặt", "Vietcombank", "Techcombank", "MoMo", "Tiết kiệm"]
+SEARCH_TERMS = ["phở", "cà phê", "grab", "tiền điện", "shopee", "trà sữa", "xăng", "netflix"]
+
+
+def _round_vnd(amount):
+    return float(int(amount / 1000) * 1000)
+
+
+def generate(users=10, wallets=3, expenses=1000, seed=42, months=6, anchor=None):
+    """Populate the current app's database and return a summary dict.
+
+    Must be called inside an application context on an empty database.
+    ``expenses`` is per user; about 8% of them are income rows.
+    """
+    from app import db
+    from app.api.categories import DEFAULT_CATEGORIES
+    from app.utils.passwords import get_hashers
+    from app.models import (
+        Budget, Category, Expense, ExpenseSplit, Notification, SplitGroup, SplitMember, User, Wallet,
+    )
+
+    rng = random.Random(seed)
+    anchor = (anchor or datetime.utcnow()).replace(hour=12, minute=0, second=0, microsecond=0)
+    start = anchor - timedelta(days=30 * months)
+    span_seconds = int((anchor - start).total_seconds())
+    password_hash = get_hashers().hash(BENCH_PASSWORD)
+    categories = list(CATEGORY_WEIGHTS)
+    weights = list(CATEGORY_WEIGHTS.values())
+    started = time.perf_counter()
+
+    db.session.execute(insert(User), [
+        {
+            "username": f"bench{u:04d}",
+            "email": f"bench{u:04d}@example.com",
+            "password_hash": password_hash,
+            "created_at": start,
+            "premium": u % 5 == 0,
+            "chat_message_count": 0,
+            "categories_initialized": True,
+        }
+        for u in range(users)
+    ])
+    user_ids = [uid for (uid,) in db.session.query(User.id).filter(User.username.like("bench%")).order_by(User.id)]
+
+    db.session.execute(insert(Category), [
+        {"user_id": uid, "name": c["name"], "slug": c["slug"], "icon": c["icon"],
+         "color": c["color"], "is_default": True}
+        for uid in user_ids for c in DEFAULT_CATEGORIES
+    ])
+    db.session.execute(insert(Wallet), [
+        {"user_id": uid, "name": WALLET_NAMES[w % len(WALLET_NAMES)], "balance": 0.0,
+         "currency": "VND", "is_default": w == 0, "created_at": start}
+        for uid in user_ids for w in range(wallets)
+    ])
+    wallets_by_user = {}
+    for wallet_id, uid in db.session.query(Wallet.id, Wallet.user_id).order_by(Wallet.id):
+        wallets_by_user.setdefault(uid, []).append(wallet_id)
+
+    balances = {}
+    rows = []
+    for uid in user_ids:
+        for _ in range(expenses):
+            wallet_id = rng.choice(wallets_by_user[uid])
+            date = start + timedelta(seconds=rng.randrange(span_seconds))
+            if rng.random() < 0.08:
+                amount = _round_vnd(rng.uniform(2_000_000, 30_000_000))
+                rows.append({
+                    "user_id": uid, "wallet_id": wallet_id, "amount": amount, "category": "other",
+                    "description": rng.choice(INCOME_DESCRIPTIONS), "date": date, "is_expense": False,
+                })
+                balances[wallet_id] = balances.get(wallet_id, 0.0) + amount
+                continue
+            category = rng.choices(categories, weights)[0]
+            descriptions, merchants, (low, high) = EXPENSE_TEMPLATES[category]
+            amount = _round_vnd(rng.uniform(low, high))
+            rows.append({
+                "user_id": uid, "wallet_id": wallet_id, "amount": amount, "category": category,
+                "description": f"{rng.choice(descriptions)} - {rng.choice(merchants)}",
+                "date": date, "is_expense": True,
+            })
+            balances[wallet_id] = balances.get(wallet_id, 0.0) - amount
+    for chunk in range(0, len(rows), 5000):
+        db.session.execute(insert(Expense), rows[chunk:chunk + 5000])
+
+    wallets_table = Wallet.__table__
+    db.session.execute(
+        update(wallets_table)
+        .where(wallets_table.c.id == bindparam("wallet_id"))
+        .values(balance=bindparam("new_balance")),
+        [{"wallet_id": wid, "new_balance": bal} for wid, bal in balances.items()],
+    )
+
+    # Budgets for the current and previous month around the actual spending,
+    # so some categories are under and some over budget
+    spent = {}
+    for row in rows:
+        if row["is_expense"]:
+            key = (row["user_id"], row["category"], row["date"].month, row["date"].year)
+            spent[key] = spent.get(key, 0.0) + row["amount"]
+    budget_rows = []
+    for uid in user_ids:
+        for offset in (0, 1):
+            month_date = anchor.replace(day=1) - timedelta(days=offset * 28)
+            for category in ("food", "transport", "shopping", "entertainment", "utilities"):
+                actual = spent.get((uid, category, month_date.month, month_date.year)) or 2_000_000
+                budget_rows.append({
+                    "user_id": uid, "category": category, "month": month_date.month, "year": month_date.year,
+                    "amount": _round_vnd(actual * rng.uniform(0.7, 1.3)),
+                })
+    db.session.execute(insert(Budget), budget_rows)
+
+    db.session.execute(insert(Notification), [
+        {"user_id": uid, "type": rng.choice(["budget_alert", "unusual_spending"]),
+         "message": f"Cảnh báo: Chi tiêu danh mục ăn uống đã đạt {rng.randint(80, 120)}% ngân sách",
+         "is_read": rng.random() < 0.7, "created_at": start + timedelta(seconds=rng.randrange(span_seconds))}
+        for uid in user_ids for _ in range(20)
+    ])
+
+    # One split group per user; a few of their food expenses are shared
+    for uid in user_ids:
+        group = SplitGroup(name="Nhóm đi ăn công ty", created_by=uid)
+        group.members = [SplitMember(user_id=uid, name=f"bench{uid}", is_user=True)] + [
+            SplitMember(name=name, is_user=False) for name in ("Minh", "Lan", "Hùng")
+        ]
+        db.session.add(group)
+    db.session.flush()
+    members_by_user = {
+        g.created_by: [m.id for m in g.members if not m.is_user]
+        for g in SplitGroup.query.filter(SplitGroup.created_by.in_(user_ids))
+    }
+    split_rows = []
+    for uid in user_ids:
+        shared = (
+            db.session.query(Expense.id, Expense.amount)
+            .filter_by(user_id=uid, category="food", is_expense=True)
+            .order_by(Expense.id)
+            .limit(max(1, expenses // 50))
+        )
+        for expense_id, amount in shared:
+            share = _round_vnd(amount / 4)
+            for member_id in members_by_user[uid]:
+                split_rows.append({
+                    "expense_id": expense_id, "member_id": member_id, "amount": share,
+                    "is_paid": rng.random() < 0.3,
+                })
+    if split_rows:
+        db.session.execute(insert(ExpenseSplit), split_rows)
+
+    db.session.commit()
+
+    # The Core inserts above bypass the search index write hooks
+    from app.utils.search import rebuild_index
+
+    with db.engine.begin() as connection:
+        rebuild_index(connection)
+
+    return {
+        "users": len(user_ids),
+        "wallets": sum(len(w) for w in wallets_by_user.values()),
+        "expenses": len(rows),
+        "budgets": len(budget_rows),
+        "splits": len(split_rows),
+        "seed": seed,
+        "anchor": anchor.isoformat(),
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def make_bench_config(database_uri, **overrides):
+    """TestingConfig variant pointed at ``database_uri`` with background work off"""
+    from config import TestingConfig
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        QUERY_GUARD_ENABLED = False
+        PROFILER_ENABLED = False
+        LIVE_UPDATES_ENABLED = False
+
+    for key, value in overrides.items():
+        setattr(BenchConfig, key, value)
+    return BenchConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--wallets", type=int, default=3)
+    parser.add_argument("--expenses", type=int, default=1000, help="Expenses per user")
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database", required=True, help="SQLAlchemy URL of an empty database")
+    args = parser.parse_args()
+
+    from app import create_app, db
+
+    app = create_app(make_bench_config(args.database))
+    with app.app_context():
+        db.create_all()
+        summary = generate(
+            users=args.users, wallets=args.wallets, expenses=args.expenses,
+            seed=args.seed, months=args.months,
+        )
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
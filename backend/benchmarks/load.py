@@ -0,0 +1,274 @@
+"""
+Pure-Python load scenarios against an in-process app
+
+Seeds a temporary SQLite database with the synthetic dataset, then runs each
+scenario with ``--concurrency`` threads (one logged-in user per thread) and
+reports throughput and latency percentiles. AI scenarios (chat, categorize,
+receipt, receipt_retry) run against the fake model backend
+(``AI_BACKEND=fake``), so no API key or network is needed; ``--model-latency``
+and the error-rate options shape its behaviour.
+
+    cd backend
+    python benchmarks/load.py --users 10 --expenses 5000 --concurrency 8 \
+        --requests 50 --json results/load-$(git rev-parse --short HEAD).json
+
+Compare two runs with ``python benchmarks/load.py --compare old.json new.json``.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.datagen import BENCH_PASSWORD, SEARCH_TERMS, generate, make_bench_config  # noqa: E402
+
+
+def _import_csv(rng, wallet_id, rows=50):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["amount", "is_expense", "category", "description", "date", "wallet_id"])
+    for _ in range(rows):
+        writer.writerow([
+            rng.randrange(20, 500) * 1000, "true", rng.choice(["food", "transport", "shopping"]),
+            "Nhập từ sao kê", "2025-01-15", wallet_id,
+        ])
+    return out.getvalue().encode("utf-8")
+
+
+def _dashboard(ctx):
+    return ctx["client"].get("/api/dashboard").status_code
+
+
+def _search(ctx):
+    return ctx["client"].get(
+        "/api/expenses/search",
+        query_string={"description": ctx["rng"].choice(SEARCH_TERMS), "per_page": 50},
+    ).status_code
+
+
+def _reports(ctx):
+    client, rng = ctx["client"], ctx["rng"]
+    if rng.random() < 0.5:
+        return client.get("/api/reports/monthly").status_code
+    return client.get("/api/reports/yearly").status_code
+
+
+def _export(ctx):
+    return ctx["client"].get("/api/expenses/export").status_code
+
+
+def _import(ctx):
+    data = {"file": (io.BytesIO(_import_csv(ctx["rng"], ctx["wallet_id"])), "import.csv")}
+    return ctx["client"].post(
+        "/api/expenses/import", data=data, content_type="multipart/form-data"
+    ).status_code
+
+
+def _chat(ctx):
+    socket = ctx["socket"]
+    socket.emit("message", {"message": "Tháng này tôi tiêu bao nhiêu?"}, namespace="/chat")
+    received = socket.get_received("/chat")
+    return 200 if any(r["name"] == "response" for r in received) else 500
+
+
+def _categorize(ctx):
+    # No keyword match, so the categorizer falls through to the model
+    return ctx["client"].post(
+        "/ai/suggest_category", json={"description": f"Khoản chi số {ctx['rng'].randrange(10**6)}"}
+    ).status_code
+
+
+def _receipt(ctx):
+    data = {"receipt": (io.BytesIO(b"\x89PNG\r\n\x1a\n" + os.urandom(2048)), "receipt.png")}
+    return ctx["client"].post(
+        "/api/process_receipt", data=data, content_type="multipart/form-data"
+    ).status_code
+
+
+def _receipt_retry(ctx):
+    # PWA retry flow: the same photo again, answered from the receipt cache
+    image = ctx.setdefault("receipt_image", b"\x89PNG\r\n\x1a\n" + os.urandom(2048))
+    data = {"receipt": (io.BytesIO(image), "receipt.png")}
+    return ctx["client"].post(
+        "/api/process_receipt", data=data, content_type="multipart/form-data"
+    ).status_code
+
+
+SCENARIOS = {
+    "dashboard": _dashboard,
+    "search": _search,
+    "reports": _reports,
+    "export": _export,
+    "import": _import,
+    "chat": _chat,
+    "categorize": _categorize,
+    "receipt": _receipt,
+    "receipt_retry": _receipt_retry,
+}
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(app, name, concurrency, requests_per_worker, seed=0):
+    """Run one scenario and return its stats dict"""
+    from app import socketio
+    from app.models import User, Wallet
+
+    with app.app_context():
+        users = User.query.filter(User.username.like("bench%")).order_by(User.id).limit(concurrency).all()
+        wallets = {u.id: Wallet.query.filter_by(user_id=u.id).first().id for u in users}
+    latencies, errors = [], []
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(users))
+
+    def worker(index, user):
+        client = app.test_client()
+        client.post("/auth/login", data={"username": user.username, "password": BENCH_PASSWORD})
+        ctx = {"client": client, "rng": random.Random(seed + index), "wallet_id": wallets[user.id]}
+        if name == "chat":
+            ctx["socket"] = socketio.test_client(app, namespace="/chat", flask_test_client=client)
+            ctx["socket"].get_received("/chat")
+        barrier.wait()
+        local_latencies, local_errors = [], []
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            try:
+                status = SCENARIOS[name](ctx)
+            except Exception as e:  # keep going; record the failure
+                status = type(e).__name__
+            local_latencies.append(time.perf_counter() - start)
+            if status != 200:
+                local_errors.append(status)
+        if name == "chat":
+            ctx["socket"].disconnect("/chat")
+        with lock:
+            latencies.extend(local_latencies)
+            errors.extend(local_errors)
+
+    threads = [threading.Thread(target=worker, args=(i, u)) for i, u in enumerate(users)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_kinds": sorted({str(e) for e in errors}),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p90_ms": round(_percentile(latencies, 90) * 1000, 2) if latencies else None,
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def compare(old_path, new_path):
+    """Print the p50/p99/rps change per scenario between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)["scenarios"]
+    with open(new_path) as f:
+        new = json.load(f)["scenarios"]
+    print(f"{'scenario':<12}{'p50 ms':>20}{'p99 ms':>20}{'rps':>20}")
+    for name in sorted(set(old) & set(new)):
+        cells = []
+        for key in ("p50_ms", "p99_ms", "rps"):
+            a, b = old[name][key], new[name][key]
+            change = f"{(b - a) / a * 100:+.0f}%" if a else "n/a"
+            cells.append(f"{a}->{b} ({change})")
+        print(f"{name:<12}" + "".join(f"{c:>20}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--wallets", type=int, default=3)
+    parser.add_argument("--expenses", type=int, default=2000, help="Expenses per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=25, help="Requests per worker")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--model-latency", default="fixed:0.05",
+                        help='Fake model latency, e.g. "lognormal:-2,0.5"')
+    parser.add_argument("--chat-chunks", type=int, default=20)
+    parser.add_argument("--chat-chunk-delay", type=float, default=0.005)
+    parser.add_argument("--model-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--model-server-error-rate", type=float, default=0.0)
+    parser.add_argument("--model-timeout-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    from app import create_app, db
+
+    path = os.path.join(tempfile.mkdtemp(prefix="moneykeeper-load-"), "load.db")
+    app = create_app(make_bench_config(
+        f"sqlite:///{path}",
+        AI_BACKEND="fake",
+        AI_FAKE_LATENCY=args.model_latency,
+        AI_FAKE_CHUNKS=args.chat_chunks,
+        AI_FAKE_CHUNK_DELAY=args.chat_chunk_delay,
+        AI_FAKE_RATE_LIMIT_RATE=args.model_rate_limit_rate,
+        AI_FAKE_SERVER_ERROR_RATE=args.model_server_error_rate,
+        AI_FAKE_TIMEOUT_RATE=args.model_timeout_rate,
+        AI_FAKE_SEED=args.seed,
+    ))
+    with app.app_context():
+        db.create_all()
+        dataset = generate(
+            users=max(args.users, args.concurrency), wallets=args.wallets,
+            expenses=args.expenses, seed=args.seed,
+        )
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "concurrency": args.concurrency,
+            "requests_per_worker": args.requests,
+            "dataset": dataset,
+            "model_latency": args.model_latency,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios.split(","):
+        results["scenarios"][name] = stats = run_scenario(
+            app, name, args.concurrency, args.requests, seed=args.seed
+        )
+        print(f"{name:<10} {stats['rps']:>8} req/s  p50 {stats['p50_ms']} ms  "
+              f"p99 {stats['p99_ms']} ms  errors {stats['errors']}", file=sys.stderr)
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Gunicorn settings for wsgi:app (see wsgi.py)
+
+Socket.IO needs sticky sessions: run one worker per gunicorn instance
+(WEB_CONCURRENCY=1, the default) and scale out with more instances behind a
+proxy that pins clients (e.g. nginx ``ip_hash``). With more than one process,
+set SOCKETIO_MESSAGE_QUEUE so events reach clients connected elsewhere.
+"""
+
+import logging
+import os
+import threading
+
+logger = logging.getLogger("gunicorn.error")
+
+WORKER_CLASS = os.environ.get("WORKER_CLASS", "gevent")
+DRAIN_TIMEOUT = float(os.environ.get("SHUTDOWN_DRAIN_TIMEOUT", 25))
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = {"gevent": "gevent", "eventlet": "eventlet", "threading": "gthread"}[WORKER_CLASS]
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 64))  # gthread only
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 1000))  # green workers only
+
+# Keep idle connections open longer than the proxy / load balancer does
+# (60s on most), so it never reuses a socket gunicorn just closed
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 75))
+# Heartbeat timeout; long chat streams don't block the green worker loop
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+# Must outlast the chat-stream drain in app.utils.lifecycle.shutdown
+graceful_timeout = int(DRAIN_TIMEOUT) + 5
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG")  # "-" for stdout
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def when_ready(server):
+    if workers > 1 and not os.environ.get("SOCKETIO_MESSAGE_QUEUE"):
+        logger.warning(
+            "WEB_CONCURRENCY > 1 without SOCKETIO_MESSAGE_QUEUE: Socket.IO events "
+            "will only reach clients connected to the emitting worker"
+        )
+
+
+def post_worker_init(worker):
+    app = worker.wsgi
+
+    # The only place a production process starts the outbox scheduler
+    # (queue_email never does). With several workers none of them runs it;
+    # drain the outbox with "flask flush-outbox" from cron instead
+    if workers == 1 and app.config.get("EMAIL_OUTBOX_WORKER"):
+        from app.utils.email import start_outbox_worker
+
+        start_outbox_worker(app)
+
+    # On SIGTERM, drain chat streams (and flip /healthz to 503) before the
+    # worker stops its loop
+    original_handle_exit = worker.handle_exit
+
+    def drain_then_exit(sig, frame):
+        from app.utils.lifecycle import shutdown
+
+        shutdown(app, DRAIN_TIMEOUT)
+        original_handle_exit(sig, frame)
+
+    def handle_exit(sig, frame):
+        threading.Thread(target=drain_then_exit, args=(sig, frame), daemon=True).start()
+
+    import signal
+
+    signal.signal(signal.SIGTERM, handle_exit)
@@ -13,9 +13,10 @@ for p in (BACKEND_DIR, PROJECT_ROOT):
     if p not in sys.path:
         sys.path.insert(0, p)
 
+from config import config  # noqa: E402
 from app import create_app, socketio  # noqa: E402
 
-app = create_app()
+app = create_app(config[os.environ.get("APP_CONFIG", "development")])
 
 if __name__ == "__main__":
     socketio.run(app, debug=True, host="0.0.0.0", port=8000, allow_unsafe_werkzeug=True)
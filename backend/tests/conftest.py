@@ -3,15 +3,22 @@ Pytest configuration and fixtures
 """
 
 import pytest
+from contextlib import contextmanager
 from app import create_app, db
-from app.models import User, Wallet, Category
+from config import TestingConfig
+from app.models import (
+    User, Wallet, Category, Expense, Notification, Budget,
+    SplitGroup, SplitMember, ExpenseSplit, ChatSession, ChatMessage, ReceiptCache,
+)
+from app.utils import category_cache, identity_cache
+from app.utils.query_counter import QueryCounter
 from app.api.categories import DEFAULT_CATEGORIES
 
 
 @pytest.fixture(scope='session')
 def app():
     """Create application for testing"""
-    app = create_app()
+    app = create_app(TestingConfig)
     app.config.update({
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
@@ -20,6 +27,7 @@ def app():
     })
     
     with app.app_context():
+        db.drop_all()
         db.create_all()
         yield app
         db.session.remove()
@@ -76,9 +84,20 @@ def test_user(app):
         
         yield user
         
-        # Cleanup
+        # Cleanup (dependent rows first; the relationships don't cascade)
+        expense_ids = db.session.query(Expense.id).filter_by(user_id=user.id)
+        ExpenseSplit.query.filter(ExpenseSplit.expense_id.in_(expense_ids)).delete()
+        for group in SplitGroup.query.filter_by(created_by=user.id):
+            db.session.delete(group)
+        SplitMember.query.filter_by(user_id=user.id).delete()
+        session_ids = db.session.query(ChatSession.id).filter_by(user_id=user.id)
+        ChatMessage.query.filter(ChatMessage.session_id.in_(session_ids)).delete()
+        for model in (Expense, Budget, Notification, Category, Wallet, ChatSession, ReceiptCache):
+            model.query.filter_by(user_id=user.id).delete()
         db.session.delete(user)
         db.session.commit()
+        category_cache.clear()  # SQLite reuses the user id
+        identity_cache.clear()
 
 
 @pytest.fixture
@@ -91,3 +110,18 @@ def auth_client(client, test_user):
         })
         yield client
 
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail if the block runs more than ``limit`` SQL statements
+
+        with assert_max_queries(4):
+            auth_client.get('/api/splits/groups')
+    """
+    @contextmanager
+    def check(limit):
+        with QueryCounter() as counter:
+            yield counter
+        assert counter.count <= limit, counter.report()
+
+    return check
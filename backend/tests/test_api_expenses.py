@@ -143,3 +143,52 @@ class TestExpensesAPI:
         response = client.get('/api/expenses')
         assert response.status_code == 401
 
+
+
+class TestExpenseExport:
+    """Test streamed CSV export failures"""
+
+    @pytest.fixture
+    def expenses(self, app, test_user, monkeypatch):
+        from app import db
+        from app.models import Expense
+
+        monkeypatch.setitem(app.config, 'EXPORT_YIELD_PER', 2)
+        wallet = test_user.get_default_wallet()
+        rows = [
+            Expense(amount=1000 * i, category='food', description=f'Phở {i}', date=datetime.now(),
+                    user_id=test_user.id, wallet_id=wallet.id)
+            for i in range(1, 6)
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        yield rows
+        for row in rows:
+            db.session.delete(row)
+        db.session.commit()
+
+    def _fail_on_call(self, monkeypatch, n):
+        from app.api import expenses as expenses_api
+
+        calls = []
+        original = expenses_api.sanitize_string
+
+        def sanitize(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == n:
+                raise RuntimeError('connection lost')
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(expenses_api, 'sanitize_string', sanitize)
+
+    def test_failure_in_first_batch_returns_500(self, auth_client, expenses, monkeypatch):
+        self._fail_on_call(monkeypatch, 1)
+        assert auth_client.get('/api/expenses/export').status_code == 500
+
+    def test_failure_mid_stream_is_logged(self, auth_client, expenses, monkeypatch, caplog):
+        self._fail_on_call(monkeypatch, 4)
+        response = auth_client.get('/api/expenses/export', buffered=False)
+        assert response.status_code == 200
+        with pytest.raises(RuntimeError):
+            response.get_data()
+        assert 'Error streaming expense export' in caplog.text
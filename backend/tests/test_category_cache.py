@@ -0,0 +1,58 @@
+"""
+Tests for the per-user category slug cache behind validate_category
+"""
+
+import io
+
+from app import db
+from app.models import Category, Wallet
+from app.security import validate_category
+from app.utils.query_counter import QueryCounter
+
+
+def _category_queries(counter):
+    return [s for s in counter.statements if "FROM category" in s]
+
+
+def _import(client, csv_text):
+    return client.post("/api/expenses/import", data={"file": (io.BytesIO(csv_text.encode()), "expenses.csv")},
+                       content_type="multipart/form-data")
+
+
+class TestCategoryCache:
+    def test_import_looks_categories_up_once(self, app, auth_client, test_user):
+        with app.app_context():
+            wallet_id = Wallet.query.filter_by(user_id=test_user.id).first().id
+        rows = [f"{10000 + i},{('food', 'transport', 'bogus')[i % 3]},Dòng {i},2025-03-01,{wallet_id}"
+                for i in range(60)]
+        with QueryCounter() as counter:
+            response = _import(auth_client, "amount,category,description,date,wallet_id\n" + "\n".join(rows))
+        assert response.status_code in (200, 201), response.get_json()
+        assert len(_category_queries(counter)) == 1
+
+    def test_new_category_is_valid_immediately(self, app, auth_client, test_user):
+        with app.test_request_context():
+            assert validate_category("pets", test_user.id) == "other"  # cached without "pets"
+        created = auth_client.post("/api/categories", json={"name": "Thú cưng", "slug": "pets"})
+        assert created.status_code == 201
+        with app.test_request_context():
+            assert validate_category("pets", test_user.id) == "pets"
+
+    def test_deleted_category_is_rejected(self, app, auth_client, test_user):
+        created = auth_client.post("/api/categories", json={"name": "Quà", "slug": "gifts"})
+        category_id = created.get_json()["category"]["id"]
+        with app.test_request_context():
+            assert validate_category("gifts", test_user.id) == "gifts"
+        assert auth_client.delete(f"/api/categories/{category_id}").status_code == 200
+        with app.test_request_context():
+            assert validate_category("gifts", test_user.id) == "other"
+
+    def test_category_added_elsewhere_is_picked_up_on_miss(self, app, test_user, monkeypatch):
+        from app.utils import category_cache
+
+        with app.test_request_context():
+            assert validate_category("travel", test_user.id) == "other"
+            db.session.add(Category(user_id=test_user.id, name="Du lịch", slug="travel"))
+            db.session.commit()  # another worker: no invalidation here
+            monkeypatch.setattr(category_cache, "MISS_RELOAD_INTERVAL", 0)
+            assert validate_category("travel", test_user.id) == "travel"
@@ -0,0 +1,73 @@
+"""
+Combined dashboard endpoint
+"""
+
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Budget, Expense, Notification
+
+
+def _seed(user):
+    wallet = user.get_default_wallet()
+    now = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    db.session.add_all([
+        Expense(amount=50000, category="food", description="Phở", date=now,
+                user_id=user.id, wallet_id=wallet.id, is_expense=True),
+        Expense(amount=20000, category="transport", description="Grab", date=now - timedelta(days=1),
+                user_id=user.id, wallet_id=wallet.id, is_expense=True),
+        Expense(amount=1000000, category="salary", description="Lương", date=now - timedelta(days=2),
+                user_id=user.id, wallet_id=wallet.id, is_expense=False),
+        Expense(amount=99000, category="food", description="Old", date=now - timedelta(days=400),
+                user_id=user.id, wallet_id=wallet.id, is_expense=True),
+        Budget(category="food", amount=100000, month=now.month, year=now.year, user_id=user.id),
+        Notification(user_id=user.id, message="Hi", type="info"),
+    ])
+    db.session.commit()
+
+
+def test_full_dashboard_matches_individual_endpoints(auth_client, test_user):
+    _seed(test_user)
+    response = auth_client.get("/api/dashboard/full")
+    assert response.status_code == 200
+    data = response.get_json()
+
+    summary = auth_client.get("/api/dashboard").get_json()
+    assert data["summary"] == {k: summary[k] for k in ("totalIncome", "totalExpenses", "balance")}
+    assert data["wallets"] == auth_client.get("/api/wallets").get_json()["wallets"]
+    assert data["budgets"] == auth_client.get("/api/budgets/current").get_json()
+    assert data["notifications"] == auth_client.get("/api/notifications/unread_count").get_json()
+    assert data["recent"] == auth_client.get("/api/expenses?per_page=5").get_json()["expenses"]
+
+    assert len(data["trends"]) == 7
+    today = data["trends"][-1]
+    assert today["expenses"] == 50000 and today["count"] == 1
+    assert sum(t["income"] for t in data["trends"]) == 1000000
+    assert {c["category"]: c["total"] for c in data["categories"]} == {"food": 50000, "transport": 20000}
+
+
+def test_sections_selector(auth_client, test_user):
+    data = auth_client.get("/api/dashboard/full?sections=wallets,notifications").get_json()
+    assert set(data) == {"wallets", "notifications"}
+    assert auth_client.get("/api/dashboard/full?sections=wallets,nope").status_code == 400
+
+
+def test_etag_revalidation(auth_client, test_user):
+    first = auth_client.get("/api/dashboard/full")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = auth_client.get("/api/dashboard/full", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+    _seed(test_user)
+    changed = auth_client.get("/api/dashboard/full", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_query_count(auth_client, test_user, assert_max_queries):
+    auth_client.get("/api/dashboard/full")
+    with assert_max_queries(7):  # six sections plus the data version lookup
+        auth_client.get("/api/dashboard/full")
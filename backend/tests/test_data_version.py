@@ -0,0 +1,98 @@
+"""
+Per-user data version and conditional GETs
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from flask import g
+from flask_login import login_user
+from werkzeug.http import http_date
+
+from app import db
+from app.models import Expense, Wallet
+from app.utils.data_version import get_version
+from app.utils.query_counter import QueryCounter
+
+
+def _add_expense(user, amount=10000):
+    db.session.add(Expense(
+        amount=amount, category="food", description="Test", date=datetime.now(),
+        user_id=user.id, wallet_id=user.get_default_wallet().id,
+    ))
+    db.session.commit()
+
+
+class TestDataVersion:
+    def test_writes_bump_version(self, app, test_user):
+        version, _ = get_version(test_user.id)
+        _add_expense(test_user)
+        bumped, changed_at = get_version(test_user.id)
+        assert bumped == version + 1
+        assert changed_at is not None
+
+    def test_unchanged_objects_do_not_bump(self, app, test_user):
+        wallet = test_user.get_default_wallet()
+        version, _ = get_version(test_user.id)
+        wallet.balance = wallet.balance  # no real change
+        db.session.commit()
+        assert get_version(test_user.id)[0] == version
+
+    def test_rollback_discards_bump(self, app, test_user):
+        version, _ = get_version(test_user.id)
+        wallet = test_user.get_default_wallet()
+        wallet.balance += 1
+        db.session.flush()
+        db.session.rollback()
+        assert get_version(test_user.id)[0] == version
+
+    def test_bulk_update_bumps_requesting_user(self, app, test_user):
+        version, _ = get_version(test_user.id)
+        with app.test_request_context():
+            login_user(test_user)
+            Wallet.query.filter_by(user_id=test_user.id).update({"is_default": False})
+            db.session.commit()
+            g.pop("_login_user", None)  # tests share one app context
+        assert get_version(test_user.id)[0] == version + 1
+
+
+class TestConditionalGet:
+    def test_not_modified_skips_the_view(self, auth_client, test_user):
+        first = auth_client.get("/api/wallets")
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert first.headers["Cache-Control"] == "private, no-cache"
+        assert first.headers["Last-Modified"]
+
+        with QueryCounter() as counter:
+            again = auth_client.get("/api/wallets", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.data == b""
+        assert again.headers["ETag"] == etag
+        assert counter.count == 1, counter.report()  # the version lookup only
+
+    def test_write_changes_etag(self, auth_client, test_user):
+        etag = auth_client.get("/api/expenses").headers["ETag"]
+        _add_expense(test_user)
+        response = auth_client.get("/api/expenses", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert len(response.get_json()["expenses"]) == 1
+
+    def test_write_through_api_changes_etag(self, auth_client, test_user):
+        etag = auth_client.get("/api/categories").headers["ETag"]
+        auth_client.post("/api/categories", json={"name": "Mèo", "slug": "cat-food"})
+        response = auth_client.get("/api/categories", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert any(c["slug"] == "cat-food" for c in response.get_json()["categories"])
+
+    def test_if_modified_since(self, auth_client, test_user):
+        auth_client.get("/api/budgets")
+        future = http_date(datetime.now(timezone.utc) + timedelta(minutes=1))
+        past = http_date(datetime.now(timezone.utc) - timedelta(days=2))
+        assert auth_client.get("/api/budgets", headers={"If-Modified-Since": future}).status_code == 304
+        assert auth_client.get("/api/budgets", headers={"If-Modified-Since": past}).status_code == 200
+
+    def test_disabled(self, app, auth_client, test_user, monkeypatch):
+        monkeypatch.setitem(app.config, "CONDITIONAL_GET_ENABLED", False)
+        response = auth_client.get("/api/wallets")
+        assert "ETag" not in response.headers
@@ -0,0 +1,215 @@
+"""
+Tests for the batched email outbox
+"""
+
+import socket
+import pytest
+from datetime import datetime, timedelta
+from flask_mail import Connection
+from app import db, mail
+from app.models import EmailOutbox
+from app.utils.email import queue_email, process_outbox
+
+
+@pytest.fixture
+def outbox(app):
+    """Empty outbox before and after each test"""
+    with app.test_request_context():
+        EmailOutbox.query.delete()
+        db.session.commit()
+        yield EmailOutbox
+        EmailOutbox.query.delete()
+        db.session.commit()
+
+
+def _queue(n, recipient="a@example.com", user_id=None):
+    for i in range(n):
+        assert queue_email(
+            subject=f"Cảnh báo {i}",
+            recipient=recipient,
+            template="budget_alert",
+            body=f"Thông báo số {i}",
+            user_id=user_id,
+        )
+
+
+class TestEmailOutbox:
+    """Test queueing, digests, retries and dead-lettering"""
+
+    def test_queue_email_stores_pending_row(self, outbox):
+        _queue(1)
+        row = outbox.query.one()
+        assert row.status == "pending"
+        assert row.attempts == 0
+        assert row.body == "Thông báo số 0"
+
+    def test_process_outbox_coalesces_per_recipient(self, outbox):
+        _queue(3, recipient="a@example.com")
+        _queue(1, recipient="b@example.com")
+
+        with mail.record_messages() as sent:
+            stats = process_outbox()
+
+        assert stats == {"messages": 2, "sent": 4, "failed": 0}
+        assert len(sent) == 2
+        digest = next(m for m in sent if m.recipients == ["a@example.com"])
+        assert "3" in digest.subject
+        assert "Thông báo số 2" in digest.body
+        assert outbox.query.filter_by(status="sent").count() == 4
+
+    def test_failed_send_is_retried_with_backoff(self, app, outbox, monkeypatch):
+        _queue(1)
+
+        def broken_send(self, message, envelope_from=None):
+            raise OSError("SMTP stalled")
+
+        monkeypatch.setattr(Connection, "send", broken_send)
+        stats = process_outbox()
+
+        row = outbox.query.one()
+        assert stats["failed"] == 1
+        assert row.status == "pending"
+        assert row.attempts == 1
+        assert row.last_error == "SMTP stalled"
+        assert row.next_attempt_at >= datetime.utcnow() + timedelta(
+            seconds=app.config["EMAIL_OUTBOX_BACKOFF"] - 5
+        )
+
+        # Not due yet, so a second pass leaves it alone
+        assert process_outbox()["failed"] == 0
+
+    def test_dead_letter_after_max_attempts(self, app, outbox, monkeypatch):
+        _queue(1)
+
+        def broken_send(self, message, envelope_from=None):
+            raise OSError("mailbox unavailable")
+
+        monkeypatch.setattr(Connection, "send", broken_send)
+        for _ in range(app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"]):
+            outbox.query.update({"next_attempt_at": datetime.utcnow()})
+            db.session.commit()
+            process_outbox()
+
+        row = outbox.query.one()
+        assert row.status == "dead"
+        assert row.attempts == app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"]
+
+
+class TestOutboxClaims:
+    """Concurrent drains and crashes must not send an email twice"""
+
+    def test_rows_claimed_elsewhere_are_skipped(self, outbox):
+        _queue(1, recipient="a@example.com")
+        _queue(1, recipient="b@example.com")
+        # Another worker is in the middle of sending b's email
+        outbox.query.filter_by(recipient="b@example.com").update(
+            {"status": "sending", "claim_token": "other", "claimed_at": datetime.utcnow()}
+        )
+        db.session.commit()
+
+        with mail.record_messages() as sent:
+            stats = process_outbox()
+        assert stats["sent"] == 1
+        assert [m.recipients for m in sent] == [["a@example.com"]]
+        assert outbox.query.filter_by(recipient="b@example.com").one().status == "sending"
+
+    def test_stale_claims_are_released(self, app, outbox):
+        _queue(1)
+        stale = datetime.utcnow() - timedelta(seconds=app.config["EMAIL_OUTBOX_CLAIM_TIMEOUT"] + 1)
+        outbox.query.update({"status": "sending", "claim_token": "dead-worker", "claimed_at": stale})
+        db.session.commit()
+
+        assert process_outbox()["sent"] == 1
+        assert outbox.query.one().status == "sent"
+
+    def test_each_message_is_committed_once_sent(self, outbox, monkeypatch):
+        _queue(1, recipient="a@example.com")
+        _queue(1, recipient="b@example.com")
+        original_send = Connection.send
+
+        def crash_on_b(self, message, envelope_from=None):
+            if message.recipients == ["b@example.com"]:
+                raise KeyboardInterrupt  # the process dies mid-batch
+            return original_send(self, message, envelope_from)
+
+        monkeypatch.setattr(Connection, "send", crash_on_b)
+        with pytest.raises(KeyboardInterrupt):
+            process_outbox()
+        db.session.rollback()
+
+        statuses = {row.recipient: row.status for row in outbox.query}
+        assert statuses == {"a@example.com": "sent", "b@example.com": "sending"}
+
+    def test_failed_commit_releases_the_rest_of_the_batch(self, outbox, monkeypatch):
+        _queue(1, recipient="a@example.com")
+        _queue(1, recipient="b@example.com")
+        _queue(1, recipient="c@example.com")
+        original_commit = db.session.commit
+        commits = []
+
+        def fail_second_message(*args, **kwargs):
+            commits.append(1)
+            if len(commits) == 3:  # the claim, message a, then message b
+                raise RuntimeError("database went away")
+            return original_commit(*args, **kwargs)
+
+        monkeypatch.setattr(db.session, "commit", fail_second_message)
+        with mail.record_messages():
+            stats = process_outbox()
+        monkeypatch.undo()
+
+        assert stats["sent"] == 1
+        assert stats["failed"] == 2
+        statuses = {row.recipient: row.status for row in outbox.query}
+        assert statuses == {"a@example.com": "sent", "b@example.com": "pending", "c@example.com": "pending"}
+        assert outbox.query.filter(outbox.claim_token.isnot(None)).count() == 0
+
+    def test_queue_email_does_not_start_a_worker(self, app, outbox, monkeypatch):
+        from app.utils import email
+
+        monkeypatch.setattr(app, "testing", False)
+        monkeypatch.setitem(app.config, "EMAIL_OUTBOX_WORKER", True)
+        monkeypatch.setattr(email, "start_outbox_worker", lambda app: pytest.fail("worker started"))
+        _queue(1)
+
+
+class TestOutboxSMTPDelivery:
+    """Deliver through a real SMTP session against a local aiosmtpd server"""
+
+    def test_one_connection_per_batch(self, app, outbox):
+        aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+        class Handler:
+            def __init__(self):
+                self.messages = []
+                self.sessions = set()
+
+            async def handle_DATA(self, server, session, envelope):
+                self.messages.append(envelope)
+                self.sessions.add(id(session))
+                return "250 OK"
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+
+        handler = Handler()
+        controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=port)
+        controller.start()
+        original_state = app.extensions["mail"]
+        app.extensions["mail"] = mail.init_mail({
+            "MAIL_SERVER": "127.0.0.1",
+            "MAIL_PORT": port,
+            "MAIL_SUPPRESS_SEND": False,
+        })
+        try:
+            for user in range(5):
+                _queue(2, recipient=f"user{user}@example.com")
+            stats = process_outbox()
+        finally:
+            app.extensions["mail"] = original_state
+            controller.stop()
+
+        assert stats["messages"] == 5
+        assert len(handler.messages) == 5
+        assert len(handler.sessions) == 1
@@ -0,0 +1,96 @@
+"""
+Tests for the cached user loader and the categories-initialized flag
+"""
+
+from flask import g
+
+from app import db
+from app.models import User
+from app.utils import identity_cache
+from app.utils.query_counter import QueryCounter
+
+
+def _user_queries(counter):
+    return [s for s in counter.statements if "FROM user" in s]
+
+
+def _get(client, url):
+    """GET with a fresh session and g, as in production (tests share one app context)"""
+    db.session.remove()
+    g.pop("_login_user", None)
+    response = client.get(url)
+    db.session.remove()
+    g.pop("_login_user", None)
+    return response
+
+
+class TestIdentityCache:
+    def test_repeat_requests_skip_user_query(self, auth_client):
+        _get(auth_client, "/api/auth/me")
+        with QueryCounter() as counter:
+            response = _get(auth_client, "/api/auth/me")
+        assert response.get_json()["user"]["username"] == "testuser"
+        assert counter.count == 0
+
+    def test_premium_change_is_visible_next_request(self, app, auth_client, test_user):
+        assert _get(auth_client, "/api/auth/me").get_json()["user"]["premium"] is False
+        with app.app_context():
+            db.session.get(User, test_user.id).premium = True
+            db.session.commit()
+        assert _get(auth_client, "/api/auth/me").get_json()["user"]["premium"] is True
+
+    def test_password_change_invalidates(self, app, auth_client, test_user):
+        _get(auth_client, "/api/auth/me")
+        with app.app_context():
+            db.session.get(User, test_user.id).set_password("NewPass456")
+            db.session.commit()
+        assert test_user.id not in identity_cache._users
+
+    def test_uncached_columns_load_on_access(self, app, auth_client, test_user):
+        _get(auth_client, "/api/auth/me")
+        with app.test_request_context():
+            user = identity_cache.load_user(test_user.id)
+            assert user.check_password("TestPass123")
+            user.chat_message_count = 7
+            db.session.commit()
+            db.session.remove()
+        with app.app_context():
+            assert db.session.get(User, test_user.id).chat_message_count == 7
+
+    def test_disabled_with_zero_ttl(self, app, auth_client, monkeypatch):
+        monkeypatch.setitem(app.config, "USER_CACHE_TTL", 0)
+        _get(auth_client, "/api/auth/me")
+        with QueryCounter() as counter:
+            _get(auth_client, "/api/auth/me")
+        assert len(_user_queries(counter)) == 1
+
+
+class TestCategoriesInitialized:
+    def test_listing_counts_categories_once(self, app, auth_client, test_user):
+        with QueryCounter() as first:
+            assert len(_get(auth_client, "/api/categories").get_json()["categories"]) == 8
+        with QueryCounter() as second:
+            _get(auth_client, "/api/categories")
+        assert any("count(" in s.lower() for s in first.statements)
+        assert not any("count(" in s.lower() for s in second.statements)
+        with app.app_context():
+            assert db.session.get(User, test_user.id).categories_initialized is True
+
+    def test_new_user_gets_defaults_seeded(self, app, client):
+        with app.app_context():
+            user = User(username="freshuser", email="fresh@example.com")
+            user.set_password("FreshPass123")
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        try:
+            client.post("/auth/login", data={"username": "freshuser", "password": "FreshPass123"})
+            slugs = {c["slug"] for c in _get(client, "/api/categories").get_json()["categories"]}
+            assert "other" in slugs and len(slugs) == 8
+        finally:
+            with app.app_context():
+                from app.models import Category
+
+                Category.query.filter_by(user_id=user_id).delete()
+                db.session.delete(db.session.get(User, user_id))
+                db.session.commit()
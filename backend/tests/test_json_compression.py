@@ -0,0 +1,119 @@
+"""
+orjson provider and response compression
+"""
+
+import gzip
+import json
+import zlib
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from flask import Response, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+from app import db
+from app.models import Expense
+from app.utils import json_provider
+from app.utils.compression import compress_response
+
+pytestmark = pytest.mark.skipif(json_provider.orjson is None, reason="orjson is not installed")
+
+
+class TestOrjsonProvider:
+    def test_installed(self, app):
+        assert isinstance(app.json, json_provider.OrjsonProvider)
+
+    def test_matches_flask_output(self, app):
+        payload = {
+            "b": [1, 2.5, None, True],
+            "a": {"date": datetime(2025, 3, 1, 8, 30), "amount": Decimal("12.50")},
+            "ids": {3: "x"},
+            "text": "Phở bò",
+        }
+        flask_json = DefaultJSONProvider(app)
+        with app.test_request_context():
+            ours = app.json.response(payload).get_data()
+            theirs = flask_json.response(payload).get_data()
+        assert json.loads(ours) == json.loads(theirs)
+        assert "Phở bò".encode() in ours  # UTF-8, not \\u escapes
+        assert json.loads(app.json.dumps(payload)) == json.loads(flask_json.dumps(payload))
+
+    def test_loads(self, app):
+        assert app.json.loads('{"a": [1, "đ"]}') == {"a": [1, "đ"]}
+
+    def test_unserializable(self, app):
+        with pytest.raises(TypeError):
+            app.json.dumps({"x": object()})
+
+
+class TestCompression:
+    def _respond(self, app, response, headers=None):
+        with app.test_request_context(headers=headers or {}):
+            return compress_response(app, response)
+
+    def test_large_json_is_gzipped(self, app):
+        payload = {"items": ["Cà phê sữa đá"] * 500}
+        with app.test_request_context():
+            response = jsonify(payload)
+        response = self._respond(app, response, {"Accept-Encoding": "gzip, deflate"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.vary
+        assert int(response.headers["Content-Length"]) == len(response.get_data())
+        assert json.loads(gzip.decompress(response.get_data())) == payload
+
+    def test_small_body_and_no_accept_encoding(self, app):
+        small = self._respond(app, Response('{"ok":true}', mimetype="application/json"), {"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in small.headers
+        assert "Accept-Encoding" in small.vary
+
+        big = self._respond(app, Response("x" * 5000, mimetype="application/json"))
+        assert "Content-Encoding" not in big.headers
+
+    def test_skipped_responses(self, app):
+        headers = {"Accept-Encoding": "gzip"}
+        html = self._respond(app, Response("x" * 5000, mimetype="text/html"), headers)
+        assert "Content-Encoding" not in html.headers
+        no_transform = Response("x" * 5000, mimetype="application/json", headers={"Cache-Control": "no-transform"})
+        assert "Content-Encoding" not in self._respond(app, no_transform, headers).headers
+
+    def test_streamed_response(self, app):
+        chunks = [f"{i},Phở,{i * 1000}\n" for i in range(2000)]
+        response = Response(iter(chunks), mimetype="text/csv")
+        response = self._respond(app, response, {"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Content-Length" not in response.headers
+        body = b"".join(response.response)
+        assert zlib.decompress(body, 31).decode() == "".join(chunks)
+
+    def test_end_to_end(self, app, auth_client, test_user, monkeypatch):
+        monkeypatch.setitem(app.config, "COMPRESS_MIN_SIZE", 200)
+        wallet = test_user.get_default_wallet()
+        db.session.add_all([
+            Expense(amount=1000 * i, category="food", description="Phở", date=datetime.now(),
+                    user_id=test_user.id, wallet_id=wallet.id)
+            for i in range(1, 20)
+        ])
+        db.session.commit()
+
+        response = auth_client.get("/api/expenses", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert len(json.loads(gzip.decompress(response.data))["expenses"]) == 19
+
+        # 304s stay empty and keep their validators
+        etag = response.headers["ETag"]
+        again = auth_client.get("/api/expenses", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert again.status_code == 304
+        assert "Content-Encoding" not in again.headers
+        assert again.headers["ETag"] == etag
+
+        export = auth_client.get("/api/expenses/export", headers={"Accept-Encoding": "gzip"})
+        assert export.headers["Content-Encoding"] == "gzip"
+        lines = gzip.decompress(export.data).decode().splitlines()
+        assert lines[0].startswith("id,amount") and len(lines) == 20
+
+    def test_mimetype_filter(self, app, auth_client, monkeypatch):
+        monkeypatch.setitem(app.config, "COMPRESS_MIN_SIZE", 0)
+        assert auth_client.get("/api/wallets", headers={"Accept-Encoding": "gzip"}).headers["Content-Encoding"]
+        monkeypatch.setitem(app.config, "COMPRESS_MIMETYPES", ())
+        assert "Content-Encoding" not in auth_client.get("/api/wallets", headers={"Accept-Encoding": "gzip"}).headers
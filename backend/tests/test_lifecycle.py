@@ -0,0 +1,65 @@
+"""
+Tests for graceful shutdown: readiness endpoint and chat-stream draining
+"""
+
+import threading
+import time
+
+import pytest
+from app import socketio
+from app.utils import lifecycle
+
+
+@pytest.fixture(autouse=True)
+def reset_lifecycle():
+    yield
+    lifecycle.reset()
+
+
+class TestHealthz:
+    def test_ok_while_serving(self, client):
+        response = client.get("/healthz")
+        assert response.status_code == 200
+        assert response.get_json() == {"status": "ok", "active_streams": 0}
+
+    def test_unavailable_while_draining(self, client):
+        assert lifecycle.drain(timeout=0)
+        response = client.get("/healthz")
+        assert response.status_code == 503
+        assert response.get_json()["status"] == "draining"
+
+
+class TestDrain:
+    def test_waits_for_running_streams(self):
+        release = threading.Event()
+
+        def stream():
+            with lifecycle.track_stream():
+                release.wait(5)
+
+        worker = threading.Thread(target=stream)
+        worker.start()
+        while lifecycle.active_streams() == 0:
+            time.sleep(0.001)
+        threading.Timer(0.05, release.set).start()
+
+        started = time.monotonic()
+        assert lifecycle.drain(timeout=5)
+        assert time.monotonic() - started < 5
+        assert lifecycle.active_streams() == 0
+        worker.join()
+
+    def test_gives_up_after_timeout(self):
+        with lifecycle.track_stream():
+            assert not lifecycle.drain(timeout=0.05)
+            assert lifecycle.is_draining()
+
+    def test_chat_refused_while_draining(self, app, auth_client):
+        chat = socketio.test_client(app, namespace="/chat", flask_test_client=auth_client)
+        chat.get_received("/chat")
+        lifecycle.drain(timeout=0)
+        chat.emit("message", {"message": "Xin chào"}, namespace="/chat")
+        received = chat.get_received("/chat")
+        chat.disconnect("/chat")
+        assert [e["name"] for e in received] == ["error"]
+        assert "khởi động lại" in received[0]["args"][0]["data"]
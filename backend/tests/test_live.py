@@ -0,0 +1,88 @@
+"""
+Tests for the /live real-time update namespace
+"""
+
+import pytest
+from datetime import datetime
+from app import db, socketio
+from app.models import Budget, Expense, Wallet
+from app.utils.live import LIVE_NAMESPACE
+from app.utils.notifications import NotificationManager
+
+
+@pytest.fixture
+def live_client(app, auth_client):
+    """Socket.IO client connected to /live with the logged-in session"""
+    client = socketio.test_client(app, namespace=LIVE_NAMESPACE, flask_test_client=auth_client)
+    assert client.is_connected(LIVE_NAMESPACE)
+    client.get_received(LIVE_NAMESPACE)  # Drop the 'connected' ack
+    yield client
+    if client.is_connected(LIVE_NAMESPACE):
+        client.disconnect(LIVE_NAMESPACE)
+
+
+def _events(client, name):
+    return [e["args"][0] for e in client.get_received(LIVE_NAMESPACE) if e["name"] == name]
+
+
+class TestLiveUpdates:
+    """Test that committed writes are pushed to the owner's room"""
+
+    def test_anonymous_connection_rejected(self, app, client):
+        anonymous = socketio.test_client(app, namespace=LIVE_NAMESPACE, flask_test_client=client)
+        assert not anonymous.is_connected(LIVE_NAMESPACE)
+
+    def test_notification_created_is_pushed(self, live_client, test_user):
+        NotificationManager.create_notification(test_user.id, "budget_alert", "Sắp hết ngân sách")
+
+        events = _events(live_client, "notification.created")
+        assert len(events) == 1
+        assert events[0]["message"] == "Sắp hết ngân sách"
+        assert events[0]["is_read"] is False
+
+    def test_wallet_balance_change_is_pushed(self, live_client, test_user):
+        wallet = Wallet.query.filter_by(user_id=test_user.id).first()
+        wallet.update_balance(50000, is_expense=True)
+
+        events = _events(live_client, "wallet.balance_changed")
+        assert events == [{
+            "wallet_id": wallet.id,
+            "balance": 950000,
+            "previous_balance": 1000000,
+        }]
+
+    def test_rollback_discards_events(self, live_client, test_user):
+        wallet = Wallet.query.filter_by(user_id=test_user.id).first()
+        wallet.balance = 1
+        db.session.flush()
+        db.session.rollback()
+
+        assert _events(live_client, "wallet.balance_changed") == []
+
+    def test_budget_threshold_crossing_is_pushed_once(self, live_client, test_user):
+        now = datetime.utcnow()
+        wallet = Wallet.query.filter_by(user_id=test_user.id).first()
+        db.session.add(Budget(
+            category="food", amount=100000, month=now.month, year=now.year, user_id=test_user.id
+        ))
+        db.session.commit()
+
+        def spend(amount):
+            db.session.add(Expense(
+                amount=amount, category="food", date=now, user_id=test_user.id, wallet_id=wallet.id
+            ))
+            db.session.commit()
+
+        spend(50000)
+        assert _events(live_client, "budget.threshold_crossed") == []
+
+        spend(45000)  # 95%: crosses 90
+        events = _events(live_client, "budget.threshold_crossed")
+        assert [e["threshold"] for e in events] == [90]
+        assert events[0]["percentage"] == 95.0
+
+        spend(1000)  # 96%: no new threshold
+        assert _events(live_client, "budget.threshold_crossed") == []
+
+        spend(10000)  # 106%: crosses 100
+        assert [e["threshold"] for e in _events(live_client, "budget.threshold_crossed")] == [100]
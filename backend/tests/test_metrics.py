@@ -0,0 +1,102 @@
+"""
+Tests for app-wide request metrics and the /metrics endpoint
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy.exc import DBAPIError
+
+from app import db
+from app.utils.metrics import (
+    IN_FLIGHT,
+    REQUEST_COUNT,
+    REQUEST_DB_QUERIES,
+    REQUEST_LATENCY,
+    MODEL_LATENCY,
+    Histogram,
+    init_metrics,
+    model_call_timer,
+)
+
+
+class TestRequestMetrics:
+    """Test per-route latency, status counts and DB query tracking"""
+
+    def test_status_codes_are_counted_per_route(self, auth_client):
+        before_ok = REQUEST_COUNT.get(method="GET", endpoint="/api/wallets", status=200)
+        before_missing = REQUEST_COUNT.get(method="GET", endpoint="<unmatched>", status=404)
+
+        auth_client.get('/api/wallets')
+        auth_client.get('/api/no-such-route')
+
+        assert REQUEST_COUNT.get(method="GET", endpoint="/api/wallets", status=200) == before_ok + 1
+        assert REQUEST_COUNT.get(
+            method="GET", endpoint="<unmatched>", status=404
+        ) == before_missing + 1
+        assert REQUEST_LATENCY.count(method="GET", endpoint="/api/wallets") >= 1
+        assert IN_FLIGHT.get() == 0
+
+    def test_db_queries_recorded_per_request(self, auth_client):
+        before = REQUEST_DB_QUERIES.count(endpoint="/api/wallets")
+        auth_client.get('/api/wallets')
+        assert REQUEST_DB_QUERIES.count(endpoint="/api/wallets") == before + 1
+
+        state = REQUEST_DB_QUERIES._values[("/api/wallets",)]
+        assert state[1] > 0  # at least the user and wallet lookups
+
+    def test_metrics_endpoint_renders_prometheus_text(self, auth_client):
+        auth_client.get('/api/wallets')
+        response = auth_client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        body = response.get_data(as_text=True)
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        assert 'http_requests_total{method="GET",endpoint="/api/wallets",status="200"}' in body
+        assert "http_request_db_queries_bucket" in body
+
+    def test_metrics_token_required_when_configured(self, app, client):
+        app.config["METRICS_TOKEN"] = "secret"
+        try:
+            assert client.get('/metrics').status_code == 401
+            response = client.get('/metrics', headers={"Authorization": "Bearer secret"})
+            assert response.status_code == 200
+        finally:
+            app.config["METRICS_TOKEN"] = None
+
+    def test_metrics_not_served_without_required_token(self):
+        for token, served in ((None, False), ("secret", True)):
+            app = Flask(__name__)
+            app.config.update(METRICS_REQUIRE_TOKEN=True, METRICS_TOKEN=token)
+            init_metrics(app)
+            assert ("metrics" in app.view_functions) is served
+
+    def test_failed_statement_leaves_no_timer_behind(self, app):
+        with db.engine.connect() as conn:
+            with pytest.raises(DBAPIError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+            conn.rollback()
+            conn.exec_driver_sql("SELECT 1")
+            assert not conn.info.get("query_start_time")
+
+
+class TestMetricPrimitives:
+    """Test histogram buckets and the model call timer"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("test_seconds", "Test", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        lines = histogram.render()
+        assert 'test_seconds_bucket{le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{le="1.0"} 2' in lines
+        assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+        assert "test_seconds_count 3" in lines
+
+    def test_model_call_timer_records_errors(self):
+        before = MODEL_LATENCY.count(operation="test_call", status="error")
+        with pytest.raises(RuntimeError):
+            with model_call_timer("test_call"):
+                raise RuntimeError("quota exceeded")
+        assert MODEL_LATENCY.count(operation="test_call", status="error") == before + 1
@@ -0,0 +1,125 @@
+"""
+Tests for the pluggable model backend and the offline fake backend
+"""
+
+import random
+import pytest
+from app import socketio
+from app.ai_engine.core import model_manager as model_manager_module
+from app.ai_engine.core.backends import (
+    FAKE_RESPONSES, FakeBackend, ModelBackend, ModelRateLimitError, ModelServerError,
+    ModelTimeoutError, parse_latency,
+)
+from app.ai_engine.core.model_manager import model_manager
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Route all model calls to an instant fake backend"""
+    monkeypatch.setattr(model_manager_module.time, "sleep", lambda seconds: None)
+    backend = FakeBackend(latency=0, chunk_count=5, chunk_delay=0, seed=1)
+    model_manager.reset()
+    model_manager.use_backend(backend)
+    yield backend
+    model_manager.reset()
+
+
+class TestFakeBackend:
+    """Test latency sampling, chunking and error injection"""
+
+    @pytest.mark.parametrize("spec", [0.2, "0.2", "fixed:0.2"])
+    def test_fixed_latency(self, spec):
+        assert parse_latency(spec)(random.Random(0)) == 0.2
+
+    def test_distribution_latency_is_seeded(self):
+        sampler = parse_latency("lognormal:-2,0.5")
+        first = [sampler(random.Random(7)) for _ in range(3)]
+        assert first == [sampler(random.Random(7)) for _ in range(3)]
+        assert all(0.0 <= parse_latency("uniform:0.1,0.3")(random.Random(i)) <= 0.3 for i in range(20))
+
+    def test_invalid_latency_spec(self):
+        with pytest.raises(ValueError):
+            parse_latency("gamma:1,2")
+
+    def test_stream_cadence(self):
+        backend = FakeBackend(latency=0, chunk_count=4, chunk_delay=0)
+        chunks = list(backend.stream("Xin chào", {}, timeout=5))
+        assert len(chunks) == 4
+        assert "".join(chunks) == FAKE_RESPONSES["chat"]
+
+    @pytest.mark.parametrize("option, error", [
+        ("rate_limit_rate", ModelRateLimitError),
+        ("server_error_rate", ModelServerError),
+    ])
+    def test_error_injection(self, option, error):
+        backend = FakeBackend(latency=0, **{option: 1.0})
+        with pytest.raises(error) as exc_info:
+            backend.generate("Xin chào", {}, timeout=5)
+        assert exc_info.value.status_code in (429, 503)
+
+    def test_slow_call_times_out(self):
+        backend = FakeBackend(latency=0.05)
+        with pytest.raises(ModelTimeoutError):
+            backend.generate("Xin chào", {}, timeout=0.01)
+
+    def test_empty_response_streams_nothing(self):
+        backend = FakeBackend(latency=0, responses={"chat": ""})
+        assert list(backend.stream("Xin chào", {}, timeout=5)) == []
+
+    def test_backend_interface_is_abstract(self):
+        with pytest.raises(TypeError):
+            ModelBackend()
+
+    def test_canned_response_override(self):
+        backend = FakeBackend(latency=0, responses={"chat": "Đã ghi nhận."})
+        assert backend.generate("Xin chào", {}, timeout=5) == "Đã ghi nhận."
+
+
+class TestModelManagerWithFakeBackend:
+    """Test that features run end to end against the fake backend"""
+
+    def test_generate_retries_rate_limits(self, fake_model):
+        fake_model.rate_limit_rate = 1.0
+        with pytest.raises(ModelRateLimitError):
+            model_manager.generate_content("Xin chào")
+        assert fake_model.calls == 3
+
+    def test_recommendations_parse_canned_json(self, fake_model):
+        from app.ai_engine.features.analysis import ExpenseAnalyzer
+
+        expenses = [
+            {"date": "2025-01-01", "category": "ăn uống", "amount": 50000},
+            {"date": "2025-01-02", "category": "di chuyển", "amount": 30000},
+        ]
+        assert len(ExpenseAnalyzer().get_recommendations(expenses)) == 3
+
+    def test_invoice_extraction_uses_backend(self, app, fake_model):
+        from app.utils.ai_invoice_extractor import AIInvoiceExtractor
+
+        with app.app_context():
+            result = AIInvoiceExtractor().extract_from_image(b"\x89PNG\r\n\x1a\n fake image")
+        assert result["amount"] == 185000
+        assert result["merchant"] == "Cơm Tấm Sài Gòn"
+        assert result["date"] == "2025-01-15"
+
+    def test_invoice_extraction_is_not_retried(self, app, fake_model):
+        from app.utils.ai_invoice_extractor import AIInvoiceExtractor
+
+        fake_model.rate_limit_rate = 1.0
+        with app.app_context():
+            AIInvoiceExtractor().extract_from_image(b"\x89PNG\r\n\x1a\n fake image")
+        assert fake_model.calls == 1
+
+    def test_chat_streams_over_socket(self, app, auth_client, fake_model):
+        from app.ai_engine.features.chat import AIChat
+
+        app.ai_chat = AIChat()
+        try:
+            chat = socketio.test_client(app, namespace="/chat", flask_test_client=auth_client)
+            chat.get_received("/chat")
+            chat.emit("message", {"message": "Tháng này tôi tiêu bao nhiêu?"}, namespace="/chat")
+            responses = [e for e in chat.get_received("/chat") if e["name"] == "response"]
+            chat.disconnect("/chat")
+        finally:
+            del app.ai_chat
+        assert responses[0]["args"][0]["data"] == FAKE_RESPONSES["chat"]
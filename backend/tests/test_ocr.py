@@ -0,0 +1,162 @@
+"""
+Tests for the receipt OCR pipeline (preprocessing, variant voting, batch API)
+"""
+
+import io
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from app.utils import ocr as ocr_module  # noqa: E402
+from app.utils.ocr import ReceiptOCR, decode_image, deskew, estimate_skew  # noqa: E402
+
+RECEIPT_TEXT = "CUA HANG MINH ANH\nNgay: 15/01/2025 12:30\nVAT: 15.000\nTOTAL: 185.000 VND\n"
+
+
+def _text_image(width=900, lines=30):
+    img = np.full((lines * 40 + 40, width), 255, np.uint8)
+    for i in range(lines):
+        cv2.putText(img, f"ITEM {i:02d}  Com tam suon  85.000", (40, 40 + i * 40),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, 0, 2)
+    return img
+
+
+def _jpeg(img):
+    ok, buffer = cv2.imencode(".jpg", img)
+    assert ok
+    return buffer.tobytes()
+
+
+class TestPreprocessing:
+    def test_large_photo_is_downscaled(self):
+        photo = cv2.resize(_text_image(), (3000, 4000))
+        gray = decode_image(_jpeg(photo), target_width=1000)
+        assert gray.ndim == 2
+        assert gray.shape[1] == 1000
+
+    def test_small_image_is_kept(self):
+        gray = decode_image(_jpeg(_text_image(width=600)), target_width=1000)
+        assert gray.shape[1] == 600
+
+    def test_undecodable_bytes(self):
+        assert decode_image(b"not an image") is None
+
+    @pytest.mark.parametrize("angle", [-6, -2.5, 0, 4])
+    def test_skew_is_estimated(self, angle):
+        rotated = ocr_module._rotate(_text_image(), angle)
+        assert estimate_skew(rotated) == pytest.approx(-angle, abs=0.5)
+
+    def test_straight_image_is_not_rotated(self):
+        img = _text_image()
+        straightened, angle = deskew(img)
+        assert straightened is img
+        assert angle == 0
+
+
+class TestVariantVoting:
+    def test_best_extraction_wins(self):
+        result = ReceiptOCR(workers=0)._pick_best([
+            {"variant": "adaptive", "text": "CUA HANG MINH ANH\nTOTAL: 185.000"},
+            {"variant": "otsu", "text": RECEIPT_TEXT},
+            {"variant": "gray", "text": "   "},
+        ])
+        assert result["variant"] == "otsu"
+        assert result["amount"] == 185000
+        assert result["date"].day == 15
+
+    def test_tie_keeps_first_variant(self):
+        result = ReceiptOCR(workers=0)._pick_best([
+            {"variant": "adaptive", "text": RECEIPT_TEXT},
+            {"variant": "otsu", "text": RECEIPT_TEXT},
+        ])
+        assert result["variant"] == "adaptive"
+
+    def test_missing_tesseract_is_reported(self):
+        result = ReceiptOCR(workers=0)._pick_best([{"variant": "adaptive", "error": "not_found"}])
+        assert "Tesseract OCR not found" in result["error"]
+
+
+class TestBatchEndpoint:
+    @pytest.fixture
+    def inline_ocr(self, app, monkeypatch):
+        calls = []
+
+        def fake_ocr(gray, variant, tesseract_config):
+            calls.append(variant)
+            return {"variant": variant, "text": RECEIPT_TEXT if variant == "otsu" else ""}
+
+        monkeypatch.setattr(ocr_module, "_ocr_variant", fake_ocr)
+        app.extensions["receipt_ocr"] = ReceiptOCR(workers=0)
+        yield calls
+        del app.extensions["receipt_ocr"]
+
+    def test_batch(self, auth_client, inline_ocr):
+        image = _jpeg(_text_image())
+        response = auth_client.post("/api/process_receipts", data={"receipts": [
+            (io.BytesIO(image), "a.jpg"),
+            (io.BytesIO(b"garbage"), "b.png"),
+            (io.BytesIO(b"%PDF"), "c.pdf"),
+        ]}, content_type="multipart/form-data")
+
+        assert response.status_code == 200
+        first, second, third = response.get_json()["results"]
+        assert first["success"] and first["amount"] == 185000
+        assert first["date"].startswith("2025-01-15")
+        assert not second["success"] and "decode" in second["error"]
+        assert not third["success"]
+        assert inline_ocr == ["adaptive", "otsu", "gray"]
+
+    def test_cache_hit_in_batch(self, app, auth_client, inline_ocr, monkeypatch):
+        monkeypatch.setitem(app.config, "RECEIPT_CACHE_ENABLED", True)
+        image = _jpeg(_text_image())
+
+        def post():
+            return auth_client.post("/api/process_receipts", data={"receipts": [(io.BytesIO(image), "a.jpg")]},
+                                    content_type="multipart/form-data")
+
+        first = post().get_json()["results"][0]
+        response = post()
+        assert response.status_code == 200
+        second = response.get_json()["results"][0]
+        assert not first["cached"] and second["cached"]
+        assert second["date"] == first["date"]
+        assert second["amount"] == 185000
+        assert inline_ocr == ["adaptive", "otsu", "gray"]  # OCR ran once
+
+    def test_one_bad_image_does_not_fail_the_batch(self, auth_client, inline_ocr, monkeypatch):
+        original_deskew = ocr_module.deskew
+        calls = []
+
+        def deskew_once_broken(gray):
+            calls.append(1)
+            if len(calls) == 1:
+                raise cv2.error("corrupt image")
+            return original_deskew(gray)
+
+        monkeypatch.setattr(ocr_module, "deskew", deskew_once_broken)
+        image = _jpeg(_text_image())
+        response = auth_client.post("/api/process_receipts", data={"receipts": [
+            (io.BytesIO(image), "a.jpg"),
+            (io.BytesIO(image), "b.jpg"),
+        ]}, content_type="multipart/form-data")
+
+        assert response.status_code == 200
+        first, second = response.get_json()["results"]
+        assert not first["success"] and "corrupt image" in first["error"]
+        assert second["success"] and second["amount"] == 185000
+
+    def test_empty_variant_list_is_rejected(self):
+        with pytest.raises(ValueError):
+            ReceiptOCR.from_config({"OCR_VARIANTS": " , "})
+
+    def test_batch_size_limit(self, app, auth_client, inline_ocr):
+        files = [(io.BytesIO(b"x"), f"{i}.jpg") for i in range(app.config["OCR_BATCH_MAX_FILES"] + 1)]
+        response = auth_client.post("/api/process_receipts", data={"receipts": files},
+                                    content_type="multipart/form-data")
+        assert response.status_code == 400
+
+    def test_requires_files(self, auth_client):
+        response = auth_client.post("/api/process_receipts", data={}, content_type="multipart/form-data")
+        assert response.status_code == 400
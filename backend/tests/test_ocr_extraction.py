@@ -0,0 +1,68 @@
+"""
+Tests for receipt field extraction from OCR text (single-pass scanner)
+"""
+
+import json
+import os
+
+from app.utils.ocr import ReceiptOCR, scan
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "ocr_corpus.json")
+
+with open(CORPUS, encoding="utf-8") as f:
+    ENTRIES = json.load(f)
+
+
+def _fields(text):
+    fields = ReceiptOCR(workers=0).extract_fields(text)
+    fields["date"] = fields["date"].isoformat() if fields["date"] else None
+    return fields
+
+
+class TestCorpusRegression:
+    """Results must stay identical to the per-pattern findall/search extractor"""
+
+    def test_matches_frozen_results(self):
+        mismatched = [i for i, entry in enumerate(ENTRIES) if _fields(entry["text"]) != entry["expected"]]
+        assert mismatched == []
+
+    def test_corpus_covers_every_field(self):
+        for field in ("amount", "date", "fee", "note"):
+            assert any(e["expected"][field] is not None for e in ENTRIES)
+            assert any(e["expected"][field] is None for e in ENTRIES)
+
+
+class TestScanner:
+    TEXT = (
+        "Đơn vị bán: Highlands Coffee\n"
+        "Ngày 15/03/2025 18:42\n"
+        "VAT: 8.000 đ\n"
+        "Tổng cộng: 108.000 VND\n"
+        "Thanh toán: 108.000\n"
+    )
+
+    def test_candidates_carry_positions_and_confidence(self):
+        candidates = scan(self.TEXT)
+        amounts = candidates[("amount", 0)]
+        assert [c.value.strip() for c in amounts] == ["108.000", "108.000"]
+        assert all(self.TEXT[c.start:c.end].lower() == c.match.group(0) for c in amounts)
+        # The currency suffix backs up the first total
+        assert amounts[0].confidence > amounts[1].confidence
+        date = candidates[("date", 0)][0]
+        assert self.TEXT[date.start:date.end] == "15/03/2025 18:42"
+        assert date.confidence == 0.9
+
+    def test_extract_fields(self):
+        fields = ReceiptOCR(workers=0).extract_fields(self.TEXT)
+        assert fields["amount"] == 108000.0
+        assert fields["fee"] == 8000.0
+        assert fields["date"].isoformat() == "2025-03-15T18:42:00"
+        assert fields["note"] == "highlands coffee"
+
+    def test_text_whose_length_changes_when_lowercased(self):
+        # "İ".lower() is two characters, so offsets differ between the texts
+        text = "İNVOICE #4521\nTOTAL: 250.000\nNgày 01/02/2025"
+        fields = _fields(text)
+        assert fields["amount"] == 250000.0
+        assert fields["date"] == "2025-02-01T00:00:00"
+        assert fields["note"] == "Mã HĐ: 4521"
@@ -0,0 +1,108 @@
+"""
+Password hashing: schemes, rehash on login, bounded verification
+"""
+
+import pytest
+from flask import g
+
+from app import db
+from app.models import User
+from app.utils.passwords import PasswordHashers, create_hasher, run_bounded
+
+CHEAP = {
+    "PASSWORD_SCRYPT_N": 1024,
+    "PASSWORD_PBKDF2_ITERATIONS": 1000,
+    "PASSWORD_BCRYPT_ROUNDS": 4,
+    "PASSWORD_ARGON2_TIME_COST": 1,
+    "PASSWORD_ARGON2_MEMORY_COST": 1024,
+    "PASSWORD_ARGON2_PARALLELISM": 1,
+}
+
+
+def _hasher(scheme, **overrides):
+    try:
+        return create_hasher(scheme, {**CHEAP, **overrides})
+    except ImportError:
+        pytest.skip(f"{scheme} is not installed")
+
+
+@pytest.mark.parametrize("scheme", ["scrypt", "pbkdf2", "bcrypt", "argon2"])
+def test_roundtrip(scheme):
+    hasher = _hasher(scheme)
+    stored = hasher.hash("Mật khẩu 123")
+    assert hasher.identify(stored)
+    assert hasher.verify(stored, "Mật khẩu 123")
+    assert not hasher.verify(stored, "Mật khẩu 124")
+    assert not hasher.needs_rehash(stored)
+
+
+def test_needs_rehash_when_cost_changes():
+    stored = _hasher("scrypt").hash("secret")
+    assert _hasher("scrypt", PASSWORD_SCRYPT_N=2048).needs_rehash(stored)
+    stored = _hasher("bcrypt").hash("secret")
+    assert _hasher("bcrypt", PASSWORD_BCRYPT_ROUNDS=5).needs_rehash(stored)
+
+
+def test_bcrypt_long_password():
+    hasher = _hasher("bcrypt")
+    password = "x" * 100
+    assert hasher.verify(hasher.hash(password), password)
+
+
+def test_verify_reports_other_scheme():
+    hashers = PasswordHashers("scrypt", CHEAP)
+    stored = _hasher("pbkdf2").hash("secret")
+    assert hashers.verify(stored, "secret") == (True, True)
+    assert hashers.verify(stored, "wrong") == (False, False)
+    assert hashers.verify(hashers.hash("secret"), "secret") == (True, False)
+
+
+def test_verify_unknown_format():
+    hashers = PasswordHashers("scrypt", CHEAP)
+    assert hashers.verify("plaintext", "plaintext") == (False, False)
+    assert hashers.verify(None, "secret") == (False, False)
+
+
+def test_run_bounded():
+    assert run_bounded(sum, [1, 2, 3]) == 6
+
+
+def _login(client, password):
+    response = client.post("/auth/login", json={"username": "testuser", "password": password})
+    g.pop("_login_user", None)  # tests share one app context
+    return response
+
+
+def test_login_rehashes_old_hash(app, client, test_user):
+    test_user.password_hash = _hasher("pbkdf2").hash("TestPass123")
+    db.session.commit()
+
+    response = _login(client, "TestPass123")
+    assert response.status_code == 200
+    db.session.rollback()  # only what the login route committed remains
+    user = db.session.get(User, test_user.id)
+    assert user.password_hash.startswith("scrypt:1024:8:1$")
+    assert user.check_password("TestPass123")
+
+
+def test_failed_login_keeps_hash(app, client, test_user):
+    old = _hasher("pbkdf2").hash("TestPass123")
+    test_user.password_hash = old
+    db.session.commit()
+
+    response = _login(client, "wrong")
+    assert response.status_code == 401
+    assert db.session.get(User, test_user.id).password_hash == old
+
+
+def test_check_password_does_not_commit(app, test_user):
+    old = _hasher("pbkdf2").hash("TestPass123")
+    test_user.password_hash = old
+    db.session.commit()
+
+    test_user.email = "pending@example.com"  # a caller's unsaved change
+    assert test_user.check_password("TestPass123")
+    assert test_user.password_hash != old
+    db.session.rollback()
+    assert test_user.email == "test@example.com"
+    assert test_user.password_hash == old
@@ -0,0 +1,92 @@
+"""
+Tests for the sampling request profiler and its admin view
+"""
+
+import cProfile
+import pytest
+from app import db
+from app.models import User
+from app.utils.profiler import ProfileStore
+
+
+@pytest.fixture
+def profile_dir(app, tmp_path):
+    original = app.config["PROFILER_DIR"], app.config["PROFILER_SAMPLE_RATE"]
+    app.config["PROFILER_DIR"] = str(tmp_path)
+    yield tmp_path
+    app.config["PROFILER_DIR"], app.config["PROFILER_SAMPLE_RATE"] = original
+
+
+@pytest.fixture
+def admin_client(app, client):
+    admin = User(username='admin', email='admin@example.com')
+    admin.set_password('AdminPass123')
+    db.session.add(admin)
+    db.session.commit()
+    with client:
+        client.post('/auth/login', data={'username': 'admin', 'password': 'AdminPass123'})
+        yield client
+    db.session.delete(admin)
+    db.session.commit()
+
+
+def _profile():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    sum(range(100))
+    profiler.disable()
+    return profiler
+
+
+class TestProfileStore:
+    """Test the bounded on-disk ring buffer"""
+
+    def test_oldest_profiles_are_evicted(self, tmp_path):
+        store = ProfileStore(str(tmp_path), max_profiles=3)
+        ids = [store.save(_profile(), {"route": f"/r{i}"}) for i in range(5)]
+
+        listed = [p["id"] for p in store.list()]
+        assert listed == list(reversed(ids[2:]))
+        assert len(list(tmp_path.iterdir())) == 6  # .prof + .json each
+        assert "function calls" in store.summary(ids[-1])
+
+    def test_rejects_path_traversal(self, tmp_path):
+        store = ProfileStore(str(tmp_path))
+        assert store.get("../../config") is None
+        assert store.stats_path("../secret") is None
+
+
+class TestRequestProfiling:
+    """Test sampling, the admin header and the admin view"""
+
+    def test_sampled_request_is_stored_with_metadata(self, app, auth_client, profile_dir):
+        app.config["PROFILER_SAMPLE_RATE"] = 1.0
+        response = auth_client.get('/api/wallets')
+        app.config["PROFILER_SAMPLE_RATE"] = 0.0
+
+        profile_id = response.headers["X-Profile-Id"]
+        meta = ProfileStore(str(profile_dir)).get(profile_id)
+        assert meta["route"] == "/api/wallets"
+        assert meta["status"] == 200
+        assert meta["db_queries"] >= 1
+        assert meta["model_calls"] == []
+
+    def test_profile_header_ignored_for_regular_users(self, auth_client, profile_dir):
+        response = auth_client.get('/api/wallets', headers={"X-Profile": "1"})
+        assert "X-Profile-Id" not in response.headers
+        assert list(profile_dir.iterdir()) == []
+
+    def test_admin_can_profile_list_and_download(self, admin_client, profile_dir):
+        response = admin_client.get('/api/notifications', headers={"X-Profile": "1"})
+        profile_id = response.headers["X-Profile-Id"]
+
+        listing = admin_client.get('/admin/profiles/')
+        assert listing.status_code == 200
+        assert profile_id in listing.get_data(as_text=True)
+
+        detail = admin_client.get(f'/admin/profiles/{profile_id}')
+        assert "cumulative" in detail.get_data(as_text=True)
+
+        download = admin_client.get(f'/admin/profiles/{profile_id}/download')
+        assert download.status_code == 200
+        assert download.headers["Content-Disposition"].endswith(f"{profile_id}.prof")
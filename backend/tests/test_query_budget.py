@@ -0,0 +1,141 @@
+"""
+Query budgets for listing endpoints (N+1 regression tests)
+"""
+
+import logging
+from datetime import datetime
+from app import db
+from app.models import Expense, ExpenseSplit, SplitGroup, SplitMember, User, Wallet
+from app.utils.query_counter import QueryCounter, statement_shape
+
+
+def _make_groups(user, count, members_per_group=3):
+    groups = []
+    for i in range(count):
+        group = SplitGroup(name=f"Nhóm {i}", created_by=user.id)
+        group.members = [
+            SplitMember(name=f"Thành viên {j}", is_user=False)
+            for j in range(members_per_group)
+        ]
+        db.session.add(group)
+        groups.append(group)
+    db.session.commit()
+    return groups
+
+
+def _make_splits(user, groups, per_group=2):
+    wallet = Wallet.query.filter_by(user_id=user.id).first()
+    for group in groups:
+        for member in group.members[:per_group]:
+            expense = Expense(
+                amount=300000, category="food", description=f"Ăn tối {group.name}",
+                date=datetime.utcnow(), user_id=user.id, wallet_id=wallet.id,
+            )
+            db.session.add(expense)
+            db.session.flush()
+            db.session.add(ExpenseSplit(expense_id=expense.id, member_id=member.id, amount=100000))
+    db.session.commit()
+
+
+def _queries(client, url):
+    with QueryCounter() as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    return counter.count
+
+
+class TestSplitQueryBudget:
+    """Listing queries must not grow with the number of rows"""
+
+    def test_groups_listing_is_constant(self, auth_client, test_user, assert_max_queries):
+        _make_groups(test_user, 1)
+        few = _queries(auth_client, '/api/splits/groups')
+
+        _make_groups(test_user, 6)
+        with assert_max_queries(few):
+            response = auth_client.get('/api/splits/groups')
+        assert len(response.get_json()['groups']) == 7
+
+    def test_owed_listing_is_constant(self, auth_client, test_user, assert_max_queries):
+        _make_splits(test_user, _make_groups(test_user, 1))
+        few = _queries(auth_client, '/api/splits/owed')
+
+        _make_splits(test_user, _make_groups(test_user, 5))
+        with assert_max_queries(few):
+            response = auth_client.get('/api/splits/owed')
+        assert len(response.get_json()['details']) == 12
+
+    def test_owed_queries_do_not_grow_with_splits(self, auth_client, test_user, assert_max_queries):
+        _make_splits(test_user, _make_groups(test_user, 40), per_group=3)
+        auth_client.get('/api/splits/owed')
+        # user, totals, page of splits, their groups
+        with assert_max_queries(4):
+            response = auth_client.get('/api/splits/owed?per_page=25&page=2')
+        data = response.get_json()
+        assert data['total_owed'] == 120 * 100000
+        assert len(data['details']) == 25
+        assert data['pagination'] == {'page': 2, 'per_page': 25, 'total': 120, 'pages': 5}
+        assert len(auth_client.get('/api/splits/owed?per_page=25&page=5').get_json()['details']) == 20
+
+        with assert_max_queries(2):
+            summary = auth_client.get('/api/splits/owed?summary=true').get_json()
+        assert 'details' not in summary
+        assert summary['total_owed'] == 120 * 100000 and summary['count'] == 120
+        assert len(summary['groups']) == 40
+        assert {g['total'] for g in summary['groups']} == {300000}
+
+    def test_owed_rejects_bad_page(self, auth_client, test_user):
+        assert auth_client.get('/api/splits/owed?page=0').status_code == 400
+
+    def test_owing_listing_is_constant(self, auth_client, test_user, assert_max_queries):
+        payer = User(username='payer', email='payer@example.com')
+        payer.set_password('TestPass123')
+        db.session.add(payer)
+        db.session.commit()
+        db.session.add(Wallet(name='Payer Wallet', balance=0, user_id=payer.id))
+        db.session.commit()
+
+        try:
+            def owe(count):
+                groups = _make_groups(payer, count)
+                for group in groups:
+                    group.members[0].user_id = test_user.id
+                    group.members[0].is_user = True
+                db.session.commit()
+                _make_splits(payer, groups, per_group=1)
+
+            owe(1)
+            few = _queries(auth_client, '/api/splits/owing')
+            owe(5)
+            with assert_max_queries(few):
+                response = auth_client.get('/api/splits/owing')
+            details = response.get_json()['details']
+            assert len(details) == 6
+            assert {d['creditor_name'] for d in details} == {'payer'}
+        finally:
+            expense_ids = db.session.query(Expense.id).filter_by(user_id=payer.id)
+            ExpenseSplit.query.filter(ExpenseSplit.expense_id.in_(expense_ids)).delete()
+            for group in SplitGroup.query.filter_by(created_by=payer.id):
+                db.session.delete(group)
+            Expense.query.filter_by(user_id=payer.id).delete()
+            Wallet.query.filter_by(user_id=payer.id).delete()
+            db.session.delete(payer)
+            db.session.commit()
+
+
+class TestQueryGuard:
+    """Test the dev-mode request guard and statement normalization"""
+
+    def test_statement_shape_ignores_parameters(self):
+        a = statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?) LIMIT 10")
+        b = statement_shape("SELECT *\n  FROM t WHERE id IN (?) LIMIT 20")
+        assert a == b
+
+    def test_request_over_budget_logs_warning(self, app, auth_client, caplog):
+        app.config["QUERY_GUARD_MAX_QUERIES"] = 0
+        try:
+            with caplog.at_level(logging.WARNING, logger="app.utils.query_counter"):
+                auth_client.get('/api/wallets')
+        finally:
+            app.config["QUERY_GUARD_MAX_QUERIES"] = 30
+        assert any("/api/wallets ran" in r.message for r in caplog.records)
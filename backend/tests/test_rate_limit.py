@@ -0,0 +1,158 @@
+"""
+Token-bucket rate limiting and the daily chat quota
+"""
+
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app import db
+from app.utils.rate_limit import MemoryStore, get_store, parse_rate
+
+
+@pytest.fixture
+def limits(app, monkeypatch):
+    monkeypatch.setitem(app.config, "RATELIMIT_ENABLED", True)
+    get_store().reset()
+    yield app.config
+    get_store().reset()
+
+
+def test_parse_rate():
+    assert parse_rate("10 per minute") == (10, 60)
+    assert parse_rate("5/hour") == (5, 3600)
+    assert parse_rate("100 per days") == (100, 86400)
+    with pytest.raises(ValueError):
+        parse_rate("10 per fortnight")
+
+
+def test_bucket_refills():
+    store = MemoryStore()
+    assert store.consume("k", 2, 0.2)[0]
+    assert store.consume("k", 2, 0.2)[0]
+    allowed, remaining, retry_after = store.consume("k", 2, 0.2)
+    assert not allowed and remaining == 0
+    assert 0 < retry_after <= 0.1
+    time.sleep(0.11)
+    assert store.consume("k", 2, 0.2)[0]
+
+
+def test_limit_holds_across_threads():
+    store = MemoryStore()
+    allowed = []
+    barrier = threading.Barrier(16)
+
+    def worker():
+        barrier.wait()
+        for _ in range(50):
+            allowed.append(store.consume("user:1", 100, 3600)[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(allowed) == 800
+    assert sum(allowed) == 100
+
+
+def test_keys_are_independent():
+    store = MemoryStore()
+    assert store.consume("ip:1.2.3.4", 1, 60)[0]
+    assert not store.consume("ip:1.2.3.4", 1, 60)[0]
+    assert store.consume("ip:5.6.7.8", 1, 60)[0]
+
+
+def test_login_rate_limited_per_ip(client, test_user, limits, monkeypatch):
+    monkeypatch.setitem(limits, "RATELIMIT_AUTH", "3 per minute")
+    statuses = [
+        client.post("/auth/login", json={"username": "testuser", "password": "wrong"}).status_code
+        for _ in range(4)
+    ]
+    assert statuses == [401, 401, 401, 429]
+
+    response = client.post("/auth/login", json={"username": "testuser", "password": "wrong"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert response.headers["X-RateLimit-Limit"] == "3"
+
+    other = client.post(
+        "/auth/login", json={"username": "testuser", "password": "wrong"},
+        environ_base={"REMOTE_ADDR": "10.0.0.2"},
+    )
+    assert other.status_code == 401
+
+
+def test_spoofed_forwarded_for_does_not_reset_bucket(client, test_user, limits, monkeypatch):
+    monkeypatch.setitem(limits, "RATELIMIT_AUTH", "2 per minute")
+    statuses = [
+        client.post(
+            "/auth/login", json={"username": "testuser", "password": "wrong"},
+            headers={"X-Forwarded-For": f"203.0.113.{i}"},
+        ).status_code
+        for i in range(3)
+    ]
+    assert statuses == [401, 401, 429]
+
+
+def test_proxy_fix_trusts_only_the_proxy_hop(app, client, test_user, limits, monkeypatch):
+    from werkzeug.middleware.proxy_fix import ProxyFix
+
+    monkeypatch.setitem(limits, "RATELIMIT_AUTH", "1 per minute")
+    monkeypatch.setattr(app, "wsgi_app", ProxyFix(app.wsgi_app, x_for=1))
+
+    def login(forwarded_for):
+        return client.post(
+            "/auth/login", json={"username": "testuser", "password": "wrong"},
+            headers={"X-Forwarded-For": forwarded_for},
+        ).status_code
+
+    # The proxy appends the real client; anything before it is client-supplied
+    assert login("1.1.1.1, 198.51.100.7") == 401
+    assert login("2.2.2.2, 198.51.100.7") == 429
+    assert login("198.51.100.8") == 401
+
+
+def test_chat_sessions_have_their_own_bucket(auth_client, test_user, limits, monkeypatch):
+    monkeypatch.setitem(limits, "RATELIMIT_CHAT", "1 per minute")
+    monkeypatch.setitem(limits, "RATELIMIT_CHAT_SESSIONS", "2 per minute")
+
+    statuses = [auth_client.post("/api/chat/sessions", json={"action": "noop"}).status_code for _ in range(3)]
+    assert statuses == [400, 400, 429]
+    # Managing sessions left the chat message budget untouched
+    assert get_store().consume(f"chat:user:{test_user.id}", 1, 60)[0]
+
+
+def test_disabled_by_default_in_tests(client, test_user, app):
+    assert not app.config["RATELIMIT_ENABLED"]
+    for _ in range(15):
+        assert client.post("/auth/login", json={"username": "testuser", "password": "wrong"}).status_code == 401
+
+
+def test_chat_quota(app, test_user, monkeypatch):
+    monkeypatch.setitem(app.config, "CHAT_DAILY_LIMIT", 2)
+    assert test_user.consume_chat_message()
+    assert test_user.consume_chat_message()
+    assert not test_user.consume_chat_message()
+    db.session.commit()
+    assert test_user.chat_message_count == 2
+    assert not test_user.can_send_chat_message()
+
+    test_user.last_message_count_reset = date.today() - timedelta(days=1)
+    db.session.commit()
+    assert test_user.can_send_chat_message()
+    assert test_user.consume_chat_message()
+    db.session.commit()
+    assert test_user.chat_message_count == 1
+    assert test_user.last_message_count_reset == date.today()
+
+
+def test_premium_has_no_chat_quota(app, test_user, monkeypatch):
+    monkeypatch.setitem(app.config, "CHAT_DAILY_LIMIT", 0)
+    test_user.premium = True
+    db.session.commit()
+    assert test_user.can_send_chat_message()
+    assert test_user.consume_chat_message()
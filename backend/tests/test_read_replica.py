@@ -0,0 +1,82 @@
+"""
+Tests for routing report queries to the read replica
+"""
+
+import sqlite3
+import pytest
+from datetime import datetime
+from app import create_app, db
+from app.models import Expense, User, Wallet
+from config import TestingConfig
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    """App whose replica is a snapshot of the primary taken before the last expense"""
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+        DATABASE_READ_URL = f"sqlite:///{replica}"
+        DATABASE_READ_MAX_LAG = 60
+        PROFILER_ENABLED = False
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        db.create_all()
+        user = User(username="replica", email="replica@example.com")
+        user.set_password("TestPass123")
+        db.session.add(user)
+        db.session.flush()
+        wallet = Wallet(name="Ví", balance=0, user_id=user.id, is_default=True)
+        db.session.add(wallet)
+        db.session.flush()
+        db.session.add(Expense(amount=100000, category="food", date=datetime.now(),
+                               user_id=user.id, wallet_id=wallet.id, is_expense=True))
+        db.session.commit()
+
+        # "Replicate", then write one more row the replica hasn't seen yet
+        with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+            source.backup(target)
+        db.session.add(Expense(amount=50000, category="food", date=datetime.now(),
+                               user_id=user.id, wallet_id=wallet.id, is_expense=True))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+        app.extensions["read_replica"].dispose()
+
+
+def _monthly_total(client):
+    response = client.get("/api/reports/monthly")
+    assert response.status_code == 200
+    return response.get_json()["summary"]["total_expenses"]
+
+
+class TestReadReplica:
+    """Test that @read_replica views read from DATABASE_READ_URL"""
+
+    def test_reports_read_from_replica(self, replica_app):
+        client = replica_app.test_client()
+        client.post("/auth/login", data={"username": "replica", "password": "TestPass123"})
+        assert _monthly_total(client) == 100000
+
+    def test_writes_and_other_views_use_primary(self, replica_app):
+        client = replica_app.test_client()
+        client.post("/auth/login", data={"username": "replica", "password": "TestPass123"})
+        expenses = client.get("/api/expenses").get_json()
+        assert len(expenses["expenses"]) == 2
+
+    def test_recent_writer_reads_own_writes(self, replica_app):
+        client = replica_app.test_client()
+        client.post("/auth/login", data={"username": "replica", "password": "TestPass123"})
+        with replica_app.app_context():
+            wallet_id = Wallet.query.filter_by(name="Ví").first().id
+        response = client.post("/api/expenses", json={
+            "amount": 25000, "category": "food", "description": "Cà phê", "wallet_id": wallet_id,
+        })
+        assert response.status_code == 201
+        assert _monthly_total(client) == 175000
+
+        replica_app.config["DATABASE_READ_MAX_LAG"] = 0
+        assert _monthly_total(client) == 100000
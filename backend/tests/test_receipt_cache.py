@@ -0,0 +1,104 @@
+"""
+Tests for the content-addressed receipt extraction cache
+"""
+
+import io
+import random
+
+import pytest
+from PIL import Image
+
+from app.ai_engine.core import model_manager as model_manager_module
+from app.ai_engine.core.backends import FakeBackend
+from app.ai_engine.core.model_manager import model_manager
+from app.utils.receipt_cache import hamming, perceptual_hash
+
+
+def _photo(seed=0, quality=92):
+    rng = random.Random(seed)
+    img = Image.new("RGB", (640, 480), "white")
+    for _ in range(40):
+        x, y = rng.randrange(600), rng.randrange(440)
+        img.paste(tuple(rng.randrange(256) for _ in range(3)), (x, y, x + 40, y + 40))
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    monkeypatch.setattr(model_manager_module.time, "sleep", lambda seconds: None)
+    backend = FakeBackend(latency=0, seed=1)
+    model_manager.reset()
+    model_manager.use_backend(backend)
+    yield backend
+    model_manager.reset()
+
+
+def _upload(client, image_data, url="/api/process_receipt"):
+    return client.post(url, data={"receipt": (io.BytesIO(image_data), "receipt.jpg")},
+                       content_type="multipart/form-data")
+
+
+class TestPerceptualHash:
+    def test_survives_reencoding(self):
+        assert hamming(perceptual_hash(_photo(quality=92)), perceptual_hash(_photo(quality=60))) <= 4
+
+    def test_differs_between_images(self):
+        assert hamming(perceptual_hash(_photo(seed=1)), perceptual_hash(_photo(seed=2))) > 10
+
+    def test_undecodable(self):
+        assert perceptual_hash(b"not an image") is None
+
+
+class TestReceiptCache:
+    def test_duplicate_upload_skips_model(self, auth_client, fake_model):
+        first = _upload(auth_client, _photo())
+        second = _upload(auth_client, _photo())
+        assert first.get_json()["cached"] is False
+        assert second.get_json()["cached"] is True
+        assert second.get_json()["amount"] == first.get_json()["amount"] == 185000
+        assert fake_model.calls == 1
+
+    def test_different_receipts_do_not_match(self, auth_client, fake_model):
+        pytest.importorskip("numpy")
+        from benchmarks.bench_ocr import render_receipt
+
+        rng = random.Random(3)
+        first, _ = render_receipt(rng, photo_size=(750, 1000))
+        second, _ = render_receipt(rng, photo_size=(750, 1000))
+        _upload(auth_client, first)
+        assert _upload(auth_client, second).get_json()["cached"] is False
+        assert fake_model.calls == 2
+
+    def test_reencoded_copy_hits_when_enabled(self, app, auth_client, fake_model, monkeypatch):
+        monkeypatch.setitem(app.config, "RECEIPT_CACHE_PHASH_DISTANCE", 4)
+        _upload(auth_client, _photo(quality=92))
+        response = _upload(auth_client, _photo(quality=60))
+        assert response.get_json()["cached"] is True
+        assert fake_model.calls == 1
+
+    def test_shared_with_page_endpoint(self, auth_client, fake_model):
+        _upload(auth_client, _photo())
+        response = _upload(auth_client, _photo(), url="/process_receipt")
+        assert response.get_json()["cached"] is True
+        assert fake_model.calls == 1
+
+    def test_failures_are_not_cached(self, auth_client, fake_model):
+        fake_model.rate_limit_rate = 1.0
+        assert _upload(auth_client, _photo()).status_code == 400
+        calls = fake_model.calls
+        fake_model.rate_limit_rate = 0.0
+        assert _upload(auth_client, _photo()).get_json()["cached"] is False
+        assert fake_model.calls > calls
+
+    def test_expired_entries_miss(self, app, auth_client, fake_model, monkeypatch):
+        monkeypatch.setitem(app.config, "RECEIPT_CACHE_TTL", 0)
+        _upload(auth_client, _photo())
+        assert _upload(auth_client, _photo()).get_json()["cached"] is False
+        assert fake_model.calls == 2
+
+    def test_stats(self, auth_client, fake_model):
+        for _ in range(3):
+            _upload(auth_client, _photo())
+        assert auth_client.get("/api/receipt_cache/stats").get_json() == {"entries": 1, "hits": 2}
@@ -0,0 +1,135 @@
+"""
+Tests for tiered receipt extraction (local OCR first, vision model on low confidence)
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from app.ai_engine.core import model_manager as model_manager_module
+from app.ai_engine.core.backends import FakeBackend
+from app.ai_engine.core.model_manager import model_manager
+from app.utils import ocr as ocr_module
+from app.utils import receipt_extractor as extractor_module
+from app.utils.ocr import ReceiptOCR
+from app.utils.receipt_extractor import TieredReceiptExtractor, prepare_for_model
+
+pytest.importorskip("cv2")
+
+CONFIDENT_TEXT = "CUA HANG MINH ANH\nNgay: 15/01/2025 12:30\nTOTAL: 96.000 VND\n"
+NO_DATE_TEXT = "CUA HANG MINH ANH\nTOTAL: 96.000 VND\n"
+
+
+def _receipt_photo(size=(3000, 4000)):
+    """Dark 'table' with a white receipt and a few text-like bars in the middle"""
+    img = Image.new("RGB", size, (90, 80, 70))
+    width, height = size
+    paper = (width // 3, height // 4, 2 * width // 3, 3 * height // 4)
+    img.paste((250, 250, 250), paper)
+    for i in range(20):
+        top = paper[1] + 80 + i * 90
+        img.paste((20, 20, 20), (paper[0] + 60, top, paper[2] - 200 - (i % 5) * 60, top + 30))
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", quality=95)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    monkeypatch.setattr(model_manager_module.time, "sleep", lambda seconds: None)
+    backend = FakeBackend(latency=0, seed=1)
+    model_manager.reset()
+    model_manager.use_backend(backend)
+    yield backend
+    model_manager.reset()
+
+
+@pytest.fixture
+def ocr_text(monkeypatch):
+    """Make the (inline) OCR tier read a chosen text from every variant"""
+    state = {"text": CONFIDENT_TEXT}
+    monkeypatch.setattr(extractor_module, "ocr_available", lambda: True)
+    monkeypatch.setattr(ocr_module, "_ocr_variant",
+                        lambda gray, variant, config: {"variant": variant, "text": state["text"]})
+    return state
+
+
+def _extractor(app, **kwargs):
+    from app.utils.ai_invoice_extractor import AIInvoiceExtractor
+
+    return TieredReceiptExtractor(ReceiptOCR(workers=0), AIInvoiceExtractor(), **kwargs)
+
+
+class TestTiers:
+    def test_confident_ocr_skips_model(self, app, fake_model, ocr_text):
+        with app.app_context():
+            result = _extractor(app).extract(_receipt_photo())
+        assert result["method"] == "ocr"
+        assert result["amount"] == 96000
+        assert result["date"] == "2025-01-15"
+        assert [t["tier"] for t in result["tiers"]] == ["ocr"]
+        assert fake_model.calls == 0
+
+    def test_missing_date_escalates(self, app, fake_model, ocr_text):
+        ocr_text["text"] = NO_DATE_TEXT
+        with app.app_context():
+            result = _extractor(app).extract(_receipt_photo())
+        assert result["method"] == "ai"
+        assert result["amount"] == 185000
+        ocr_tier, ai_tier = result["tiers"]
+        assert ocr_tier["confidence"] < 0.75
+        assert ai_tier["seconds"] >= 0 and ai_tier["bytes"] > 0
+        assert fake_model.calls == 1
+
+    def test_model_failure_keeps_partial_ocr(self, app, fake_model, ocr_text):
+        ocr_text["text"] = NO_DATE_TEXT
+        fake_model.rate_limit_rate = 1.0
+        with app.app_context():
+            result = _extractor(app).extract(_receipt_photo())
+        assert result["method"] == "ocr"
+        assert result["amount"] == 96000
+
+    def test_without_tesseract_goes_to_model(self, app, fake_model, monkeypatch):
+        monkeypatch.setattr(extractor_module, "ocr_available", lambda: False)
+        with app.app_context():
+            result = _extractor(app).extract(_receipt_photo())
+        assert result["method"] == "ai"
+        assert [t["tier"] for t in result["tiers"]] == ["ai"]
+
+    def test_ocr_only_mode_never_calls_model(self, app, fake_model, ocr_text):
+        ocr_text["text"] = NO_DATE_TEXT
+        with app.app_context():
+            result = _extractor(app, mode="ocr").extract(_receipt_photo())
+        assert result["method"] == "ocr"
+        assert fake_model.calls == 0
+
+
+class TestModelImage:
+    def test_downscaled_and_cropped(self):
+        original = _receipt_photo()
+        prepared = prepare_for_model(original, max_side=1600)
+        assert len(prepared) < len(original)
+        with Image.open(io.BytesIO(prepared)) as img:
+            width, height = img.size
+        assert max(width, height) <= 1600
+        # Cropped to the text on the paper (the photo scales to 1200x1600)
+        assert width < 0.6 * 1200 and height < 0.8 * 1600
+
+    def test_undecodable_bytes_pass_through(self):
+        assert prepare_for_model(b"\x89PNG\r\n\x1a\n garbage") == b"\x89PNG\r\n\x1a\n garbage"
+
+
+def test_endpoint_reports_tier(app, auth_client, fake_model, ocr_text):
+    app.extensions["receipt_extractor"] = _extractor(app)
+    try:
+        response = auth_client.post("/api/process_receipt", data={
+            "receipt": (io.BytesIO(_receipt_photo(size=(600, 800))), "receipt.jpg"),
+        }, content_type="multipart/form-data")
+    finally:
+        del app.extensions["receipt_extractor"]
+    body = response.get_json()
+    assert body["method"] == "ocr"
+    assert body["amount"] == 96000
+    assert [t["tier"] for t in body["tiers"]] == ["ocr"]
+    assert fake_model.calls == 0
@@ -0,0 +1,102 @@
+"""
+Tests for full-text expense search (normalization, index sync, ranking)
+"""
+
+import pytest
+
+from app import db
+from app.models import Expense, Wallet
+from app.utils.search import build_query, normalize
+
+DESCRIPTIONS = ["Phở bò tái - Phúc Long", "Đổ xăng xe máy", "Cà phê sữa đá", "Phở gà", "Grab đi làm"]
+
+
+@pytest.fixture
+def expenses(app, test_user):
+    with app.app_context():
+        wallet = Wallet.query.filter_by(user_id=test_user.id).first()
+        rows = [
+            Expense(amount=50000, category="food", description=d, user_id=test_user.id, wallet_id=wallet.id)
+            for d in DESCRIPTIONS
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [e.id for e in rows]
+
+
+def _search(client, **params):
+    response = client.get("/api/expenses/search", query_string=params)
+    assert response.status_code == 200
+    return [e["description"] for e in response.get_json()["expenses"]]
+
+
+class TestNormalization:
+    @pytest.mark.parametrize("raw, expected", [
+        ("Phở Bò TÁI", "pho bo tai"),
+        ("Đổ xăng", "do xang"),
+        ("Cà-phê, sữa đá!", "ca phe sua da"),
+        ("", ""),
+        (None, ""),
+    ])
+    def test_normalize(self, raw, expected):
+        assert normalize(raw) == expected
+
+    def test_query_is_owner_scoped_prefix_match(self):
+        assert build_query("Phở bò", 7, "sqlite") == 'user_id:"7" AND tokens:("pho"* "bo"*)'
+        assert build_query("Phở bò", 7, "postgresql") == "pho:* & bo:*"
+
+    def test_query_syntax_is_not_injectable(self):
+        assert build_query('"; OR * NEAR(', 7, "sqlite") == 'user_id:"7" AND tokens:("or"* "near"*)'
+        assert build_query("%%", 7, "sqlite") is None
+
+
+class TestExpenseSearch:
+    def test_accent_insensitive_prefix(self, auth_client, expenses):
+        assert sorted(_search(auth_client, description="pho")) == ["Phở bò tái - Phúc Long", "Phở gà"]
+        assert _search(auth_client, description="do xa") == ["Đổ xăng xe máy"]
+        assert _search(auth_client, description="ca phe sua") == ["Cà phê sữa đá"]
+
+    def test_search_without_words_matches_literally(self, auth_client, expenses):
+        assert _search(auth_client, description="!!!") == []
+        assert _search(auth_client, description=" - ") == ["Phở bò tái - Phúc Long"]
+
+    def test_category_is_searchable(self, auth_client, expenses):
+        assert len(_search(auth_client, description="food")) == len(DESCRIPTIONS)
+
+    def test_relevance_order(self, auth_client, expenses):
+        assert _search(auth_client, description="phở gà", sort_by="relevance") == ["Phở gà"]
+        # The shorter document is the better match for a single term
+        assert _search(auth_client, description="pho", sort_by="relevance")[0] == "Phở gà"
+
+    def test_other_users_are_not_matched(self, app, auth_client, expenses):
+        with app.app_context():
+            other = db.session.get(Expense, expenses[0])
+            db.session.execute(db.text("UPDATE expense_search SET user_id = '999' WHERE rowid = :id"),
+                               {"id": other.id})
+            db.session.commit()
+        assert _search(auth_client, description="phuc long") == []
+
+    def test_index_follows_updates_and_deletes(self, app, auth_client, expenses):
+        with app.app_context():
+            expense = db.session.get(Expense, expenses[4])
+            expense.description = "Bún chả Hà Nội"
+            db.session.commit()
+            Expense.query.filter_by(id=expenses[3]).delete()  # bulk delete: the trigger cleans up
+            db.session.commit()
+        assert _search(auth_client, description="grab") == []
+        assert _search(auth_client, description="bun cha") == ["Bún chả Hà Nội"]
+        assert _search(auth_client, description="pho ga") == []
+
+    def test_csv_export_uses_index(self, auth_client, expenses):
+        response = auth_client.get("/api/expenses/export", query_string={"description": "pho"})
+        assert response.status_code == 200
+        assert len(response.get_data(as_text=True).strip().splitlines()) == 3  # header + 2
+
+    def test_rebuild_command(self, app, auth_client, expenses):
+        with app.app_context():
+            db.session.execute(db.text("DELETE FROM expense_search"))
+            db.session.commit()
+        assert _search(auth_client, description="pho") == []
+        result = app.test_cli_runner().invoke(args=["rebuild-search-index"])
+        assert "Indexed" in result.output
+        assert len(_search(auth_client, description="pho")) == 2
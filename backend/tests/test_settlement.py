@@ -0,0 +1,170 @@
+"""
+Split group settlement
+"""
+
+import random
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Expense, ExpenseSplit, SplitGroup, SplitMember, User, Wallet
+from app.utils.settlement import exact_transfers, greedy_transfers, settle
+
+
+def _apply(balances, transfers):
+    left = dict(balances)
+    for from_key, to_key, cents in transfers:
+        assert cents > 0
+        left[from_key] += cents
+        left[to_key] -= cents
+    return left
+
+
+class TestSolvers:
+    def test_greedy_settles_everyone(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            amounts = [rng.randint(-500, 500) * 100 for _ in range(rng.randint(2, 30))]
+            amounts.append(-sum(amounts))
+            balances = dict(enumerate(amounts))
+            transfers = greedy_transfers(balances)
+            assert not any(_apply(balances, transfers).values())
+            assert len(transfers) <= sum(1 for a in amounts if a) - 1 or not any(amounts)
+
+    def test_exact_finds_fewer_transfers(self):
+        # Greedy pays 800 from the two -400s and then splits 500 three ways
+        # (five transfers); {500, -300, -200} and {800, -400, -400} cancel
+        # out on their own, so four are enough
+        balances = {1: -300, 2: 500, 3: -400, 4: -200, 5: -400, 6: 800}
+        exact = exact_transfers(balances)
+        assert not any(_apply(balances, exact).values())
+        assert len(exact) == 4
+        assert len(greedy_transfers(balances)) == 5
+
+    def test_exact_never_worse_than_greedy(self):
+        rng = random.Random(11)
+        for _ in range(100):
+            amounts = [rng.choice([-3, -2, -1, 1, 2, 3]) * 100 for _ in range(rng.randint(1, 7))]
+            amounts.append(-sum(amounts))
+            balances = dict(enumerate(amounts))
+            exact = exact_transfers(balances)
+            assert not any(_apply(balances, exact).values())
+            assert len(exact) <= len(greedy_transfers(balances))
+
+    def test_settle_method_selection(self):
+        small = {1: 100, 2: -100}
+        assert settle(small)[0] == "exact"
+        assert settle(small, "greedy")[0] == "greedy"
+        big = {i: (100 if i % 2 else -100) for i in range(20)}
+        assert settle(big, exact_limit=12)[0] == "greedy"
+        with pytest.raises(ValueError):
+            settle(big, "exact", exact_limit=12)
+        with pytest.raises(ValueError):
+            settle(small, "fastest")
+
+
+@pytest.fixture
+def friend(app, test_user):
+    user = User(username="friend", email="friend@example.com")
+    user.set_password("TestPass123")
+    db.session.add(user)
+    db.session.flush()
+    db.session.add(Wallet(name="Ví", balance=0, user_id=user.id, is_default=True))
+    db.session.commit()
+    yield user
+    expense_ids = db.session.query(Expense.id).filter_by(user_id=user.id)
+    ExpenseSplit.query.filter(ExpenseSplit.expense_id.in_(expense_ids)).delete()
+    Expense.query.filter_by(user_id=user.id).delete()
+    SplitMember.query.filter_by(user_id=user.id).delete()
+    Wallet.query.filter_by(user_id=user.id).delete()
+    db.session.delete(user)
+    db.session.commit()
+
+
+def _pay(user, shares):
+    """An expense paid by ``user`` split over ``{member: amount}``"""
+    expense = Expense(
+        amount=sum(shares.values()), category="food", description="Lẩu", date=datetime.now(),
+        user_id=user.id, wallet_id=user.get_default_wallet().id,
+    )
+    db.session.add(expense)
+    db.session.flush()
+    db.session.add_all(ExpenseSplit(expense_id=expense.id, member_id=m.id, amount=a) for m, a in shares.items())
+
+
+def _group(test_user, friend=None):
+    group = SplitGroup(name="Đi Đà Lạt", created_by=test_user.id)
+    me = SplitMember(user_id=test_user.id, name="testuser", is_user=True)
+    minh = SplitMember(name="Minh")
+    lan = SplitMember(name="Lan")
+    group.members = [me, minh, lan]
+    if friend is not None:
+        group.members.append(SplitMember(user_id=friend.id, name="friend", is_user=True))
+    db.session.add(group)
+    db.session.flush()
+    return group, me, minh, lan
+
+
+class TestSettlementEndpoint:
+    def test_nets_balances_across_payers(self, auth_client, test_user, friend):
+        group, me, minh, lan = _group(test_user, friend)
+        friend_member = group.members[-1]
+        _pay(test_user, {minh: 300000, lan: 100000.5, friend_member: 100000})
+        _pay(friend, {me: 150000, minh: 50000})
+        _pay(test_user, {minh: 999999})
+        ExpenseSplit.query.filter_by(amount=999999).update({"is_paid": True})
+        db.session.commit()
+
+        response = auth_client.get(f"/api/splits/groups/{group.id}/settlement")
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["method"] == "exact"
+        balances = {b["name"]: b["balance"] for b in data["balances"]}
+        assert balances == {"testuser": 350000.5, "Minh": -350000, "Lan": -100000.5, "friend": 100000}
+        assert data["total_outstanding"] == 450000.5
+
+        received = {}
+        for t in data["transfers"]:
+            received[t["to_name"]] = received.get(t["to_name"], 0) + t["amount"]
+            received[t["from_name"]] = received.get(t["from_name"], 0) - t["amount"]
+        assert received == balances
+        assert len(data["transfers"]) <= 3
+
+        greedy = auth_client.get(f"/api/splits/groups/{group.id}/settlement?method=greedy").get_json()
+        assert greedy["method"] == "greedy"
+
+    def test_payer_outside_group(self, auth_client, test_user, friend):
+        group, me, minh, lan = _group(test_user)
+        _pay(friend, {minh: 20000})
+        db.session.commit()
+
+        data = auth_client.get(f"/api/splits/groups/{group.id}/settlement").get_json()
+        assert data["transfers"] == [{
+            "from_member_id": minh.id, "from_name": "Minh", "to_member_id": None,
+            "to_user_id": friend.id, "to_name": "friend", "amount": 20000,
+        }]
+
+    def test_errors(self, auth_client, test_user, friend):
+        group = SplitGroup(name="Riêng", created_by=friend.id)
+        db.session.add(group)
+        db.session.commit()
+        try:
+            assert auth_client.get(f"/api/splits/groups/{group.id}/settlement").status_code == 403
+        finally:
+            db.session.delete(group)
+            db.session.commit()
+
+        own, *_ = _group(test_user)
+        db.session.commit()
+        assert auth_client.get(f"/api/splits/groups/{own.id}/settlement?method=magic").status_code == 400
+        assert auth_client.get("/api/splits/groups/999999/settlement").status_code == 404
+
+    def test_query_count(self, auth_client, test_user, assert_max_queries):
+        group, me, minh, lan = _group(test_user)
+        for i in range(30):
+            _pay(test_user, {minh: 1000 + i, lan: 2000 + i})
+        db.session.commit()
+        auth_client.get(f"/api/splits/groups/{group.id}/settlement")
+        with assert_max_queries(4):  # user, group, members, balances
+            auth_client.get(f"/api/splits/groups/{group.id}/settlement")
@@ -0,0 +1,68 @@
+"""
+Startup cost regression tests
+
+Each check boots the app in a fresh interpreter, so modules already imported
+by the test session don't hide a regression.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed by OCR, Excel import/export, AI and scheduling code paths
+HEAVY_MODULES = [
+    "pandas", "numpy", "cv2", "pytesseract", "google.generativeai",
+    "apscheduler", "bleach",
+]
+
+BOOT = (
+    "import json, sys\n"
+    "from config import TestingConfig\n"
+    "from app import create_app\n"
+    "create_app(TestingConfig)\n"
+    "print(json.dumps({'modules': sorted(sys.modules)}))\n"
+)
+
+
+def _boot():
+    env = {k: v for k, v in os.environ.items() if k not in ("WERKZEUG_RUN_MAIN", "AI_BACKEND")}
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def boot():
+    return _boot()
+
+
+class TestStartup:
+    """Test that booting the app stays cheap"""
+
+    def test_heavy_dependencies_are_lazy(self, boot):
+        loaded = [m for m in HEAVY_MODULES if m in boot["modules"]]
+        assert loaded == [], f"imported at startup: {loaded}"
+
+    # Wall time is measured by benchmarks/bench_startup.py --budget, not here:
+    # an absolute limit flakes on loaded CI runners
+
+
+    def test_wsgi_app_has_ai_features(self):
+        # gunicorn never sets WERKZEUG_RUN_MAIN; wsgi.py must still attach
+        # the AI objects (None without an API key) so routes don't 500
+        env = {k: v for k, v in os.environ.items() if k not in ("WERKZEUG_RUN_MAIN", "AI_BACKEND")}
+        env.update(WORKER_CLASS="threading", APP_CONFIG="testing", GOOGLE_API_KEY="")
+        code = "import wsgi; print(all(hasattr(wsgi.app, n) for n in ('ai_chat', 'expense_analyzer', 'expense_categorizer', 'expense_predictor')))"
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+        assert result.returncode == 0, result.stderr[-2000:]
+        assert result.stdout.strip().splitlines()[-1] == "True"
@@ -0,0 +1,44 @@
+"""
+Production entry point
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+WORKER_CLASS picks the concurrency model: "gevent" (default), "eventlet" or
+"threading" (gunicorn gthread). The green modes monkey-patch the standard
+library here, before anything else is imported, and Socket.IO uses the
+matching async mode. APP_CONFIG selects the config class (default
+"production").
+"""
+
+import os
+import sys
+
+WORKER_CLASS = os.environ.get("WORKER_CLASS", "gevent")
+if WORKER_CLASS == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+elif WORKER_CLASS == "eventlet":
+    import eventlet
+
+    eventlet.monkey_patch()
+elif WORKER_CLASS != "threading":
+    raise SystemExit(f"Unknown WORKER_CLASS: {WORKER_CLASS!r}")
+
+# Read by config.py, so it must be set before the import below
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", WORKER_CLASS)
+
+from dotenv import load_dotenv  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+load_dotenv(os.path.join(BACKEND_DIR, ".env"))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import config  # noqa: E402
+from app import create_app, init_ai_features, socketio  # noqa: E402,F401
+
+app = create_app(config[os.environ.get("APP_CONFIG", "production")])
+# create_app only sets up AI in the dev server's reloader child
+if not hasattr(app, "ai_chat"):
+    init_ai_features(app)
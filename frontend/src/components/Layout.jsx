@@ -19,6 +19,7 @@ import {
 } from 'lucide-react';
 import { cn } from '../lib/utils';
 import { notificationsAPI } from '../services/api';
+import liveSocket from '../services/live';
 import ThemeToggle from './ThemeToggle';
 
 // NavLink component with icon
@@ -61,13 +62,19 @@ const Layout = ({ children }) => {
       }
     };
     loadCount();
-    const id = setInterval(loadCount, 60000);
     return () => {
       active = false;
-      clearInterval(id);
     };
   }, [location.pathname]);
 
+  // New notifications are pushed over the live socket instead of polled
+  useEffect(() => {
+    if (!user) return undefined;
+    return liveSocket.on('notification.created', () => {
+      setUnreadNotifications((count) => count + 1);
+    });
+  }, [user]);
+
   return (
     <div className="flex flex-col min-h-screen pb-16 md:pb-0 bg-gradient-to-br from-slate-50 via-blue-50 to-indigo-50 dark:from-gray-900 dark:via-gray-800 dark:to-gray-900 transition-colors">
       {/* Desktop Navigation */}
@@ -51,8 +51,15 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = async () => {
-    await axios.get('/auth/logout');
-    setUser(null);
+    try {
+      await axios.get('/auth/logout');
+    } finally {
+      // The service worker's API responses belong to this user
+      if ('caches' in window) {
+        await caches.delete('api-cache');
+      }
+      setUser(null);
+    }
   };
 
   return (
@@ -36,6 +36,7 @@ import { formatCurrency } from '../lib/utils';
 import { useToast } from '../components/Toast';
 import { useSettings } from '../contexts/SettingsContext';
 import { parseAmountInput, formatAmountInput, formatAmountLive } from '../lib/numberFormat';
+import liveSocket from '../services/live';
 
 const COLORS = ['#3b82f6', '#10b981', '#f59e0b', '#ef4444', '#8b5cf6', '#ec4899', '#14b8a6', '#f97316'];
 
@@ -67,27 +68,35 @@ const Dashboard = () => {
     fetchWallets();
   }, []);
 
+  // Refresh when a balance changes elsewhere (another tab, import, recurring job)
+  useEffect(() => {
+    let timer;
+    const unsubscribe = liveSocket.on('wallet.balance_changed', () => {
+      clearTimeout(timer);
+      timer = setTimeout(() => {
+        fetchDashboardData();
+        fetchWallets();
+      }, 500);
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, []);
+
   const fetchDashboardData = async () => {
     try {
-      const end = new Date();
-      const start = new Date();
-      start.setDate(end.getDate() - 6); // last 7 days
-
-      const start_date = start.toISOString().slice(0, 10);
-      const end_date = end.toISOString().slice(0, 10);
+      // One request for every section; the browser revalidates it with the
+      // ETag, so an unchanged dashboard comes back as an empty 304
+      const { data } = await axios.get('/api/dashboard/full', {
+        params: { sections: 'summary,recent,trends,categories', days: 7, recent: 5 },
+      });
 
-      const [dashboardRes, expensesRes, trendsRes, statsRes] = await Promise.all([
-        axios.get('/api/dashboard'),
-        axios.get('/api/expenses', { params: { page: 1, per_page: 5 } }),
-        axios.get('/api/expenses/trends', { params: { group_by: 'daily', start_date, end_date } }),
-        axios.get('/api/expenses/statistics', { params: { start_date, end_date } }),
-      ]);
-      
-      setStats(dashboardRes.data);
-      setRecentExpenses(expensesRes.data.expenses || []);
+      setStats(data.summary);
+      setRecentExpenses(data.recent || []);
 
       // Map trends data -> { name, income, expense }
-      const trends = (trendsRes?.data?.trends || []).map(item => {
+      const trends = (data.trends || []).map(item => {
         let name = '';
         if (item.date) {
           name = new Date(item.date).toLocaleDateString('vi-VN', { day: '2-digit', month: '2-digit' });
@@ -117,7 +126,7 @@ const Dashboard = () => {
         utilities: 'Tiện ích',
         other: 'Khác',
       };
-      const byCategory = statsRes?.data?.by_category || [];
+      const byCategory = data.categories || [];
       const categories = byCategory.map(c => ({
         name: categoryLabelMap[c.category] || c.category,
         value: Number(c.total || 0),
@@ -132,7 +141,7 @@ const Dashboard = () => {
 
   const fetchWallets = async () => {
     try {
-      const res = await axios.get('/api/wallets');
+      const res = await axios.get('/api/dashboard/full', { params: { sections: 'wallets' } });
       const ws = res?.data?.wallets || [];
       setWallets(ws);
       if (ws.length > 0) {
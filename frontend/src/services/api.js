@@ -183,6 +183,22 @@ export const notificationsAPI = {
   markRead: (id) => api.post(`/notifications/mark_read/${id}`),
 };
 
+// Splits API
+export const splitsAPI = {
+  // Groups and members
+  getGroups: () => api.get('/splits/groups'),
+  createGroup: (data) => api.post('/splits/groups', data),
+  addMember: (groupId, data) => api.post(`/splits/groups/${groupId}/members`, data),
+  // Balances
+  getOwed: () => api.get('/splits/owed'),
+  getOwing: () => api.get('/splits/owing'),
+  // Who pays whom to settle a group: method is auto | greedy | exact
+  getSettlement: (groupId, method = 'auto') => api.get(`/splits/groups/${groupId}/settlement`, { params: { method } }),
+  // Mark a split as paid
+  settle: (splitId) => api.post(`/splits/${splitId}/settle`),
+  splitExpense: (expenseId, data) => api.post(`/splits/expense/${expenseId}/split`, data),
+};
+
 // Categories API
 export const categoriesAPI = {
   // Get all categories
@@ -0,0 +1,53 @@
+import { io } from 'socket.io-client';
+
+// Server-push channel (/live): notification.created, wallet.balance_changed,
+// budget.threshold_crossed. Replaces polling of unread counts and the dashboard.
+class LiveSocket {
+  constructor() {
+    this.socket = null;
+    this.refs = 0;
+  }
+
+  connect() {
+    this.refs += 1;
+    if (this.socket) {
+      return this.socket;
+    }
+
+    const namespace = '/live';
+    const serverURL = import.meta.env.DEV
+      ? undefined // use current origin so the Vite proxy handles it
+      : (import.meta.env.VITE_API_URL || window.location.origin);
+
+    this.socket = io(serverURL ? `${serverURL}${namespace}` : namespace, {
+      withCredentials: true,
+      transports: ['websocket', 'polling'],
+      reconnection: true,
+      reconnectionDelay: 1000,
+      reconnectionDelayMax: 30000,
+      path: '/socket.io',
+    });
+    return this.socket;
+  }
+
+  release() {
+    this.refs = Math.max(0, this.refs - 1);
+    if (this.refs === 0 && this.socket) {
+      this.socket.disconnect();
+      this.socket = null;
+    }
+  }
+
+  on(event, callback) {
+    this.connect().on(event, callback);
+    return () => {
+      if (this.socket) {
+        this.socket.off(event, callback);
+      }
+      this.release();
+    };
+  }
+}
+
+export const liveSocket = new LiveSocket();
+export default liveSocket;
@@ -2,6 +2,22 @@ import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
 import { VitePWA } from 'vite-plugin-pwa'
 
+// GET endpoints the service worker may serve from 'api-cache' when offline
+const CACHED_API_PATHS = new Set([
+  '/api/dashboard',
+  '/api/dashboard/full',
+  '/api/expenses',
+  '/api/expenses/statistics',
+  '/api/expenses/trends',
+  '/api/wallets',
+  '/api/budgets',
+  '/api/budgets/current',
+  '/api/categories',
+  '/api/notifications',
+  '/api/notifications/unread_count',
+  '/api/chat/sessions',
+])
+
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [
@@ -64,7 +80,12 @@ export default defineConfig({
             }
           },
           {
-            urlPattern: /^\/api\/.*/i,
+            // Only the @conditional_get endpoints (ETag per user data version);
+            // anything else under /api/ (auth, exports, ...) is never cached.
+            // The network request goes through the HTTP cache, which revalidates
+            // with the API's ETag, so an unchanged response is a bodiless 304.
+            // AuthContext deletes this cache on logout.
+            urlPattern: ({ url, request }) => request.method === 'GET' && CACHED_API_PATHS.has(url.pathname),
             handler: 'NetworkFirst',
             options: {
               cacheName: 'api-cache',
@@ -72,6 +93,9 @@ export default defineConfig({
                 maxEntries: 50,
                 maxAgeSeconds: 60 * 5
               },
+              cacheableResponse: {
+                statuses: [200]
+              },
               networkTimeoutSeconds: 10
             }
           }